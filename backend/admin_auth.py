@@ -0,0 +1,30 @@
+"""
+관리자/운영용 엔드포인트 인증 (/api/admin/..., /metrics)
+ADMIN_TOKEN이 없으면 이 엔드포인트들은 404로 응답해 공개되지 않습니다.
+요청에는 X-Admin-Token 헤더 또는 Authorization: Bearer <토큰>이 필요합니다.
+(Prometheus는 scrape 설정의 authorization.credentials로 Bearer 토큰을 보낼 수 있음)
+"""
+
+import hmac
+import os
+from functools import wraps
+
+from flask import jsonify, request
+
+# 관리자 엔드포인트 토큰 (없으면 관리자 엔드포인트 비활성화)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+def admin_required(view):
+    """ADMIN_TOKEN이 설정되어 있고 X-Admin-Token(또는 Authorization: Bearer) 헤더가 일치해야 실행"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"success": False, "error": "관리자 엔드포인트가 비활성화되어 있습니다."}), 404
+        token = request.headers.get('X-Admin-Token', '')
+        authorization = request.headers.get('Authorization', '')
+        if not token and authorization.startswith('Bearer '):
+            token = authorization[len('Bearer '):]
+        if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+            return jsonify({"success": False, "error": "관리자 인증이 필요합니다."}), 401
+        return view(*args, **kwargs)
+    return wrapper
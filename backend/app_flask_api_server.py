@@ -1,49 +1,135 @@
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
-import sqlite3
-import json
 import os
 import openai
 from datetime import datetime
+from serializers import install_json_provider
+from http_cache import init_compression, DataVersionCache, SnapshotDataVersion, conditional_on
+from sqlite_db import (
+    SQLITE_DB_PATH, initialize_sqlite_database, get_read_connection, sqlite_data_version, load_policy_snapshot,
+    search_policy_ids
+)
+from policy_snapshot import PolicySnapshotStore, popcount
+from llm_client import LLMClient, LLMUnavailable
+from chat_sessions import init_chat_sessions
+from request_metrics import init_request_metrics
 
 app = Flask(__name__)
 CORS(app, origins=['https://welfarechatbot02.netlify.app', 'http://localhost:3000'])  # React에서 API 호출할 수 있도록 CORS 설정
+install_json_provider(app)
+init_compression(app)
+# 요청 시간/상태 코드와 /api/chat의 LLM 호출 지표 (/metrics)
+init_request_metrics(app)
 
 # OpenAI API 설정
 openai.api_key = os.getenv('OPENAI_API_KEY', 'your-openai-api-key-here')
+# OpenAI 호환 API 주소 (성능 측정/장애 테스트는 fake_openai_server.py 주소, 예: http://127.0.0.1:8089/v1)
+openai.api_base = os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1')
+chat_llm = LLMClient("gpt-3.5-turbo")
+CHAT_FALLBACK_RESPONSE = "죄송합니다. 현재 AI 서비스에 일시적인 문제가 있습니다. 잠시 후 다시 시도해주세요."
 
-# DB 파일 경로
-DB_PATH = "welfare_policies.db"
+# DB 파일 경로 (SQLITE_DB_PATH 환경 변수로 변경 가능)
+DB_PATH = SQLITE_DB_PATH
+# 대화 세션 파일 (정책 DB는 읽기 전용으로 쓰므로 별도 파일, 모든 워커가 공유)
+CHAT_SESSION_DB = os.getenv('CHAT_SESSION_DB', os.path.splitext(DB_PATH)[0] + '_sessions.db')
+chat_sessions = init_chat_sessions(app, chat_llm, sqlite_path=CHAT_SESSION_DB)
+
+# 시작 시 WAL 모드 설정 (요청 처리는 읽기 전용 연결만 사용)
+initialize_sqlite_database(DB_PATH)
 
 def get_db_connection():
-    """데이터베이스 연결"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # 딕셔너리 형태로 결과 반환
-    return conn
+    """데이터베이스 연결 (스레드별 읽기 전용 연결 재사용, 닫지 않음)"""
+    return get_read_connection(DB_PATH)
+
+# 조회 API의 ETag/Last-Modified 계산용 (DB 파일 수정 시각)
+policy_data_version = DataVersionCache(lambda: sqlite_data_version(DB_PATH))
+
+# age_range를 미리 디코딩한 정책 스냅샷 (DB 파일이 바뀌면 다시 로드)
+policy_snapshot = PolicySnapshotStore(lambda version: load_policy_snapshot(version, DB_PATH),
+                                      lambda: sqlite_data_version(DB_PATH))
+
+def current_policy_snapshot():
+    """이번 요청에서 사용할 정책 스냅샷 (한 요청 안에서는 ETag를 계산한 스냅샷을 계속 사용, 로드 실패 시 None)"""
+    if 'policy_snapshot' not in g:
+        g.policy_snapshot = policy_snapshot.get()
+    return g.policy_snapshot
+
+def get_policy_snapshot():
+    """최신 정책 스냅샷"""
+    snapshot = current_policy_snapshot()
+    if snapshot is None:
+        raise RuntimeError("정책 데이터를 불러오지 못했습니다.")
+    return snapshot
+
+# 조회 API의 ETag/Last-Modified는 응답할 스냅샷의 버전(DB 파일 수정 시각)으로 계산
+served_policy_version = SnapshotDataVersion(current_policy_snapshot, policy_data_version)
+
+# 페이지 크기 (limit 파라미터 기본값/최대값)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def get_paging_args():
+    """limit/offset/after 쿼리 파라미터 (하나도 없으면 None: 기존처럼 전체 목록 응답)"""
+    if not any(name in request.args for name in ('limit', 'offset', 'after')):
+        return None
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    return {
+        'limit': min(max(limit, 1), MAX_PAGE_SIZE),
+        'offset': max(offset, 0),
+        'after': request.args.get('after', type=int),
+    }
+
+def paged_response(page, total_count, paging, next_after=None, **extra):
+    """페이지 응답
+
+    next_after: 다음 페이지를 받을 때 after로 넘길 정책 id (keyset 페이지에서만 사용)
+    """
+    return jsonify({
+        "success": True,
+        **extra,
+        "count": len(page),
+        "total_count": total_count,
+        "limit": paging['limit'],
+        "offset": paging['offset'],
+        "next_after": next_after,
+        "policies": page
+    })
+
+def keyset_page(region, paging):
+    """(region, title, id) 순서로 한 페이지 조회 (region이 None이면 전체)
+
+    id, 행 내용, 전체 개수를 모두 ETag를 계산한 스냅샷에서 가져오므로
+    DB가 바뀐 직후에도 페이지에서 정책이 빠지거나 개수가 어긋나지 않습니다.
+    """
+    snapshot = get_policy_snapshot()
+    mask = snapshot.all_mask if region is None else snapshot.region_masks.get(region, 0)
+    positions, has_more = snapshot.page_after(mask, **paging)
+    page = [snapshot.row(position) for position in positions]
+    next_after = page[-1]['id'] if has_more and page else None
+    extra = {'region': region} if region is not None else {}
+    return paged_response(page, popcount(mask), paging, next_after, **extra)
+
+def search_page(keyword, region, paging):
+    """키워드 검색 한 페이지 (DB가 스냅샷과 같은 버전이면 FTS 관련도 순, 아니면 스냅샷에서 기본 순서로)
+
+    검색 결과 id는 DB에서 찾으므로 스냅샷이 아직 갱신되지 않았으면 스냅샷에 없는 id가 나올 수 있습니다.
+    이때는 스냅샷의 같은 의미(부분 문자열) 검색으로 대신합니다.
+    """
+    snapshot = get_policy_snapshot()
+    if snapshot.version[0] == sqlite_data_version(DB_PATH)[0]:
+        ids, total_count = search_policy_ids(get_db_connection(), keyword, region,
+                                             paging['limit'], paging['offset'])
+        return paged_response(snapshot.rows_by_ids(ids), total_count, paging, keyword=keyword)
+    page, total_count = snapshot.query(region=region, keyword=keyword,
+                                       limit=paging['limit'], offset=paging['offset'])
+    return paged_response(page, total_count, paging, keyword=keyword)
 
 def get_policies_for_ai():
     """AI 응답을 위한 정책 데이터 준비"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT title, region, age_range, conditions, benefits, application_period
-            FROM welfare_policies
-            ORDER BY region, title
-        ''')
-        
-        policies = []
-        for row in cursor.fetchall():
-            policy = dict(row)
-            if policy['age_range']:
-                policy['age_range'] = json.loads(policy['age_range'])
-            else:
-                policy['age_range'] = []
-            policies.append(policy)
-        
-        conn.close()
-        return policies
+        # ORDER BY region, title 순서의 스냅샷 목록
+        return get_policy_snapshot().rows()
     except Exception as e:
         print(f"정책 데이터 조회 오류: {e}")
         return []
@@ -54,29 +140,16 @@ def health_check():
     return jsonify({"status": "healthy", "message": "API 서버가 정상 작동 중입니다!"})
 
 @app.route('/api/policies/region/<region>', methods=['GET'])
+@conditional_on(served_policy_version, view_window=0)
 def get_policies_by_region(region):
     """지역별 정책 조회"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, title, url, region, age_range, application_period, conditions, benefits
-            FROM welfare_policies
-            WHERE region = ?
-            ORDER BY title
-        ''', (region,))
+        paging = get_paging_args()
+        if paging is not None:
+            return keyset_page(region, paging)
         
-        policies = []
-        for row in cursor.fetchall():
-            policy = dict(row)
-            if policy['age_range']:
-                policy['age_range'] = json.loads(policy['age_range'])
-            else:
-                policy['age_range'] = []
-            policies.append(policy)
+        policies, _ = get_policy_snapshot().query(region=region)
         
-        conn.close()
         return jsonify({
             "success": True,
             "region": region,
@@ -91,28 +164,22 @@ def get_policies_by_region(region):
         }), 500
 
 @app.route('/api/policies', methods=['GET'])
+@conditional_on(served_policy_version, view_window=0)
 def get_all_policies():
-    """모든 정책 조회"""
+    """모든 정책 조회 (keyword: 제목/조건/혜택 검색, region과 함께 사용 가능)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        keyword = request.args.get('keyword', '').strip()
+        if keyword:
+            # 검색 결과는 관련도 순이므로 limit/offset 페이지만 지원
+            paging = get_paging_args() or {'limit': DEFAULT_PAGE_SIZE, 'offset': 0, 'after': None}
+            return search_page(keyword, request.args.get('region'), paging)
         
-        cursor.execute('''
-            SELECT id, title, url, region, age_range, application_period, conditions, benefits
-            FROM welfare_policies
-            ORDER BY region, title
-        ''')
+        paging = get_paging_args()
+        if paging is not None:
+            return keyset_page(None, paging)
         
-        policies = []
-        for row in cursor.fetchall():
-            policy = dict(row)
-            if policy['age_range']:
-                policy['age_range'] = json.loads(policy['age_range'])
-            else:
-                policy['age_range'] = []
-            policies.append(policy)
+        policies = get_policy_snapshot().rows()
         
-        conn.close()
         return jsonify({
             "success": True,
             "count": len(policies),
@@ -138,6 +205,9 @@ def chat_with_ai():
                 "error": "메시지가 필요합니다."
             }), 400
         
+        # 이전 대화 (session_id가 없거나 만료됐으면 새 세션)
+        session = chat_sessions.load(data.get('session_id'))
+        
         # 정책 데이터 가져오기
         policies = get_policies_for_ai()
         
@@ -152,7 +222,7 @@ def chat_with_ai():
             system_prompt += f"""
 {i}. {policy['title']}
    - 지역: {policy['region']}
-   - 대상 연령: {', '.join(policy['age_range']) if policy['age_range'] else '제한없음'}
+   - 대상 연령: {f"{min(policy['age_range'])}~{max(policy['age_range'])}세" if policy['age_range'] else '제한없음'}
    - 지원 조건: {policy['conditions'][:100]}...
    - 혜택: {policy['benefits'][:100]}...
    - 신청 기간: {policy['application_period']}
@@ -173,22 +243,29 @@ def chat_with_ai():
 - 사용자가 더 구체적인 정보를 원하면 질문해주세요
 """
 
-        # OpenAI GPT API 호출
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
+        # OpenAI GPT API 호출 (동시 호출 수/제한 시간/재시도/서킷 브레이커는 llm_client)
+        try:
+            response = chat_llm.chat(
+                messages=chat_sessions.prompt_messages(session, system_prompt, user_message),
+                max_tokens=500,
+                temperature=0.7
+            )
+        except LLMUnavailable as e:
+            print(f"AI 챗봇 대체 응답 ({e.reason}): {e}")
+            return jsonify({
+                "success": False,
+                "error": "AI 서비스가 일시적으로 응답하지 않습니다.",
+                "fallback_response": CHAT_FALLBACK_RESPONSE,
+                "session_id": session['id']
+            }), 503
         
         ai_response = response.choices[0].message.content
+        chat_sessions.record(session, user_message, ai_response)
         
         return jsonify({
             "success": True,
             "response": ai_response,
+            "session_id": session['id'],
             "timestamp": datetime.now().isoformat()
         })
         
@@ -197,15 +274,16 @@ def chat_with_ai():
         return jsonify({
             "success": False,
             "error": "AI 응답 생성 중 오류가 발생했습니다.",
-            "fallback_response": "죄송합니다. 현재 AI 서비스에 일시적인 문제가 있습니다. 잠시 후 다시 시도해주세요."
+            "fallback_response": CHAT_FALLBACK_RESPONSE
         }), 500
 
 if __name__ == '__main__':
     print("🚀 복지정책 API 서버 시작...")
     print("📊 사용 가능한 엔드포인트:")
     print("   GET /api/health - 서버 상태 확인")
-    print("   GET /api/policies - 모든 정책 조회")
-    print("   GET /api/policies/region/<region> - 지역별 정책 조회")
+    print("   GET /api/policies - 모든 정책 조회 (limit/offset/after 페이지, keyword 검색 지원)")
+    print("   GET /api/policies/region/<region> - 지역별 정책 조회 (limit/offset/after 페이지 지원)")
+    print("   GET /metrics - 요청 측정 지표 (Prometheus, 관리자 토큰 필요)")
     print("\n🌐 서버 주소: http://localhost:5000")
     
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
@@ -1,12 +1,28 @@
-from flask import Flask, jsonify, request
+from flask import Flask, g, has_request_context, jsonify, request
 from flask_cors import CORS
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import json
 import os
+import time
 import openai
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
+from schema_migrations import apply_schema_migrations, split_sql_statements
+from prepared_statements import (
+    PreparedConnection, execute_fixed, execute_policy_list, execute_policy_count
+)
+from policy_queries import build_eligibility_list_query, build_eligibility_count_query
+from serializers import install_json_provider, rows_as_dicts, row_as_dict
+from http_cache import init_compression, DataVersionCache, SnapshotDataVersion, conditional_on, VIEW_COUNT_WINDOW
+from policy_queries import DATA_VERSION_QUERY, POLICY_SNAPSHOT_QUERY, POLICY_SNAPSHOT_RESPONSE_COLUMNS
+from policy_snapshot import PolicySnapshot, PolicySnapshotStore, popcount
+from shared_snapshot import MappedPolicySnapshot, SnapshotPublisher, snapshot_file_version
+from request_metrics import InstrumentedCursor, init_request_metrics
+from llm_client import LLMClient, LLMUnavailable
+from chat_sessions import init_chat_sessions
+from query_profiler import init_query_profiler
 
 # 환경 변수 로드
 load_dotenv()
@@ -73,15 +89,52 @@ def get_postgres_config():
 # PostgreSQL 설정
 POSTGRES_CONFIG = get_postgres_config()
 
-def get_db_connection():
-    """PostgreSQL 데이터베이스 연결"""
+# 커넥션 풀 설정 (워커 프로세스마다 하나씩 생성)
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 2))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 10))
+_db_pool = None
+
+def connect_database():
+    """PostgreSQL 데이터베이스 직접 연결 (초기화 작업용)"""
     try:
-        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn = psycopg2.connect(cursor_factory=InstrumentedCursor, **POSTGRES_CONFIG)
         return conn
     except Exception as e:
         print(f"데이터베이스 연결 실패: {e}")
         return None
 
+def get_db_pool():
+    """커넥션 풀 조회 (처음 호출될 때 생성)"""
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = psycopg2.pool.ThreadedConnectionPool(
+            DB_POOL_MIN, DB_POOL_MAX,
+            connection_factory=PreparedConnection,
+            cursor_factory=InstrumentedCursor,
+            **POSTGRES_CONFIG
+        )
+    return _db_pool
+
+def get_db_connection():
+    """커넥션 풀에서 PostgreSQL 연결 가져오기"""
+    try:
+        return get_db_pool().getconn()
+    except psycopg2.pool.PoolError:
+        # 풀이 가득 찼으면 임시 연결 사용 (release_db_connection에서 닫힘)
+        return connect_database()
+    except Exception as e:
+        print(f"데이터베이스 연결 실패: {e}")
+        return None
+
+def release_db_connection(conn):
+    """연결을 풀에 반환 (풀 밖의 임시 연결은 닫기)"""
+    if conn is None:
+        return
+    try:
+        get_db_pool().putconn(conn)
+    except psycopg2.pool.PoolError:
+        conn.close()
+
 def migrate_crawled_data(conn):
     """크롤링된 정책 데이터 마이그레이션"""
     try:
@@ -170,7 +223,7 @@ def initialize_database():
         print("🔧 데이터베이스 초기화 시작...")
         print(f"📡 PostgreSQL 설정: {POSTGRES_CONFIG}")
         
-        conn = get_db_connection()
+        conn = connect_database()
         if not conn:
             print("❌ 데이터베이스 연결 실패")
             return False
@@ -200,8 +253,8 @@ def initialize_database():
                 with open(schema_file, 'r', encoding='utf-8') as f:
                     schema_sql = f.read()
                 
-                # SQL 문장들을 분리하여 실행
-                sql_statements = [stmt.strip() for stmt in schema_sql.split(';') if stmt.strip()]
+                # SQL 문장들을 분리하여 실행 (함수 본문 $$ ... $$ 은 한 문장으로 유지)
+                sql_statements = split_sql_statements(schema_sql)
                 
                 for i, statement in enumerate(sql_statements):
                     if statement:
@@ -226,7 +279,7 @@ def initialize_database():
                         insert_sql = f.read()
                     
                     # SQL 문장들을 분리하여 실행
-                    insert_statements = [stmt.strip() for stmt in insert_sql.split(';') if stmt.strip()]
+                    insert_statements = split_sql_statements(insert_sql)
                     
                     for i, statement in enumerate(insert_statements):
                         if statement:
@@ -253,6 +306,9 @@ def initialize_database():
         else:
             print("✅ 데이터베이스가 이미 초기화되어 있습니다.")
         
+        # 기존 데이터베이스에도 새 컬럼/인덱스 반영
+        apply_schema_migrations(conn)
+        
         conn.close()
         return True
         
@@ -270,42 +326,165 @@ def initialize_database():
 
 def get_policies_for_ai():
     """AI 응답을 위한 정책 데이터 준비"""
+    snapshot = get_policy_snapshot()
+    if snapshot is not None:
+        # 스냅샷은 이미 우선순위/조회수 순으로 정렬되어 있음
+        return snapshot.rows(limit=20)
+    
+    conn = get_db_connection()
+    if not conn:
+        return []
+    
     try:
-        conn = get_db_connection()
-        if not conn:
-            return []
-        
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        cursor.execute('''
-            SELECT 
-                p.title, p.description, p.conditions, p.benefits, 
-                p.application_period, p.support_amount_min, p.support_amount_max,
-                r.name as region_name, c.name as category_name,
-                p.age_min, p.age_max, p.status
-            FROM policies p
-            LEFT JOIN regions r ON p.region_id = r.id
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.status = 'active'
-            ORDER BY p.priority DESC, p.view_count DESC
-            LIMIT 20
-        ''')
-        
-        policies = cursor.fetchall()
-        conn.close()
+        cursor = conn.cursor()
         
-        # DictRow를 일반 딕셔너리로 변환
-        return [dict(policy) for policy in policies]
+        execute_fixed(cursor, 'ai_policies')
+        
+        # 튜플 행을 바로 딕셔너리로 변환
+        return rows_as_dicts(cursor, cursor.fetchall())
     except Exception as e:
         print(f"정책 데이터 조회 오류: {e}")
         return []
+    finally:
+        release_db_connection(conn)
+
+def load_policy_data_version():
+    """정책 데이터 버전 조회 (버전 번호, 마지막 변경 시각)"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        execute_fixed(cursor, 'data_version')
+        return cursor.fetchone()
+    finally:
+        release_db_connection(conn)
+
+# 조회 API의 ETag/Last-Modified 계산용 (짧은 시간 동안 프로세스 안에서 재사용)
+policy_data_version = DataVersionCache(load_policy_data_version)
+
+# 메모리 정책 스냅샷 사용 여부 (false이면 매 요청 SQL 조회)
+POLICY_SNAPSHOT_ENABLED = os.getenv('POLICY_SNAPSHOT', 'true').lower() == 'true'
+# gunicorn 마스터가 만든 공유 스냅샷 파일 (gunicorn.conf.py가 파일을 만든 뒤 설정, 없으면 워커마다 직접 로드)
+POLICY_SNAPSHOT_FILE = os.getenv('POLICY_SNAPSHOT_FILE')
+POLICY_SNAPSHOT_PUBLISH_INTERVAL = float(os.getenv('POLICY_SNAPSHOT_PUBLISH_INTERVAL', 5))
+
+def view_count_bucket():
+    """조회수 정렬 갱신 구간 번호 (조회수 변경은 데이터 버전을 올리지 않으므로)"""
+    return int(time.time() // VIEW_COUNT_WINDOW) if VIEW_COUNT_WINDOW > 0 else 0
+
+def snapshot_version(data_version):
+    """스냅샷 버전: (데이터 버전 번호, 마지막 변경 시각(epoch초), 조회수 정렬 갱신 구간)
+
+    스냅샷 파일 헤더(JSON)에도 들어가므로 변경 시각은 숫자로 보관합니다.
+    """
+    token, modified_at = data_version
+    if modified_at.tzinfo is None:
+        modified_at = modified_at.replace(tzinfo=timezone.utc)
+    return token, modified_at.timestamp(), view_count_bucket()
+
+def policy_snapshot_version():
+    version = policy_data_version.get()
+    return snapshot_version(version) if version is not None else None
+
+def build_policy_snapshot(conn, version):
+    """활성 정책 전체를 읽어 PolicySnapshot 생성"""
+    cursor = conn.cursor()
+    cursor.execute(POLICY_SNAPSHOT_QUERY)
+    columns = [column[0] for column in cursor.description]
+    return PolicySnapshot(
+        version, columns, cursor.fetchall(),
+        response_columns=POLICY_SNAPSHOT_RESPONSE_COLUMNS,
+        region_field='region_name', category_field='category_name',
+        age_fields=('age_min', 'age_max'), income_fields=('income_min', 'income_max'),
+        text_fields=('title', 'description', 'conditions', 'benefits')
+    )
+
+def load_policy_snapshot(version):
+    """풀 연결로 PolicySnapshot 생성"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("데이터베이스 연결 실패")
+    try:
+        return build_policy_snapshot(conn, version)
+    finally:
+        release_db_connection(conn)
+
+def create_snapshot_publisher(path):
+    """gunicorn 마스터용 공유 스냅샷 발행기 (마스터에는 커넥션 풀을 만들지 않고 매번 직접 연결)"""
+    def run(action):
+        conn = connect_database()
+        if not conn:
+            raise RuntimeError("데이터베이스 연결 실패")
+        try:
+            return action(conn)
+        finally:
+            conn.close()
+
+    def read_version(conn):
+        cursor = conn.cursor()
+        cursor.execute(DATA_VERSION_QUERY)
+        return snapshot_version(cursor.fetchone())
+
+    return SnapshotPublisher(
+        lambda version: run(lambda conn: build_policy_snapshot(conn, version)),
+        lambda: run(read_version),
+        path, interval=POLICY_SNAPSHOT_PUBLISH_INTERVAL
+    )
+
+def use_snapshot_file(path):
+    """정책 스냅샷을 읽을 곳 지정: 공유 스냅샷 파일(path) 또는 None이면 워커마다 직접 로드
+
+    gunicorn 마스터가 첫 스냅샷 파일을 만든 뒤(또는 만들지 못했을 때) 워커를 띄우기 전에 호출합니다.
+    """
+    global policy_snapshot
+    if not POLICY_SNAPSHOT_ENABLED:
+        policy_snapshot = None
+    elif path:
+        # 파일이 교체될 때만 다시 매핑 (행 데이터는 모든 워커가 같은 페이지를 공유)
+        policy_snapshot = PolicySnapshotStore(lambda version: MappedPolicySnapshot(path),
+                                              lambda: snapshot_file_version(path))
+    else:
+        policy_snapshot = PolicySnapshotStore(load_policy_snapshot, policy_snapshot_version)
+
+use_snapshot_file(POLICY_SNAPSHOT_FILE)
+
+def get_policy_snapshot():
+    """최신 정책 스냅샷 (사용하지 않거나 로드에 실패했으면 None → SQL로 조회)
+
+    한 요청 안에서는 처음 가져온 스냅샷을 계속 사용하므로 ETag와 응답 본문이 같은 스냅샷에서 나옵니다.
+    """
+    if policy_snapshot is None:
+        return None
+    if not has_request_context():
+        return policy_snapshot.get()
+    if 'policy_snapshot' not in g:
+        g.policy_snapshot = policy_snapshot.get()
+    return g.policy_snapshot
+
+def served_snapshot_version(snapshot):
+    token, modified_at, bucket = snapshot.version
+    return token, datetime.fromtimestamp(modified_at, tz=timezone.utc), bucket
+
+# 스냅샷으로 응답하는 API의 ETag/Last-Modified는 응답할 스냅샷의 버전으로 계산
+served_policy_version = SnapshotDataVersion(get_policy_snapshot, policy_data_version, served_snapshot_version)
 
 # Flask 앱 생성
 app = Flask(__name__)
 CORS(app, origins=['https://welfarechatbot02.netlify.app', 'http://localhost:3000'])
+install_json_provider(app)
+init_compression(app)
+init_request_metrics(app)
+init_query_profiler(app)
 
 # OpenAI API 설정
 openai.api_key = os.getenv('OPENAI_API_KEY', 'your-openai-api-key-here')
+# OpenAI 호환 API 주소 (성능 측정/장애 테스트는 fake_openai_server.py 주소, 예: http://127.0.0.1:8089/v1)
+openai.api_base = os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1')
+CHAT_MODEL = "gpt-3.5-turbo"
+chat_llm = LLMClient(CHAT_MODEL)
+chat_sessions = init_chat_sessions(app, chat_llm, get_db_connection, release_db_connection)
+CHAT_FALLBACK_RESPONSE = "죄송합니다. 현재 AI 서비스에 일시적인 문제가 있습니다. 잠시 후 다시 시도해주세요."
 
 # 앱 시작 시 데이터베이스 초기화
 print("🚀 Flask 앱 시작 중...")
@@ -327,7 +506,7 @@ def health_check():
     try:
         conn = get_db_connection()
         if conn:
-            conn.close()
+            release_db_connection(conn)
             return jsonify({
                 "status": "healthy", 
                 "message": "API 서버와 PostgreSQL이 정상 작동 중입니다!",
@@ -347,15 +526,10 @@ def health_check():
         }), 500
 
 @app.route('/api/policies', methods=['GET'])
+@conditional_on(served_policy_version)
 def get_all_policies():
     """모든 정책 조회 (고급 검색)"""
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
-        
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
         # 쿼리 파라미터
         region = request.args.get('region')
         category = request.args.get('category')
@@ -363,89 +537,46 @@ def get_all_policies():
         keyword = request.args.get('keyword')
         limit = int(request.args.get('limit', 50))
         offset = int(request.args.get('offset', 0))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    
+    age_int = None
+    if age:
+        try:
+            age_int = int(age)
+        except ValueError:
+            pass
+    
+    snapshot = get_policy_snapshot()
+    if snapshot is not None:
+        policies, total_count = snapshot.query(region, category, age_int, keyword,
+                                               limit=max(limit, 0), offset=max(offset, 0))
+        return jsonify({
+            "success": True,
+            "policies": policies,
+            "total_count": total_count,
+            "limit": limit,
+            "offset": offset
+        })
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+    
+    try:
+        cursor = conn.cursor()
         
-        # 기본 쿼리
-        query = '''
-            SELECT 
-                p.id, p.title, p.description, p.url, p.conditions, p.benefits,
-                p.application_period, p.support_amount_min, p.support_amount_max,
-                p.age_min, p.age_max, p.status, p.priority, p.view_count,
-                r.name as region_name, c.name as category_name, c.color as category_color,
-                p.created_at, p.updated_at
-            FROM policies p
-            LEFT JOIN regions r ON p.region_id = r.id
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.status = 'active'
-        '''
-        
-        params = []
-        
-        # 필터 조건 추가
-        if region:
-            query += " AND r.name = %s"
-            params.append(region)
-        
-        if category:
-            query += " AND c.name = %s"
-            params.append(category)
-        
-        if age:
-            try:
-                age_int = int(age)
-                query += " AND (%s BETWEEN p.age_min AND p.age_max OR (p.age_min IS NULL AND p.age_max IS NULL))"
-                params.append(age_int)
-            except ValueError:
-                pass
-        
-        if keyword:
-            query += " AND (p.title ILIKE %s OR p.description ILIKE %s OR p.conditions ILIKE %s OR p.benefits ILIKE %s)"
-            keyword_param = f"%{keyword}%"
-            params.extend([keyword_param, keyword_param, keyword_param, keyword_param])
-        
-        # 정렬 및 페이징
-        query += " ORDER BY p.priority DESC, p.view_count DESC, p.created_at DESC"
-        query += " LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
-        
-        cursor.execute(query, params)
-        policies = cursor.fetchall()
+        # 조건 조합별로 PREPARE 된 쿼리 실행
+        execute_policy_list(cursor, region, category, age_int, keyword, limit, offset)
+        policies = rows_as_dicts(cursor, cursor.fetchall())
         
         # 총 개수 조회
-        count_query = '''
-            SELECT COUNT(*) 
-            FROM policies p
-            LEFT JOIN regions r ON p.region_id = r.id
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.status = 'active'
-        '''
-        
-        count_params = []
-        if region:
-            count_query += " AND r.name = %s"
-            count_params.append(region)
-        if category:
-            count_query += " AND c.name = %s"
-            count_params.append(category)
-        if age:
-            try:
-                age_int = int(age)
-                count_query += " AND (%s BETWEEN p.age_min AND p.age_max OR (p.age_min IS NULL AND p.age_max IS NULL))"
-                count_params.append(age_int)
-            except ValueError:
-                pass
-        if keyword:
-            count_query += " AND (p.title ILIKE %s OR p.description ILIKE %s OR p.conditions ILIKE %s OR p.benefits ILIKE %s)"
-            keyword_param = f"%{keyword}%"
-            count_params.extend([keyword_param, keyword_param, keyword_param, keyword_param])
-        
-        cursor.execute(count_query, count_params)
+        execute_policy_count(cursor, region, category, age_int, keyword)
         total_count = cursor.fetchone()[0]
         
-        conn.close()
-        
         return jsonify({
             "success": True,
-            "policies": [dict(policy) for policy in policies],
+            "policies": policies,
             "total_count": total_count,
             "limit": limit,
             "offset": offset
@@ -456,39 +587,102 @@ def get_all_policies():
             "success": False,
             "error": str(e)
         }), 500
+    finally:
+        release_db_connection(conn)
 
 @app.route('/api/policies/region/<region>', methods=['GET'])
+@conditional_on(served_policy_version)
 def get_policies_by_region(region):
     """지역별 정책 조회"""
+    snapshot = get_policy_snapshot()
+    if snapshot is not None:
+        policies, count = snapshot.query(region=region)
+        return jsonify({
+            "success": True,
+            "region": region,
+            "count": count,
+            "policies": policies
+        })
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+    
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+        cursor = conn.cursor()
         
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        cursor.execute('''
-            SELECT 
-                p.id, p.title, p.description, p.url, p.conditions, p.benefits,
-                p.application_period, p.support_amount_min, p.support_amount_max,
-                p.age_min, p.age_max, p.status, p.priority, p.view_count,
-                r.name as region_name, c.name as category_name, c.color as category_color,
-                p.created_at, p.updated_at
-            FROM policies p
-            LEFT JOIN regions r ON p.region_id = r.id
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE r.name = %s AND p.status = 'active'
-            ORDER BY p.priority DESC, p.view_count DESC
-        ''', (region,))
-        
-        policies = cursor.fetchall()
-        conn.close()
+        execute_fixed(cursor, 'region_policies', (region,))
+        
+        policies = rows_as_dicts(cursor, cursor.fetchall())
         
         return jsonify({
             "success": True,
             "region": region,
             "count": len(policies),
-            "policies": [dict(policy) for policy in policies]
+            "policies": policies
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+    finally:
+        release_db_connection(conn)
+
+# 상세 일괄 조회에서 한 번에 받을 수 있는 최대 id 수
+POLICY_BATCH_MAX_IDS = int(os.getenv('POLICY_BATCH_MAX_IDS', 100))
+
+def parse_policy_ids(values):
+    """정책 id 목록 파싱 (중복 제거, 요청 순서 유지)"""
+    if not isinstance(values, list):
+        raise ValueError("ids는 배열이어야 합니다.")
+    try:
+        ids = list(dict.fromkeys(int(value) for value in values))
+    except (TypeError, ValueError):
+        raise ValueError("ids에는 정수만 사용할 수 있습니다.")
+    if not ids:
+        raise ValueError("조회할 정책 id가 없습니다.")
+    if len(ids) > POLICY_BATCH_MAX_IDS:
+        raise ValueError(f"한 번에 최대 {POLICY_BATCH_MAX_IDS}개의 정책만 조회할 수 있습니다.")
+    return ids
+
+@app.route('/api/policies/batch', methods=['GET', 'POST'])
+def get_policy_details():
+    """정책 상세 일괄 조회 (GET ?ids=1,2,3 또는 POST {"ids": [1, 2, 3]})
+    
+    조회수 증가와 상세 조회를 각각 한 번의 쿼리로 처리하고, 요청한 id 순서대로 반환합니다.
+    """
+    if request.method == 'GET':
+        values = [value for value in request.args.get('ids', '').split(',') if value.strip()]
+    else:
+        data = request.get_json(silent=True)
+        values = data.get('ids') if isinstance(data, dict) else None
+    try:
+        ids = parse_policy_ids(values)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+    
+    try:
+        cursor = conn.cursor()
+        
+        # 조회수 증가 (한 번의 UPDATE)
+        execute_fixed(cursor, 'increment_view_counts', (ids,))
+        
+        # 정책 정보 조회 (한 번의 SELECT)
+        execute_fixed(cursor, 'policy_details', (ids,))
+        policies_by_id = {policy['id']: policy for policy in rows_as_dicts(cursor, cursor.fetchall())}
+        conn.commit()
+        
+        return jsonify({
+            "success": True,
+            "count": len(policies_by_id),
+            "policies": [policies_by_id[policy_id] for policy_id in ids if policy_id in policies_by_id],
+            "missing_ids": [policy_id for policy_id in ids if policy_id not in policies_by_id]
         })
         
     except Exception as e:
@@ -496,32 +690,28 @@ def get_policies_by_region(region):
             "success": False,
             "error": str(e)
         }), 500
+    finally:
+        release_db_connection(conn)
 
 @app.route('/api/policies/<int:policy_id>', methods=['GET'])
 def get_policy_detail(policy_id):
     """정책 상세 정보 조회"""
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+    
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
-        
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor = conn.cursor()
         
         # 조회수 증가
-        cursor.execute('UPDATE policies SET view_count = view_count + 1 WHERE id = %s', (policy_id,))
+        execute_fixed(cursor, 'increment_view_count', (policy_id,))
         
         # 정책 정보 조회
-        cursor.execute('''
-            SELECT 
-                p.*, r.name as region_name, c.name as category_name, c.color as category_color
-            FROM policies p
-            LEFT JOIN regions r ON p.region_id = r.id
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.id = %s
-        ''', (policy_id,))
-        
-        policy = cursor.fetchone()
-        conn.close()
+        execute_fixed(cursor, 'policy_detail', (policy_id,))
+        
+        policy = row_as_dict(cursor, cursor.fetchone())
+        # 커밋하지 않으면 풀에 반환될 때 롤백되어 조회수가 반영되지 않음
+        conn.commit()
         
         if not policy:
             return jsonify({
@@ -531,7 +721,7 @@ def get_policy_detail(policy_id):
         
         return jsonify({
             "success": True,
-            "policy": dict(policy)
+            "policy": policy
         })
         
     except Exception as e:
@@ -539,29 +729,27 @@ def get_policy_detail(policy_id):
             "success": False,
             "error": str(e)
         }), 500
+    finally:
+        release_db_connection(conn)
 
 @app.route('/api/categories', methods=['GET'])
+@conditional_on(policy_data_version)
 def get_categories():
     """카테고리 목록 조회"""
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+    
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
-        
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT id, name, description, icon, color
-            FROM categories
-            ORDER BY name
-        ''')
+        execute_fixed(cursor, 'categories')
         
-        categories = cursor.fetchall()
-        conn.close()
+        categories = rows_as_dicts(cursor, cursor.fetchall())
         
         return jsonify({
             "success": True,
-            "categories": [dict(category) for category in categories]
+            "categories": categories
         })
         
     except Exception as e:
@@ -569,30 +757,27 @@ def get_categories():
             "success": False,
             "error": str(e)
         }), 500
+    finally:
+        release_db_connection(conn)
 
 @app.route('/api/regions', methods=['GET'])
+@conditional_on(policy_data_version)
 def get_regions():
     """지역 목록 조회"""
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+    
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
-        
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT id, code, name, level
-            FROM regions
-            WHERE level = 1
-            ORDER BY name
-        ''')
+        execute_fixed(cursor, 'regions')
         
-        regions = cursor.fetchall()
-        conn.close()
+        regions = rows_as_dicts(cursor, cursor.fetchall())
         
         return jsonify({
             "success": True,
-            "regions": [dict(region) for region in regions]
+            "regions": regions
         })
         
     except Exception as e:
@@ -600,51 +785,49 @@ def get_regions():
             "success": False,
             "error": str(e)
         }), 500
+    finally:
+        release_db_connection(conn)
 
 @app.route('/api/stats', methods=['GET'])
+@conditional_on(served_policy_version)
 def get_statistics():
     """통계 정보 조회"""
+    snapshot = get_policy_snapshot()
+    if snapshot is not None:
+        return jsonify({
+            "success": True,
+            "statistics": {
+                "total_policies": snapshot.size,
+                "regions": [{"name": name, "count": count} for name, count in snapshot.value_counts('region_name')],
+                "categories": [{"name": name, "count": count} for name, count in snapshot.value_counts('category_name')]
+            }
+        })
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+    
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
-        
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor = conn.cursor()
         
         # 전체 정책 수
-        cursor.execute("SELECT COUNT(*) as total FROM policies WHERE status = 'active'")
-        total_policies = cursor.fetchone()['total']
+        execute_fixed(cursor, 'stats_total')
+        total_policies = cursor.fetchone()[0]
         
         # 지역별 정책 수
-        cursor.execute('''
-            SELECT r.name, COUNT(*) as count
-            FROM policies p
-            LEFT JOIN regions r ON p.region_id = r.id
-            WHERE p.status = 'active'
-            GROUP BY r.name
-            ORDER BY count DESC
-        ''')
-        region_stats = cursor.fetchall()
+        execute_fixed(cursor, 'stats_region')
+        region_stats = rows_as_dicts(cursor, cursor.fetchall())
         
         # 카테고리별 정책 수
-        cursor.execute('''
-            SELECT c.name, COUNT(*) as count
-            FROM policies p
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.status = 'active'
-            GROUP BY c.name
-            ORDER BY count DESC
-        ''')
-        category_stats = cursor.fetchall()
-        
-        conn.close()
+        execute_fixed(cursor, 'stats_category')
+        category_stats = rows_as_dicts(cursor, cursor.fetchall())
         
         return jsonify({
             "success": True,
             "statistics": {
                 "total_policies": total_policies,
-                "regions": [dict(stat) for stat in region_stats],
-                "categories": [dict(stat) for stat in category_stats]
+                "regions": region_stats,
+                "categories": category_stats
             }
         })
         
@@ -653,6 +836,109 @@ def get_statistics():
             "success": False,
             "error": str(e)
         }), 500
+    finally:
+        release_db_connection(conn)
+
+# 지원 자격 조회: 한 요청에서 평가할 수 있는 사용자 조건 수와 조건별 최대 결과 수
+ELIGIBILITY_MAX_PROFILES = int(os.getenv('ELIGIBILITY_MAX_PROFILES', 100))
+ELIGIBILITY_DEFAULT_LIMIT = 20
+ELIGIBILITY_MAX_LIMIT = 500
+
+def parse_eligibility_profile(data):
+    """사용자 조건 파싱: region, age, income(만원), category, limit, offset"""
+    if not isinstance(data, dict):
+        raise ValueError("사용자 조건은 객체여야 합니다.")
+    
+    def optional_int(name):
+        value = data.get(name)
+        if value is None or value == '':
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name}은(는) 정수여야 합니다.")
+    
+    limit = optional_int('limit')
+    return {
+        'region': data.get('region') or None,
+        'category': data.get('category') or None,
+        'age': optional_int('age'),
+        'income': optional_int('income'),
+        'limit': min(max(ELIGIBILITY_DEFAULT_LIMIT if limit is None else limit, 0), ELIGIBILITY_MAX_LIMIT),
+        'offset': max(optional_int('offset') or 0, 0),
+    }
+
+def match_eligibility_snapshot(snapshot, profile, ids_only):
+    """스냅샷 비트셋으로 지원 가능 정책 계산"""
+    mask = snapshot.eligibility_mask(profile['region'], profile['age'], profile['income'], profile['category'])
+    page = (mask, profile['limit'], profile['offset'])
+    result = {"total_count": popcount(mask)}
+    if ids_only:
+        result["policy_ids"] = snapshot.ids(*page)
+    else:
+        result["policies"] = snapshot.rows(*page)
+    return result
+
+def match_eligibility_sql(cursor, profile, ids_only):
+    """스냅샷을 쓸 수 없을 때 SQL로 지원 가능 정책 계산"""
+    conditions = (profile['region'], profile['age'], profile['income'], profile['category'])
+    cursor.execute(*build_eligibility_list_query(*conditions, profile['limit'], profile['offset']))
+    policies = rows_as_dicts(cursor, cursor.fetchall())
+    cursor.execute(*build_eligibility_count_query(*conditions))
+    result = {"total_count": cursor.fetchone()[0]}
+    if ids_only:
+        result["policy_ids"] = [policy['id'] for policy in policies]
+    else:
+        result["policies"] = policies
+    return result
+
+@app.route('/api/eligibility', methods=['GET', 'POST'])
+def check_eligibility():
+    """지원 가능 정책 조회
+    
+    GET: 쿼리 파라미터 하나의 조건 (region, age, income, category, limit, offset)
+    POST: 같은 필드의 JSON 객체, 또는 {"profiles": [...]}로 여러 조건을 한 번에 평가
+    ids_only=true이면 정책 내용 대신 id 목록만 반환
+    """
+    data = request.args.to_dict() if request.method == 'GET' else request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "JSON 객체가 필요합니다."}), 400
+    
+    batch = 'profiles' in data
+    try:
+        raw_profiles = data['profiles'] if batch else [data]
+        if not isinstance(raw_profiles, list):
+            raise ValueError("profiles는 배열이어야 합니다.")
+        if len(raw_profiles) > ELIGIBILITY_MAX_PROFILES:
+            raise ValueError(f"한 번에 최대 {ELIGIBILITY_MAX_PROFILES}개의 조건만 조회할 수 있습니다.")
+        profiles = [parse_eligibility_profile(profile) for profile in raw_profiles]
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    ids_only = str(data.get('ids_only', '')).lower() == 'true'
+    
+    snapshot = get_policy_snapshot()
+    if snapshot is not None:
+        results = [match_eligibility_snapshot(snapshot, profile, ids_only) for profile in profiles]
+    else:
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({"success": False, "error": "데이터베이스 연결 실패"}), 500
+        try:
+            cursor = conn.cursor()
+            results = [match_eligibility_sql(cursor, profile, ids_only) for profile in profiles]
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 500
+        finally:
+            release_db_connection(conn)
+    
+    if batch:
+        return jsonify({"success": True, "results": results})
+    return jsonify({
+        "success": True,
+        **results[0],
+        "limit": profiles[0]['limit'],
+        "offset": profiles[0]['offset']
+    })
 
 @app.route('/api/chat', methods=['POST'])
 def chat_with_ai():
@@ -667,6 +953,9 @@ def chat_with_ai():
                 "error": "메시지가 필요합니다."
             }), 400
         
+        # 이전 대화 (session_id가 없거나 만료됐으면 새 세션)
+        session = chat_sessions.load(data.get('session_id'))
+        
         # 정책 데이터 가져오기
         policies = get_policies_for_ai()
         
@@ -704,22 +993,29 @@ def chat_with_ai():
 - 사용자가 더 구체적인 정보를 원하면 질문해주세요
 """
 
-        # OpenAI GPT API 호출
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
+        # OpenAI GPT API 호출 (동시 호출 수/제한 시간/재시도/서킷 브레이커는 llm_client, 측정값은 /metrics)
+        try:
+            response = chat_llm.chat(
+                messages=chat_sessions.prompt_messages(session, system_prompt, user_message),
+                max_tokens=500,
+                temperature=0.7
+            )
+        except LLMUnavailable as e:
+            print(f"AI 챗봇 대체 응답 ({e.reason}): {e}")
+            return jsonify({
+                "success": False,
+                "error": "AI 서비스가 일시적으로 응답하지 않습니다.",
+                "fallback_response": CHAT_FALLBACK_RESPONSE,
+                "session_id": session['id']
+            }), 503
         
         ai_response = response.choices[0].message.content
+        chat_sessions.record(session, user_message, ai_response)
         
         return jsonify({
             "success": True,
             "response": ai_response,
+            "session_id": session['id'],
             "timestamp": datetime.now().isoformat()
         })
         
@@ -728,7 +1024,7 @@ def chat_with_ai():
         return jsonify({
             "success": False,
             "error": "AI 응답 생성 중 오류가 발생했습니다.",
-            "fallback_response": "죄송합니다. 현재 AI 서비스에 일시적인 문제가 있습니다. 잠시 후 다시 시도해주세요."
+            "fallback_response": CHAT_FALLBACK_RESPONSE
         }), 500
 
 if __name__ == '__main__':
@@ -740,7 +1036,9 @@ if __name__ == '__main__':
     print("   GET /api/categories - 카테고리 목록")
     print("   GET /api/regions - 지역 목록")
     print("   GET /api/stats - 통계 정보")
-    print("   POST /api/chat - AI 챗봇 대화")
+    print("   POST /api/chat - AI 챗봇 대화 (session_id로 이전 대화 이어가기)")
+    print("   GET/DELETE /api/chat/sessions/<session_id> - 대화 세션 조회/삭제")
+    print("   GET /metrics - 요청 측정 지표 (Prometheus, 관리자 토큰 필요)")
     print("\n🌐 서버 주소: http://localhost:5000")
     
     # 프로덕션 환경에서는 gunicorn 사용, 개발 환경에서는 Flask 개발 서버 사용
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+API 부하 테스트 / 성능 회귀 검사
+합성 정책 데이터(1천/1만/10만 개)를 로컬 PostgreSQL과 SQLite에 채운 뒤 두 서버를 gunicorn으로 띄우고,
+모든 엔드포인트에 지정한 동시 요청 수로 HTTP 요청을 보내 초당 요청 수와 응답 시간 백분위를 측정합니다.
+/api/chat은 로컬 가짜 OpenAI 서버(fake_openai_server.py)로 연결하므로 실제 API 키가 필요 없습니다.
+
+결과는 JSON 파일로 저장하고, 기준 결과(--baseline)가 있으면 비교해서 성능이 떨어진 항목이 있으면 종료 코드 1을 반환합니다.
+(같은 장비에서 --save-baseline으로 만든 기준 결과와 비교해야 의미가 있습니다)
+
+주의: PostgreSQL의 policies 테이블을 비우고 합성 데이터로 채우므로 테스트용 DB에서만 실행하세요.
+
+사용법:
+    python bench_api.py --dsn postgresql://postgres:pw@localhost:5432/welfare_bench --save-baseline
+    python bench_api.py --dsn ... --sizes 1000,10000 --concurrency 16 --duration 10
+    python bench_api.py --servers sqlite --sizes 100000 --endpoints policies_page,chat
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = '1000,10000,100000'
+DEFAULT_RESULTS = 'bench_results.json'
+DEFAULT_BASELINE = 'bench_baseline.json'
+PERCENTILES = (50, 90, 99)
+# 기준 대비 허용 오차 (초당 요청 수 감소율, p99 증가율)
+DEFAULT_TOLERANCE = 0.2
+# 이보다 작은 p99 증가는 측정 오차로 봄 (ms)
+MIN_P99_DELTA_MS = 2.0
+SERVER_START_TIMEOUT = 120
+CHAT_MESSAGES = ['서울에 사는 25살 대학생인데 받을 수 있는 지원이 있나요?',
+                 '월세 지원 정책 알려주세요', '취업 준비생을 위한 정책을 추천해주세요']
+KEYWORDS = ['청년', '월세', '장학금', '창업']
+
+def percentile(values, p):
+    """정렬된 값의 p 백분위 (nearest-rank)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+# 엔드포인트별 요청 생성 함수: (난수 생성기, 데이터 정보) → (method, path, JSON 본문)
+def _get(path):
+    return lambda rng, ctx: ('GET', path, None)
+
+def _policy_id(rng, ctx):
+    return rng.randint(1, ctx['rows'])
+
+def _region(rng, ctx):
+    return rng.choice(ctx['regions'])
+
+POSTGRES_ENDPOINTS = {
+    'health': _get('/api/health'),
+    'policies_page': lambda rng, ctx: ('GET', f"/api/policies?limit=50&offset={rng.randrange(0, 1000)}", None),
+    'policies_filtered': lambda rng, ctx: (
+        'GET', f"/api/policies?region={_region(rng, ctx)}&age={rng.randint(19, 39)}&limit=20", None),
+    'policies_keyword': lambda rng, ctx: ('GET', f"/api/policies?keyword={rng.choice(KEYWORDS)}&limit=20", None),
+    'policies_region': lambda rng, ctx: ('GET', f"/api/policies/region/{_region(rng, ctx)}", None),
+    'policy_detail': lambda rng, ctx: ('GET', f"/api/policies/{_policy_id(rng, ctx)}", None),
+    'policy_batch': lambda rng, ctx: (
+        'GET', "/api/policies/batch?ids=" + ','.join(str(_policy_id(rng, ctx)) for _ in range(10)), None),
+    'categories': _get('/api/categories'),
+    'regions': _get('/api/regions'),
+    'stats': _get('/api/stats'),
+    'eligibility': lambda rng, ctx: (
+        'GET', f"/api/eligibility?region={_region(rng, ctx)}&age={rng.randint(19, 39)}&income=200", None),
+    'chat': lambda rng, ctx: ('POST', '/api/chat', {'message': rng.choice(CHAT_MESSAGES)}),
+}
+
+SQLITE_ENDPOINTS = {
+    'health': _get('/api/health'),
+    'policies_all': _get('/api/policies'),
+    'policies_page': lambda rng, ctx: ('GET', f"/api/policies?limit=50&offset={rng.randrange(0, 1000)}", None),
+    'policies_keyword': lambda rng, ctx: ('GET', f"/api/policies?keyword={rng.choice(KEYWORDS)}&limit=20", None),
+    'policies_region': lambda rng, ctx: ('GET', f"/api/policies/region/{_region(rng, ctx)}", None),
+    'policies_region_page': lambda rng, ctx: (
+        'GET', f"/api/policies/region/{_region(rng, ctx)}?limit=50&offset={rng.randrange(0, 300)}", None),
+    'chat': lambda rng, ctx: ('POST', '/api/chat', {'message': rng.choice(CHAT_MESSAGES)}),
+}
+
+SERVERS = {
+    'postgres': {'module': 'app_postgresql_api', 'config': 'gunicorn.conf.py', 'endpoints': POSTGRES_ENDPOINTS},
+    'sqlite': {'module': 'app_flask_api_server', 'config': 'gunicorn.conf.py', 'endpoints': SQLITE_ENDPOINTS},
+}
+
+class Server:
+    """gunicorn으로 띄운 API 서버 (with 블록을 벗어나면 종료)"""
+
+    def __init__(self, name, env, workers, threads):
+        spec = SERVERS[name]
+        self.name = name
+        self.port = free_port()
+        command = [sys.executable, '-m', 'gunicorn', f"{spec['module']}:app",
+                   '--bind', f'127.0.0.1:{self.port}', '--workers', str(workers),
+                   '--threads', str(threads), '--log-level', 'warning']
+        if spec['config']:
+            command += ['-c', spec['config']]
+        self.command = command
+        self.env = env
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.command, cwd=BACKEND_DIR, env=self.env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.name} 서버 시작 실패:\n{self.process.stderr.read().decode(errors='replace')}")
+            try:
+                status, _ = request_once(self.port, 'GET', '/api/health')
+                if status == 200:
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError(f"{self.name} 서버가 {SERVER_START_TIMEOUT}초 안에 시작되지 않았습니다.")
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+def encode_path(path):
+    """한글 지역 이름/검색어를 퍼센트 인코딩"""
+    return quote(path, safe='/?&=,')
+
+def request_once(port, method, path, body=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        conn.request(method, encode_path(path), payload, {'Content-Type': 'application/json'} if payload else {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+def run_load(port, make_request, ctx, concurrency, duration, seed=0):
+    """concurrency개 스레드가 duration초 동안 keep-alive 연결로 요청을 보내고 (응답 시간 목록, 오류 수, 경과 시간) 반환"""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        headers = {'Accept-Encoding': 'gzip', 'Content-Type': 'application/json'}
+        while time.perf_counter() < deadline:
+            method, path, body = make_request(rng, ctx)
+            payload = json.dumps(body).encode('utf-8') if body is not None else None
+            started = time.perf_counter()
+            try:
+                conn.request(method, encode_path(path), payload, headers)
+                response = conn.getresponse()
+                response.read()
+                ok = 200 <= response.status < 300
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                ok = False
+            if ok:
+                latencies[index].append(time.perf_counter() - started)
+            else:
+                errors[index] += 1
+        conn.close()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return [value for values in latencies for value in values], sum(errors), time.perf_counter() - started
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    latency = {'mean': sum(ordered) / len(ordered) * 1000 if ordered else 0.0}
+    for p in PERCENTILES:
+        latency[f'p{p}'] = percentile(ordered, p) * 1000
+    latency['max'] = ordered[-1] * 1000 if ordered else 0.0
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'rps': len(ordered) / elapsed if elapsed else 0.0,
+        'latency_ms': {key: round(value, 3) for key, value in latency.items()},
+    }
+
+def seed(server, rows, dsn, sqlite_path):
+    from seed_data import connect, seed_postgres, seed_sqlite
+    if server == 'postgres':
+        conn = connect(dsn)
+        try:
+            seed_postgres(conn, rows)
+        finally:
+            conn.close()
+    else:
+        seed_sqlite(sqlite_path, rows)
+
+def data_context(server, port, rows):
+    """요청 생성에 쓰는 지역 목록"""
+    if server == 'postgres':
+        _, body = request_once(port, 'GET', '/api/regions')
+        regions = [region['name'] for region in json.loads(body)['regions'] if region.get('level', 1) == 1]
+    else:
+        from seed_data import SQLITE_REGIONS
+        regions = list(SQLITE_REGIONS)
+    return {'rows': rows, 'regions': regions or ['서울']}
+
+def result_key(result):
+    return f"{result['server']}/{result['rows']}/{result['endpoint']}"
+
+def compare(results, baseline, tolerance):
+    """기준 결과 대비 회귀 항목 목록 [(key, 사유)]"""
+    base = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    print(f"\n📊 기준 결과 대비 (허용 오차 {tolerance * 100:.0f}%)")
+    print(f"   {'항목':<40}{'rps':>10}{'기준':>10}{'p99(ms)':>10}{'기준':>10}")
+    for result in results:
+        key = result_key(result)
+        old = base.get(key)
+        if old is None:
+            continue
+        rps, old_rps = result['rps'], old['rps']
+        p99, old_p99 = result['latency_ms']['p99'], old['latency_ms']['p99']
+        reasons = []
+        if old_rps and rps < old_rps * (1 - tolerance):
+            reasons.append(f"rps {(rps / old_rps - 1) * 100:.0f}%")
+        if p99 > old_p99 * (1 + tolerance) and p99 - old_p99 > MIN_P99_DELTA_MS:
+            reasons.append(f"p99 +{(p99 / old_p99 - 1) * 100 if old_p99 else 100:.0f}%")
+        if result['errors'] and not old['errors']:
+            reasons.append(f"오류 {result['errors']}개")
+        mark = '❌' if reasons else '  '
+        print(f" {mark}{key:<40}{rps:>10.1f}{old_rps:>10.1f}{p99:>10.1f}{old_p99:>10.1f}  {', '.join(reasons)}")
+        if reasons:
+            regressions.append((key, ', '.join(reasons)))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='API 부하 테스트 / 성능 회귀 검사')
+    parser.add_argument('--servers', default='postgres,sqlite', help='측정할 서버 (postgres,sqlite)')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='합성 정책 수 목록')
+    parser.add_argument('--endpoints', default=None, help='측정할 엔드포인트 이름 (기본값: 전체)')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 수')
+    parser.add_argument('--duration', type=float, default=5, help='엔드포인트별 측정 시간(초)')
+    parser.add_argument('--warmup', type=float, default=1, help='엔드포인트별 워밍업 시간(초)')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn 워커 수')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn 워커별 스레드 수')
+    parser.add_argument('--dsn', default=None, help='테스트용 PostgreSQL 접속 문자열 (기본값: DATABASE_URL)')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='가짜 OpenAI 서버 첫 토큰 시간(초)')
+    parser.add_argument('--llm-token-rate', type=float, default=0.0, help='가짜 OpenAI 서버 초당 토큰 수 (0이면 대기 없음)')
+    parser.add_argument('--output', default=DEFAULT_RESULTS, help='결과 JSON 파일')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='비교할 기준 결과 JSON 파일')
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준 결과로 저장')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='허용 오차 (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    servers = [name.strip() for name in args.servers.split(',') if name.strip()]
+    sizes = [int(size) for size in args.sizes.split(',')]
+    selected = set(args.endpoints.split(',')) if args.endpoints else None
+    dsn = args.dsn or os.getenv('DATABASE_URL')
+    if 'postgres' in servers and not dsn:
+        print("❌ PostgreSQL 측정에는 --dsn 또는 DATABASE_URL이 필요합니다.")
+        sys.exit(2)
+
+    from fake_openai_server import create_server
+    llm = create_server(port=0, latency=args.llm_latency, token_rate=args.llm_token_rate)
+    threading.Thread(target=llm.serve_forever, daemon=True).start()
+    sqlite_path = os.path.join(tempfile.mkdtemp(), 'welfare_policies.db')
+    env = dict(os.environ,
+               OPENAI_API_BASE=f"http://127.0.0.1:{llm.server_address[1]}/v1",
+               OPENAI_API_KEY='fake-key',
+               SQLITE_DB_PATH=sqlite_path,
+               FLASK_ENV='production')
+    if dsn:
+        env['DATABASE_URL'] = dsn
+
+    results = []
+    for server in servers:
+        endpoints = {name: make for name, make in SERVERS[server]['endpoints'].items()
+                     if selected is None or name in selected}
+        for rows in sizes:
+            seed(server, rows, dsn, sqlite_path)
+            with Server(server, env, args.workers, args.threads) as running:
+                ctx = data_context(server, running.port, rows)
+                print(f"\n🔄 {server} {rows}개 (동시 요청 {args.concurrency}, {args.duration}초)")
+                for name, make_request in endpoints.items():
+                    if args.warmup:
+                        run_load(running.port, make_request, ctx, args.concurrency, args.warmup)
+                    summary = summarize(*run_load(running.port, make_request, ctx, args.concurrency, args.duration, seed=1))
+                    results.append({'server': server, 'rows': rows, 'endpoint': name, **summary})
+                    latency = summary['latency_ms']
+                    print(f"   {name:<24}{summary['rps']:>9.1f} req/s  p50 {latency['p50']:>8.1f}ms  "
+                          f"p90 {latency['p90']:>8.1f}ms  p99 {latency['p99']:>8.1f}ms"
+                          + (f"  ⚠️ 오류 {summary['errors']}" if summary['errors'] else ''))
+    llm.shutdown()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'workers': args.workers,
+            'threads': args.threads,
+            'llm_latency': args.llm_latency,
+            'llm_token_rate': args.llm_token_rate,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 결과 저장: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ 기준 결과 저장: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ 성능 회귀 {len(regressions)}개")
+            sys.exit(1)
+        print("\n✅ 성능 회귀 없음")
+
+if __name__ == '__main__':
+    main()
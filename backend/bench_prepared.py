@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+prepared statement 성능 비교
+API 쿼리를 매번 SQL 문자열로 보내는 방식과 PREPARE 후 EXECUTE 하는 방식의 평균 응답 시간을 비교합니다.
+
+사용법:
+    python bench_prepared.py --iterations 2000
+    python bench_prepared.py --seed 10000 --dsn postgresql://postgres:pw@localhost:5432/welfare
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+import psycopg2
+
+from policy_queries import build_policy_list_query, build_policy_count_query
+from prepared_statements import (
+    FIXED_STATEMENTS, PreparedConnection, execute_fixed, execute_policy_list, execute_policy_count
+)
+from seed_data import connect, seed_postgres
+
+def sample_cases(cursor):
+    """측정할 쿼리와 대표 파라미터 구성 (이름, 일반 실행 함수, prepared 실행 함수)"""
+    cursor.execute("SELECT name FROM regions WHERE level = 1 ORDER BY id LIMIT 1")
+    region = cursor.fetchone()[0]
+    cursor.execute("SELECT MIN(id) FROM policies")
+    policy_id = cursor.fetchone()[0] or 1
+
+    fixed_params = {
+        'region_policies': (region,),
+        'increment_view_count': (policy_id,),
+        'policy_detail': (policy_id,),
+    }
+    cases = []
+    for name, sql in FIXED_STATEMENTS.items():
+        params = fixed_params.get(name, ())
+        cases.append((
+            name,
+            lambda cur, sql=sql, params=params: cur.execute(sql, params),
+            lambda cur, name=name, params=params: execute_fixed(cur, name, params),
+        ))
+
+    filters = {'region': region, 'age': 25}
+    list_query, list_params = build_policy_list_query(limit=10, **filters)
+    count_query, count_params = build_policy_count_query(**filters)
+    cases.append((
+        'policy_list[region+age]',
+        lambda cur: cur.execute(list_query, list_params),
+        lambda cur: execute_policy_list(cur, limit=10, **filters),
+    ))
+    cases.append((
+        'policy_count[region+age]',
+        lambda cur: cur.execute(count_query, count_params),
+        lambda cur: execute_policy_count(cur, **filters),
+    ))
+    return cases
+
+def measure(conn, run, iterations):
+    """쿼리 한 번의 평균/중앙값 시간(µs) 측정"""
+    cursor = conn.cursor()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run(cursor)
+        if cursor.description:
+            cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1e6)
+        # 조회수 증가 쿼리의 영향이 남지 않도록 롤백
+        conn.rollback()
+    return statistics.mean(timings), statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='prepared statement 성능 비교')
+    parser.add_argument('--dsn', help='PostgreSQL 접속 문자열 (기본값: DATABASE_URL)')
+    parser.add_argument('--seed', type=int, help='측정 전에 합성 정책 N개 생성')
+    parser.add_argument('--iterations', type=int, default=1000, help='쿼리별 반복 횟수')
+    args = parser.parse_args()
+
+    plain_conn = connect(args.dsn)
+    if args.seed:
+        seed_postgres(plain_conn, args.seed)
+    prepared_conn = psycopg2.connect(plain_conn.dsn, connection_factory=PreparedConnection)
+
+    try:
+        cases = sample_cases(plain_conn.cursor())
+        plain_conn.rollback()
+
+        print(f"📊 쿼리별 평균 시간 ({args.iterations}회, µs)")
+        print("-" * 78)
+        print(f"{'query':<28}{'plain mean':>12}{'prep mean':>12}{'plain p50':>12}{'prep p50':>12}")
+        for name, run_plain, run_prepared in cases:
+            # 준비 단계: PREPARE 및 캐시 워밍업
+            measure(plain_conn, run_plain, 10)
+            measure(prepared_conn, run_prepared, 10)
+            plain_mean, plain_p50 = measure(plain_conn, run_plain, args.iterations)
+            prep_mean, prep_p50 = measure(prepared_conn, run_prepared, args.iterations)
+            print(f"{name:<28}{plain_mean:>12.1f}{prep_mean:>12.1f}{plain_p50:>12.1f}{prep_p50:>12.1f}")
+
+    except Exception as e:
+        print(f"❌ 측정 실패: {e}")
+        sys.exit(1)
+    finally:
+        plain_conn.close()
+        prepared_conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+JSON 직렬화 성능 비교
+정책 1,000개 목록 응답을 만들 때 기존 방식(RealDictRow → dict 복사 → Flask 기본 jsonify)과
+튜플 행 → rows_as_dicts → FastJSONProvider(orjson / 표준 json) 방식의 시간을 비교합니다.
+
+사용법:
+    python bench_serialization.py
+    python bench_serialization.py --rows 1000 --iterations 200
+    python bench_serialization.py --dsn postgresql://postgres:pw@localhost:5432/welfare --seed 10000
+"""
+
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+
+import psycopg2.extras
+from flask import Flask, jsonify
+
+import serializers
+from policy_queries import build_policy_list_query
+from seed_data import generate_policies
+
+# POLICY_LIST_SELECT와 같은 컬럼 순서
+LIST_COLUMNS = ['id', 'title', 'description', 'url', 'conditions', 'benefits',
+                'application_period', 'support_amount_min', 'support_amount_max',
+                'age_min', 'age_max', 'status', 'priority', 'view_count',
+                'region_name', 'category_name', 'category_color', 'created_at', 'updated_at']
+
+def synthetic_rows(count):
+    """DB 없이 측정할 때 사용할 목록 쿼리 결과 (커서 description, 튜플 행)"""
+    rows = []
+    for i, policy in enumerate(generate_policies(count), 1):
+        policy.update(id=i, region_name='서울특별시', category_name='주거지원', category_color='#2196F3')
+        rows.append(tuple(policy[column] for column in LIST_COLUMNS))
+    cursor = SimpleNamespace(description=[(column,) for column in LIST_COLUMNS])
+    return cursor, rows
+
+def fetch_rows(dsn, count, seed=None):
+    """실제 DB에서 목록 쿼리 결과 조회 (튜플 커서)"""
+    from seed_data import connect, seed_postgres
+    conn = connect(dsn)
+    if seed:
+        seed_postgres(conn, seed)
+    cursor = conn.cursor()
+    query, params = build_policy_list_query(limit=count)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+    return cursor, rows
+
+def measure(run, iterations):
+    """한 번 실행의 평균/중앙값 시간(ms)"""
+    run()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings), statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 직렬화 성능 비교')
+    parser.add_argument('--rows', type=int, default=1000, help='응답에 담을 정책 수')
+    parser.add_argument('--iterations', type=int, default=200, help='방식별 반복 횟수')
+    parser.add_argument('--dsn', help='지정하면 합성 데이터 대신 PostgreSQL 목록 쿼리 결과 사용')
+    parser.add_argument('--seed', type=int, help='--dsn 사용 시 측정 전에 합성 정책 N개 생성')
+    args = parser.parse_args()
+
+    if args.dsn:
+        cursor, rows = fetch_rows(args.dsn, args.rows, args.seed)
+    else:
+        cursor, rows = synthetic_rows(args.rows)
+    columns = [column[0] for column in cursor.description]
+    # 기존 RealDictCursor가 돌려주던 행 (측정 대상은 dict 복사 + 직렬화)
+    real_dict_rows = [psycopg2.extras.RealDictRow(zip(columns, row)) for row in rows]
+
+    default_app = Flask('default')
+    fast_app = Flask('fast')
+    fast_app.json = serializers.FastJSONProvider(fast_app)
+
+    def payload(policies):
+        return {"success": True, "policies": policies, "total_count": len(rows), "limit": len(rows), "offset": 0}
+
+    def run_default():
+        with default_app.app_context():
+            return jsonify(payload([dict(policy) for policy in real_dict_rows])).get_data()
+
+    def run_fast():
+        with fast_app.app_context():
+            return jsonify(payload(serializers.rows_as_dicts(cursor, rows))).get_data()
+
+    cases = [('RealDictRow + Flask json', run_default)]
+    orjson_module = serializers.orjson
+    if orjson_module is not None:
+        cases.append(('tuple rows + orjson', run_fast))
+
+    def run_stdlib():
+        serializers.orjson = None
+        try:
+            return run_fast()
+        finally:
+            serializers.orjson = orjson_module
+    cases.append(('tuple rows + json fallback', run_stdlib))
+
+    print(f"📊 정책 {len(rows)}개 응답 직렬화 ({args.iterations}회, ms)")
+    print("-" * 64)
+    print(f"{'method':<30}{'mean':>10}{'p50':>10}{'bytes':>12}")
+    for name, run in cases:
+        mean, p50 = measure(run, args.iterations)
+        print(f"{name:<30}{mean:>10.2f}{p50:>10.2f}{len(run()):>12}")
+
+if __name__ == '__main__':
+    main()
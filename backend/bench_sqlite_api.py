@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+SQLite API 처리량 비교
+요청마다 새 연결을 열고 모든 행의 age_range를 json.loads 하던 기존 방식(기본 journal 모드)과
+WAL + 메모리 정책 스냅샷(policy_snapshot.py) 방식의 초당 요청 수를 비교합니다.
+
+사용법:
+    python bench_sqlite_api.py
+    python bench_sqlite_api.py --count 5000 --threads 8 --duration 5
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+def set_journal_mode(path, mode):
+    """DB 파일의 journal 모드 변경"""
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode = {mode}")
+    conn.close()
+
+def legacy_policies(path, where='', params=()):
+    """기존 핸들러 동작 재현: 요청마다 새 연결로 조회 후 행마다 age_range 디코딩"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT id, title, url, region, age_range, application_period, conditions, benefits
+        FROM welfare_policies
+        {where}
+    ''', params)
+    policies = []
+    for row in cursor.fetchall():
+        policy = dict(row)
+        policy['age_range'] = json.loads(policy['age_range']) if policy['age_range'] else []
+        policies.append(policy)
+    conn.close()
+    return policies
+
+def legacy_views(app, path):
+    """기존 방식의 지역별/전체 조회 핸들러 (요청마다 DB를 읽음)"""
+    from flask import jsonify
+
+    def get_policies_by_region(region):
+        policies = legacy_policies(path, 'WHERE region = ? ORDER BY title', (region,))
+        return jsonify({"success": True, "region": region, "count": len(policies), "policies": policies})
+
+    def get_all_policies():
+        policies = legacy_policies(path, 'ORDER BY region, title')
+        return jsonify({"success": True, "count": len(policies), "policies": policies})
+
+    return {'get_policies_by_region': get_policies_by_region, 'get_all_policies': get_all_policies}
+
+def run_load(app, url, threads, duration):
+    """여러 스레드에서 duration초 동안 요청을 보내고 초당 요청 수 반환"""
+    counts = [0] * threads
+    errors = [0] * threads
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            response = client.get(url)
+            if response.status_code == 200:
+                counts[index] += 1
+            else:
+                errors[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed, sum(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite API 처리량 비교')
+    parser.add_argument('--db', help='사용할 SQLite 파일 (기본값: 임시 파일에 합성 데이터 생성)')
+    parser.add_argument('--count', type=int, default=300, help='합성 정책 수')
+    parser.add_argument('--threads', type=int, default=8, help='동시 요청 스레드 수')
+    parser.add_argument('--duration', type=float, default=5, help='측정 시간(초)')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'welfare_policies.db')
+    # 앱(sqlite_db)이 import 시점에 DB 경로를 읽으므로 먼저 설정
+    os.environ['SQLITE_DB_PATH'] = db_path
+    if not args.db:
+        from seed_data import seed_sqlite
+        seed_sqlite(db_path, args.count)
+    import app_flask_api_server
+
+    urls = ['/api/health', '/api/policies/region/서울', '/api/policies']
+    app = app_flask_api_server.app
+    optimized_views = {name: app.view_functions[name] for name in ('get_policies_by_region', 'get_all_policies')}
+
+    results = {}
+    for mode, journal_mode, views in [
+        ('before', 'DELETE', legacy_views(app, db_path)),
+        ('after', 'WAL', optimized_views),
+    ]:
+        set_journal_mode(db_path, journal_mode)
+        app.view_functions.update(views)
+        for url in urls:
+            run_load(app, url, args.threads, 0.5)  # 워밍업
+            results[(mode, url)] = run_load(app, url, args.threads, args.duration)
+
+    print(f"\n📊 초당 요청 수 (스레드 {args.threads}개, {args.duration}초)")
+    print("-" * 72)
+    print(f"{'endpoint':<32}{'before':>12}{'after':>12}{'change':>10}")
+    for url in urls:
+        before, before_errors = results[('before', url)]
+        after, after_errors = results[('after', url)]
+        change = (after / before - 1) * 100 if before else 0
+        print(f"{url:<32}{before:>12.1f}{after:>12.1f}{change:>9.1f}%")
+        if before_errors or after_errors:
+            print(f"   ⚠️ 오류 응답: before {before_errors}, after {after_errors}")
+
+if __name__ == '__main__':
+    main()
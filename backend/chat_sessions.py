@@ -0,0 +1,386 @@
+"""
+/api/chat 대화 세션 (서버에 대화 기록 보관)
+클라이언트는 응답의 session_id를 다음 요청에 같이 보내기만 하면 이전 대화를 이어갈 수 있습니다.
+
+- 최근 CHAT_HISTORY_MAX_TURNS번의 질문/답변만 그대로 프롬프트에 넣고,
+  그보다 오래된 대화는 요약(CHAT_SUMMARY_MAX_CHARS자 이내)으로 합칩니다.
+  대화가 길어져도 프롬프트 크기가 일정하므로 토큰 수와 응답 시간이 늘어나지 않습니다.
+- 요약은 오래된 대화를 CHAT_HISTORY_KEEP_TURNS번만 남을 때까지 한 번에 모아서 LLM으로 만들고,
+  LLM을 쓸 수 없으면 사용자 질문을 짧게 이어 붙인 요약으로 대신합니다.
+  응답 시간이 늘지 않도록 답변을 저장한 뒤 백그라운드 스레드(한 개)에서 만들어 세션에 반영합니다.
+- 저장소 (CHAT_SESSION_STORE)
+    memory:   워커 프로세스 메모리 (최대 CHAT_SESSION_MAX개, 오래 안 쓴 세션부터 삭제)
+              워커끼리 공유되지 않으므로 gunicorn 워커가 하나일 때만 사용하세요.
+    database: PostgreSQL API는 chat_sessions 테이블, SQLite API는 별도 SQLite 파일(CHAT_SESSION_DB)
+              (gunicorn 워커끼리 세션 공유, 기본값)
+  마지막 사용 후 CHAT_SESSION_TTL초가 지난 세션은 만료됩니다.
+
+엔드포인트:
+    POST   /api/chat  {"message": "...", "session_id": "..."}   (session_id가 없거나 만료되면 새 세션)
+    GET    /api/chat/sessions/<session_id>                      요약과 최근 대화
+    DELETE /api/chat/sessions/<session_id>                      세션 삭제
+"""
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import jsonify
+
+from llm_client import LLMUnavailable
+
+CHAT_SESSION_TTL = float(os.getenv('CHAT_SESSION_TTL', 1800))
+CHAT_SESSION_MAX = int(os.getenv('CHAT_SESSION_MAX', 10000))
+CHAT_HISTORY_MAX_TURNS = int(os.getenv('CHAT_HISTORY_MAX_TURNS', 6))
+CHAT_HISTORY_KEEP_TURNS = int(os.getenv('CHAT_HISTORY_KEEP_TURNS', 2))
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv('CHAT_SUMMARY_MAX_CHARS', 800))
+# 프롬프트에 넣는 메시지 하나의 최대 길이
+CHAT_MESSAGE_MAX_CHARS = 1500
+# database 저장소에서 만료 세션을 지우는 간격(초)
+PRUNE_INTERVAL = 300
+# 요약을 저장하는 사이 세션이 바뀌었을 때 다시 읽어 적용하는 횟수
+COMPACT_RETRIES = 3
+
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+SUMMARY_PROMPT = """다음은 복지정책 상담 대화입니다. 이후 상담에 필요한 정보만 남겨 {max_chars}자 이내의 한국어로 요약하세요.
+사용자의 지역, 나이, 소득, 관심 분야 등 상황과 이미 안내한 정책 이름, 아직 해결되지 않은 질문을 포함하세요."""
+
+def new_session(session_id=None):
+    return {'id': session_id or secrets.token_urlsafe(16), 'summary': '', 'messages': [], 'updated_at': time.time()}
+
+class MemorySessionStore:
+    """프로세스 메모리 세션 저장소 (LRU + TTL)"""
+
+    def __init__(self, ttl=CHAT_SESSION_TTL, max_sessions=CHAT_SESSION_MAX):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.time() - session['updated_at'] > self.ttl:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return {**session, 'messages': list(session['messages'])}
+
+    def save(self, session):
+        session['updated_at'] = time.time()
+        with self._lock:
+            self._sessions[session['id']] = session
+            self._sessions.move_to_end(session['id'])
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def replace(self, session, read):
+        """read(get으로 읽은 세션) 이후 바뀌지 않았을 때만 저장 (저장했으면 True)"""
+        with self._lock:
+            current = self._sessions.get(session['id'])
+            if (current is None or current['updated_at'] != read['updated_at']
+                    or len(current['messages']) != len(read['messages'])):
+                return False
+            session['updated_at'] = time.time()
+            self._sessions[session['id']] = session
+            return True
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+class DatabaseSessionStore:
+    """PostgreSQL chat_sessions 테이블 세션 저장소 (schema_migrations에서 테이블 생성)"""
+
+    def __init__(self, get_connection, release_connection, ttl=CHAT_SESSION_TTL):
+        self.get_connection = get_connection
+        self.release_connection = release_connection
+        self.ttl = ttl
+        self._pruned_at = 0.0
+
+    def _execute(self, sql, params, fetch=False):
+        conn = self.get_connection()
+        if not conn:
+            raise RuntimeError("데이터베이스 연결 실패")
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            result = cursor.fetchone() if fetch else cursor.rowcount
+            conn.commit()
+            return result
+        finally:
+            self.release_connection(conn)
+
+    def get(self, session_id):
+        row = self._execute(
+            "SELECT summary, messages, EXTRACT(EPOCH FROM updated_at) FROM chat_sessions "
+            "WHERE id = %s AND updated_at > CURRENT_TIMESTAMP - make_interval(secs => %s)",
+            (session_id, self.ttl), fetch=True)
+        if row is None:
+            return None
+        summary, messages, updated_at = row
+        return {'id': session_id, 'summary': summary, 'messages': messages, 'updated_at': float(updated_at)}
+
+    def save(self, session):
+        self._execute(
+            "INSERT INTO chat_sessions (id, summary, messages, updated_at) "
+            "VALUES (%s, %s, %s::jsonb, CURRENT_TIMESTAMP) "
+            "ON CONFLICT (id) DO UPDATE SET summary = EXCLUDED.summary, messages = EXCLUDED.messages, "
+            "updated_at = EXCLUDED.updated_at",
+            (session['id'], session['summary'], json.dumps(session['messages'], ensure_ascii=False)))
+        session['updated_at'] = time.time()
+        if time.monotonic() - self._pruned_at > PRUNE_INTERVAL:
+            self._pruned_at = time.monotonic()
+            self.prune()
+
+    def replace(self, session, read):
+        """read(get으로 읽은 세션) 이후 바뀌지 않았을 때만 저장 (저장했으면 True)
+
+        질문/답변은 뒤에 붙기만 하고 요약은 앞부분을 바꾸므로 요약과 메시지 수가 같으면 바뀌지 않은 세션입니다.
+        (updated_at은 epoch 실수로 돌려주므로 정확한 비교에 쓰지 않음)
+        """
+        updated = self._execute(
+            "UPDATE chat_sessions SET summary = %s, messages = %s::jsonb, updated_at = CURRENT_TIMESTAMP "
+            "WHERE id = %s AND summary = %s AND jsonb_array_length(messages) = %s",
+            (session['summary'], json.dumps(session['messages'], ensure_ascii=False),
+             session['id'], read['summary'], len(read['messages'])))
+        if updated:
+            session['updated_at'] = time.time()
+        return updated > 0
+
+    def delete(self, session_id):
+        return self._execute("DELETE FROM chat_sessions WHERE id = %s", (session_id,)) > 0
+
+    def prune(self):
+        """만료된 세션 삭제"""
+        return self._execute(
+            "DELETE FROM chat_sessions WHERE updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)",
+            (self.ttl,))
+
+class SqliteSessionStore:
+    """SQLite 파일 세션 저장소 (SQLite API용, 스레드별 쓰기 연결)
+
+    정책 DB에 쓰면 파일 수정 시각(데이터 버전)이 바뀌어 스냅샷과 HTTP 캐시가 무효화되므로 별도 파일을 사용합니다.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS chat_sessions (
+            id TEXT PRIMARY KEY,
+            summary TEXT NOT NULL DEFAULT '',
+            messages TEXT NOT NULL DEFAULT '[]',
+            updated_at REAL NOT NULL
+        )
+    '''
+
+    def __init__(self, path, ttl=CHAT_SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._pruned_at = 0.0
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(self.SCHEMA)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated_at ON chat_sessions(updated_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # autocommit: 문장마다 바로 커밋해 다른 워커의 쓰기를 오래 막지 않음
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id):
+        row = self._connection().execute(
+            "SELECT summary, messages, updated_at FROM chat_sessions WHERE id = ? AND updated_at > ?",
+            (session_id, time.time() - self.ttl)).fetchone()
+        if row is None:
+            return None
+        summary, messages, updated_at = row
+        return {'id': session_id, 'summary': summary, 'messages': json.loads(messages), 'updated_at': updated_at}
+
+    def save(self, session):
+        session['updated_at'] = time.time()
+        self._connection().execute(
+            "INSERT INTO chat_sessions (id, summary, messages, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET summary = excluded.summary, messages = excluded.messages, "
+            "updated_at = excluded.updated_at",
+            (session['id'], session['summary'], json.dumps(session['messages'], ensure_ascii=False),
+             session['updated_at']))
+        if time.monotonic() - self._pruned_at > PRUNE_INTERVAL:
+            self._pruned_at = time.monotonic()
+            self.prune()
+
+    def replace(self, session, read):
+        """read(get으로 읽은 세션) 이후 바뀌지 않았을 때만 저장 (저장했으면 True)"""
+        updated_at = time.time()
+        updated = self._connection().execute(
+            "UPDATE chat_sessions SET summary = ?, messages = ?, updated_at = ? WHERE id = ? AND updated_at = ?",
+            (session['summary'], json.dumps(session['messages'], ensure_ascii=False), updated_at,
+             session['id'], read['updated_at'])).rowcount
+        if updated:
+            session['updated_at'] = updated_at
+        return updated > 0
+
+    def delete(self, session_id):
+        return self._connection().execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,)).rowcount > 0
+
+    def prune(self):
+        """만료된 세션 삭제"""
+        return self._connection().execute(
+            "DELETE FROM chat_sessions WHERE updated_at < ?", (time.time() - self.ttl,)).rowcount
+
+def truncate(text, max_chars):
+    return text if len(text) <= max_chars else text[:max_chars - 1] + '…'
+
+def fallback_summary(previous, messages, max_chars=CHAT_SUMMARY_MAX_CHARS):
+    """LLM 없이 만드는 요약: 이전 요약 + 사용자 질문 (길면 오래된 내용부터 자름)"""
+    questions = [truncate(message['content'], 100) for message in messages if message['role'] == 'user']
+    summary = ' / '.join(part for part in [previous, *(f"사용자: {question}" for question in questions)] if part)
+    return summary if len(summary) <= max_chars else '…' + summary[-(max_chars - 1):]
+
+class ChatSessions:
+    """세션 불러오기, 프롬프트 구성, 대화 기록과 요약"""
+
+    def __init__(self, store, llm, max_turns=CHAT_HISTORY_MAX_TURNS, keep_turns=CHAT_HISTORY_KEEP_TURNS,
+                 summary_max_chars=CHAT_SUMMARY_MAX_CHARS):
+        self.store = store
+        self.llm = llm
+        self.max_turns = max_turns
+        self.keep_turns = min(keep_turns, max_turns)
+        self.summary_max_chars = summary_max_chars
+        # 요약은 한 번에 하나씩 (LLM 동시 호출 자리를 사용자 요청에 남겨 둠)
+        self._summarizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-summary')
+        self._summarizing = set()
+        self._lock = threading.Lock()
+
+    def load(self, session_id):
+        """세션 (없거나 만료됐거나 형식이 잘못된 id면 새 세션)"""
+        if isinstance(session_id, str) and SESSION_ID_PATTERN.match(session_id):
+            try:
+                session = self.store.get(session_id)
+            except Exception as e:
+                print(f"⚠️ 대화 세션 조회 실패: {e}")
+                session = None
+            if session is not None:
+                return session
+        return new_session()
+
+    def prompt_messages(self, session, system_prompt, user_message):
+        """시스템 프롬프트 + 이전 대화 요약 + 최근 대화 + 이번 질문"""
+        messages = [{"role": "system", "content": system_prompt}]
+        if session['summary']:
+            messages.append({"role": "system", "content": f"이전 대화 요약: {session['summary']}"})
+        messages += [{"role": message['role'], "content": truncate(message['content'], CHAT_MESSAGE_MAX_CHARS)}
+                     for message in session['messages']]
+        messages.append({"role": "user", "content": truncate(user_message, CHAT_MESSAGE_MAX_CHARS)})
+        return messages
+
+    def record(self, session, user_message, reply):
+        """질문/답변을 기록해 저장하고, 대화가 길면 오래된 대화 요약을 백그라운드로 요청"""
+        session['messages'] += [{"role": "user", "content": user_message}, {"role": "assistant", "content": reply}]
+        try:
+            self.store.save(session)
+        except Exception as e:
+            print(f"⚠️ 대화 세션 저장 실패: {e}")
+            return
+        if len(session['messages']) > self.max_turns * 2:
+            split = len(session['messages']) - self.keep_turns * 2
+            with self._lock:
+                if session['id'] in self._summarizing:
+                    return
+                self._summarizing.add(session['id'])
+            self._summarizer.submit(self.compact, session['id'], session['summary'], session['messages'][:split])
+
+    def compact(self, session_id, previous, old):
+        """오래된 대화를 요약으로 합쳐 저장 (요약한 대화가 아직 세션 앞에 있을 때만)
+
+        읽은 뒤 다른 요청이 질문/답변을 기록했으면 저장하지 않고 다시 읽어 적용합니다.
+        (COMPACT_RETRIES번 모두 실패하면 이번 요약은 버리고 다음 기록 때 다시 요약)
+        """
+        try:
+            summary = self.summarize(previous, old)
+            for _ in range(COMPACT_RETRIES):
+                read = self.store.get(session_id)
+                if read is None or read['summary'] != previous or read['messages'][:len(old)] != old:
+                    return
+                session = {**read, 'summary': summary, 'messages': read['messages'][len(old):]}
+                if self.store.replace(session, read):
+                    return
+            print(f"⚠️ 대화 요약 저장 건너뜀: 세션이 계속 바뀌고 있습니다 ({session_id})")
+        except Exception as e:
+            print(f"⚠️ 대화 요약 저장 실패: {e}")
+        finally:
+            with self._lock:
+                self._summarizing.discard(session_id)
+
+    def summarize(self, previous, messages):
+        """이전 요약과 오래된 대화를 요약 하나로 합침"""
+        transcript = '\n'.join(
+            f"{'사용자' if message['role'] == 'user' else '상담사'}: {truncate(message['content'], 500)}"
+            for message in messages)
+        if previous:
+            transcript = f"이전 요약: {previous}\n{transcript}"
+        try:
+            response = self.llm.chat(
+                messages=[
+                    {"role": "system", "content": SUMMARY_PROMPT.format(max_chars=self.summary_max_chars)},
+                    {"role": "user", "content": transcript}
+                ],
+                max_tokens=300,
+                temperature=0.2
+            )
+            return truncate(response.choices[0].message.content.strip(), self.summary_max_chars)
+        except LLMUnavailable as e:
+            print(f"⚠️ 대화 요약 대체 ({e.reason})")
+            return fallback_summary(previous, messages, self.summary_max_chars)
+
+    def view(self, session_id):
+        """GET /api/chat/sessions/<session_id>"""
+        session = self.store.get(session_id) if SESSION_ID_PATTERN.match(session_id) else None
+        if session is None:
+            return jsonify({"success": False, "error": "대화 세션을 찾을 수 없습니다."}), 404
+        return jsonify({
+            "success": True,
+            "session_id": session['id'],
+            "summary": session['summary'],
+            "messages": session['messages'],
+        })
+
+    def end(self, session_id):
+        """DELETE /api/chat/sessions/<session_id>"""
+        if not SESSION_ID_PATTERN.match(session_id) or not self.store.delete(session_id):
+            return jsonify({"success": False, "error": "대화 세션을 찾을 수 없습니다."}), 404
+        return jsonify({"success": True})
+
+def init_chat_sessions(app, llm, get_connection=None, release_connection=None, sqlite_path=None):
+    """대화 세션 저장소와 세션 조회/삭제 엔드포인트 등록
+
+    PostgreSQL 연결 함수(get_connection)나 세션 SQLite 파일 경로(sqlite_path)가 있으면 database 저장소가 기본값입니다.
+    """
+    has_database = get_connection is not None or sqlite_path is not None
+    kind = os.getenv('CHAT_SESSION_STORE', 'database' if has_database else 'memory').lower()
+    if kind == 'database' and get_connection is not None:
+        store = DatabaseSessionStore(get_connection, release_connection)
+    elif kind == 'database' and sqlite_path is not None:
+        store = SqliteSessionStore(sqlite_path)
+    else:
+        if kind == 'database':
+            print("⚠️ 이 서버는 database 대화 세션 저장소를 지원하지 않아 memory를 사용합니다.")
+        kind = 'memory'
+        store = MemorySessionStore()
+    sessions = ChatSessions(store, llm)
+    app.add_url_rule('/api/chat/sessions/<session_id>', 'view_chat_session', sessions.view, methods=['GET'])
+    app.add_url_rule('/api/chat/sessions/<session_id>', 'end_chat_session', sessions.end, methods=['DELETE'])
+    print(f"✅ 대화 세션: {kind} 저장소, 최근 {CHAT_HISTORY_MAX_TURNS}턴 + 요약, {CHAT_SESSION_TTL:.0f}초 후 만료")
+    return sessions
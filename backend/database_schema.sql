@@ -47,6 +47,7 @@ CREATE TABLE IF NOT EXISTS policies (
     support_amount_max INTEGER,
     conditions TEXT,
     benefits TEXT,
+    application_period TEXT,  -- 신청기간 (크롤링 원문)
     application_method TEXT,
     required_documents TEXT,
     contact_info TEXT,
@@ -57,6 +58,18 @@ CREATE TABLE IF NOT EXISTS policies (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 기존 데이터베이스 호환: 신청기간 컬럼 추가
+ALTER TABLE policies ADD COLUMN IF NOT EXISTS application_period TEXT;
+
+-- 연령 조건 범위 (age_min/age_max에서 자동 계산, 둘 다 NULL이면 전체 연령)
+ALTER TABLE policies ADD COLUMN IF NOT EXISTS age_range int4range GENERATED ALWAYS AS (
+    CASE
+        WHEN age_min IS NULL AND age_max IS NULL THEN int4range(NULL, NULL)
+        WHEN age_min IS NULL OR age_max IS NULL OR age_min > age_max THEN 'empty'::int4range
+        ELSE int4range(age_min, age_max, '[]')
+    END
+) STORED;
+
 -- 정책 태그 테이블
 CREATE TABLE IF NOT EXISTS tags (
     id SERIAL PRIMARY KEY,
@@ -89,6 +102,16 @@ CREATE TABLE IF NOT EXISTS search_history (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- AI 챗봇 대화 세션 (최근 대화 + 오래된 대화 요약, chat_sessions.py)
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL DEFAULT '',
+    messages JSONB NOT NULL DEFAULT '[]',
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated_at ON chat_sessions(updated_at);
+
 -- 정책 조회 로그 테이블
 CREATE TABLE IF NOT EXISTS policy_views (
     id SERIAL PRIMARY KEY,
@@ -105,6 +128,7 @@ CREATE INDEX IF NOT EXISTS idx_policies_category ON policies(category_id);
 CREATE INDEX IF NOT EXISTS idx_policies_status ON policies(status);
 CREATE INDEX IF NOT EXISTS idx_policies_age ON policies(age_min, age_max);
 CREATE INDEX IF NOT EXISTS idx_policies_application_date ON policies(application_start, application_end);
+CREATE INDEX IF NOT EXISTS idx_policies_url ON policies(url);
 CREATE INDEX IF NOT EXISTS idx_policies_title ON policies USING gin(to_tsvector('simple', title));
 CREATE INDEX IF NOT EXISTS idx_policies_description ON policies USING gin(to_tsvector('simple', description));
 CREATE INDEX IF NOT EXISTS idx_policies_conditions ON policies USING gin(to_tsvector('simple', conditions));
@@ -114,6 +138,9 @@ CREATE INDEX IF NOT EXISTS idx_policies_benefits ON policies USING gin(to_tsvect
 CREATE INDEX IF NOT EXISTS idx_policies_search ON policies(region_id, category_id, age_min, age_max, status);
 CREATE INDEX IF NOT EXISTS idx_policies_popular ON policies(status, priority, view_count DESC);
 
+-- 활성 정책 조회용 부분/커버링 인덱스(idx_policies_age_range, idx_policies_active_*)는
+-- schema_migrations.py의 POLICY_INDEXES에서 생성합니다.
+
 -- 트리거 함수: updated_at 자동 업데이트
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -127,6 +154,39 @@ $$ language 'plpgsql';
 CREATE TRIGGER update_policies_updated_at BEFORE UPDATE ON policies
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- 정책 데이터 버전 (HTTP ETag/Last-Modified 계산용, 항상 한 행)
+CREATE TABLE IF NOT EXISTS policy_data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO policy_data_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+-- 트리거 함수: 응답 내용이 바뀌는 변경이 있으면 데이터 버전 증가
+CREATE OR REPLACE FUNCTION bump_policy_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE policy_data_version SET version = version + 1, updated_at = clock_timestamp();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 조회수(view_count) 변경은 제외
+CREATE TRIGGER policies_bump_data_version
+    AFTER INSERT OR DELETE OR TRUNCATE OR UPDATE OF
+        title, description, url, region_id, category_id, age_min, age_max,
+        income_min, income_max, application_start, application_end,
+        support_amount_min, support_amount_max, conditions, benefits, application_period,
+        application_method, required_documents, contact_info, status, priority
+    ON policies FOR EACH STATEMENT EXECUTE FUNCTION bump_policy_data_version();
+
+CREATE TRIGGER regions_bump_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON regions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_policy_data_version();
+
+CREATE TRIGGER categories_bump_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_policy_data_version();
+
 -- 기본 데이터 삽입
 INSERT INTO regions (code, name, level) VALUES
 ('11', '서울특별시', 1),
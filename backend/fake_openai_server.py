@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+로컬 가짜 OpenAI 서버 (성능 측정/장애 테스트용)
+/api/chat을 실제 모델 없이 측정할 수 있도록 ChatCompletion API 형식(stream=true 포함)으로 고정 답변을 돌려줍니다.
+앱의 OPENAI_API_BASE를 이 서버 주소로 설정하면 됩니다.
+
+- 응답 시간: 첫 토큰까지 --latency초(±--jitter) + 답변 토큰마다 1/--token-rate초
+- 오류 주입: --error-rate 비율의 요청에 --error-status 중 하나로 실패 응답 (429/500/503 등)
+- 응답 지연 주입: --hang-rate 비율의 요청은 --hang초 동안 응답하지 않음 (앱의 타임아웃 확인)
+- GET /stats: 받은 요청 수, 주입한 오류/지연 수, 처리 중인 요청 수
+
+사용법:
+    python fake_openai_server.py --port 8089 --latency 0.3 --token-rate 50
+    python fake_openai_server.py --error-rate 0.2 --error-status 429,503 --hang-rate 0.05 --hang 30
+    OPENAI_API_BASE=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake python app_postgresql_api.py
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = ("입력하신 조건에 맞는 정책으로 청년 월세 지원사업을 추천드립니다. "
+                 "신청 기간과 자격 조건을 확인하신 뒤 주민센터나 온라인으로 신청하세요.")
+ERROR_TYPES = {
+    400: 'invalid_request_error',
+    401: 'authentication_error',
+    429: 'rate_limit_error',
+    500: 'server_error',
+    503: 'server_error',
+}
+
+def split_tokens(text):
+    """토큰 근사값: 공백 단위 (공백은 앞 토큰에 붙여 이어 붙이면 원문이 됨)"""
+    return re.findall(r'\S+\s*', text)
+
+def count_tokens(text):
+    return len(split_tokens(text))
+
+def error_body(status, message):
+    return {"error": {"message": message, "type": ERROR_TYPES.get(status, 'server_error'), "code": None}}
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=()):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            return self.send_json(200, self.server.stats())
+        if self.path.rstrip('/').endswith('/models'):
+            return self.send_json(200, {"object": "list", "data": [{"id": self.server.model, "object": "model"}]})
+        self.send_json(404, error_body(404, f"unknown path {self.path}"))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self.send_json(400, error_body(400, "invalid JSON"))
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self.send_json(404, error_body(404, f"unknown path {self.path}"))
+        if not isinstance(request.get('messages'), list):
+            return self.send_json(400, error_body(400, "'messages' is a required property"))
+
+        server = self.server
+        server.count('requests')
+        with server.active():
+            fault = server.pick_fault()
+            if fault == 'hang':
+                time.sleep(server.hang)
+            elif fault is not None:
+                time.sleep(server.first_token_delay())
+                headers = [('Retry-After', '1')] if fault == 429 else []
+                return self.send_json(fault, error_body(fault, f"injected error ({fault})"), headers)
+            if request.get('stream'):
+                self.stream_completion(request)
+            else:
+                self.send_completion(request)
+
+    def completion(self, request):
+        """(응답 id, 모델, 답변 토큰 목록, finish_reason, usage)"""
+        prompt = ' '.join(str(message.get('content', '')) for message in request['messages'])
+        tokens = split_tokens(self.server.reply)
+        finish_reason = 'stop'
+        max_tokens = request.get('max_tokens')
+        if isinstance(max_tokens, int) and len(tokens) > max_tokens:
+            tokens = tokens[:max_tokens]
+            finish_reason = 'length'
+        prompt_tokens = count_tokens(prompt)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+        return f"chatcmpl-{uuid.uuid4().hex[:24]}", request.get('model', self.server.model), tokens, finish_reason, usage
+
+    def send_completion(self, request):
+        completion_id, model, tokens, finish_reason, usage = self.completion(request)
+        time.sleep(self.server.first_token_delay() + len(tokens) * self.server.token_interval)
+        self.send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": ''.join(tokens)},
+                "finish_reason": finish_reason,
+            }],
+            "usage": usage,
+        })
+
+    def stream_completion(self, request):
+        """stream=true: 토큰마다 chat.completion.chunk를 server-sent events로 전송"""
+        completion_id, model, tokens, finish_reason, _ = self.completion(request)
+        created = int(time.time())
+
+        def chunk(delta, finish=None):
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        time.sleep(self.server.first_token_delay())
+        events = [chunk({"role": "assistant"})]
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(self.server.token_interval)
+            events.append(chunk({"content": token}))
+            self.write_events(events)
+            events = []
+        self.write_events(events + [chunk({}, finish_reason)])
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def write_events(self, events):
+        for event in events:
+            self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, jitter=0.0, token_rate=0.0, error_rate=0.0,
+                 error_statuses=(500,), hang_rate=0.0, hang=30.0, reply=DEFAULT_REPLY,
+                 model='gpt-3.5-turbo', seed=None):
+        super().__init__(address, FakeOpenAIHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.token_interval = 1 / token_rate if token_rate else 0.0
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.hang_rate = hang_rate
+        self.hang = hang
+        self.reply = reply
+        self.model = model
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {'requests': 0, 'errors': 0, 'hangs': 0, 'in_flight': 0}
+
+    def handle_error(self, request, client_address):
+        # 앱이 타임아웃으로 먼저 끊은 연결은 무시
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    @contextmanager
+    def active(self):
+        self.count('in_flight')
+        try:
+            yield
+        finally:
+            self.count('in_flight', -1)
+
+    def pick_fault(self):
+        """주입할 장애: None, 'hang' 또는 오류 상태 코드"""
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.hang_rate:
+                self._counts['hangs'] += 1
+                return 'hang'
+            if roll < self.hang_rate + self.error_rate:
+                self._counts['errors'] += 1
+                return self._random.choice(self.error_statuses)
+            return None
+
+    def first_token_delay(self):
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+def create_server(host='127.0.0.1', port=8089, **options):
+    """가짜 서버 생성 (port=0이면 빈 포트 사용, server.server_address로 확인)"""
+    return FakeOpenAIServer((host, port), **options)
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 가짜 OpenAI 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0, help='첫 토큰까지의 시간(초)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='첫 토큰 시간의 무작위 편차(초)')
+    parser.add_argument('--token-rate', type=float, default=0.0, help='초당 생성 토큰 수 (0이면 대기 없음)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='오류 응답 비율 (0~1)')
+    parser.add_argument('--error-status', default='500', help='주입할 오류 상태 코드 목록 (예: 429,500,503)')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='응답하지 않는 요청 비율 (0~1)')
+    parser.add_argument('--hang', type=float, default=30.0, help='응답하지 않는 시간(초)')
+    parser.add_argument('--reply', default=DEFAULT_REPLY, help='답변 내용')
+    parser.add_argument('--seed', type=int, default=None, help='장애 주입 난수 시드 (재현용)')
+    args = parser.parse_args()
+
+    server = create_server(
+        args.host, args.port, latency=args.latency, jitter=args.jitter, token_rate=args.token_rate,
+        error_rate=args.error_rate, error_statuses=[int(status) for status in args.error_status.split(',')],
+        hang_rate=args.hang_rate, hang=args.hang, reply=args.reply, seed=args.seed,
+    )
+    print(f"🤖 가짜 OpenAI 서버: http://{args.host}:{server.server_address[1]}/v1")
+    print(f"   첫 토큰 {args.latency}s, 토큰 {args.token_rate or '∞'}/s, "
+          f"오류 {args.error_rate * 100:.0f}%, 지연 {args.hang_rate * 100:.0f}%")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+gunicorn 설정 (backend 디렉토리에서 실행)
+    gunicorn -c gunicorn.conf.py app_postgresql_api:app --bind 0.0.0.0:$PORT --workers 2
+    gunicorn -c gunicorn.conf.py app_flask_api_server:app --bind 0.0.0.0:$PORT --workers 2
+
+PostgreSQL API는 마스터 프로세스가 정책 스냅샷 파일을 한 번 만들고 데이터가 바뀔 때마다 교체합니다.
+워커는 이 파일을 읽기 전용 mmap으로 공유하므로 워커마다 정책 데이터를 따로 읽어 두지 않습니다.
+/metrics와 /api/admin/queries는 워커별 파일(METRICS_MULTIPROC_DIR)을 합쳐 서버 전체 값으로 응답합니다.
+"""
+
+import os
+import shutil
+import tempfile
+
+from shared_snapshot import default_snapshot_path
+
+# POLICY_SNAPSHOT_FILE을 지정하지 않으면 이 마스터 전용 파일(이름에 pid 포함)을 만들고 종료할 때 지움
+# (환경 변수는 on_starting에서 첫 스냅샷 파일을 쓴 뒤에만 설정)
+_snapshot_enabled = os.getenv('POLICY_SNAPSHOT', 'true').lower() == 'true'
+_snapshot_path = os.getenv('POLICY_SNAPSHOT_FILE')
+_owned_path = None
+if _snapshot_enabled and not _snapshot_path:
+    _snapshot_path = _owned_path = default_snapshot_path()
+
+# METRICS_MULTIPROC_DIR을 지정하지 않으면 이 마스터 전용 디렉토리를 만들고 종료할 때 지움
+_owned_metrics_dir = None
+if os.getenv('METRICS_ENABLED', 'true').lower() == 'true' and not os.getenv('METRICS_MULTIPROC_DIR'):
+    _owned_metrics_dir = os.environ['METRICS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='welfare_metrics-')
+
+_publisher = None
+
+def on_starting(server):
+    """마스터 시작: 워커를 띄우기 전에 첫 스냅샷 파일을 만들고 갱신 스레드 시작 (PostgreSQL API만)
+
+    첫 파일을 쓰지 못하면 워커는 공유 파일 없이 각자 스냅샷을 로드합니다.
+    """
+    global _publisher
+    # 앱을 위치 인자로 넘기면(gunicorn ... app_postgresql_api:app) cfg.wsgi_app은 비어 있고 app_uri에만 있음
+    app_uri = getattr(server.app, 'app_uri', None) or server.cfg.wsgi_app or ''
+    if not _snapshot_enabled or not app_uri.startswith('app_postgresql_api'):
+        return
+    # 마스터에서 앱 모듈을 한 번 import하면 DB 초기화도 워커마다 반복되지 않음
+    # (워커는 이미 import된 모듈을 그대로 물려받으므로 읽을 곳을 여기서 정해 둠)
+    import app_postgresql_api
+    _publisher = app_postgresql_api.create_snapshot_publisher(_snapshot_path)
+    if _publisher.start():
+        os.environ['POLICY_SNAPSHOT_FILE'] = _snapshot_path
+        app_postgresql_api.use_snapshot_file(_snapshot_path)
+        server.log.info("공유 정책 스냅샷 사용: %s", _snapshot_path)
+    else:
+        _publisher.stop(remove=_owned_path is not None)
+        _publisher = None
+        os.environ.pop('POLICY_SNAPSHOT_FILE', None)
+        app_postgresql_api.use_snapshot_file(None)
+        server.log.error("❌ 공유 정책 스냅샷 파일을 만들지 못해 워커마다 스냅샷을 직접 로드합니다: %s", _snapshot_path)
+
+def child_exit(server, worker):
+    """워커 종료: 측정값/쿼리 통계 파일을 archive.json에 합쳐 카운터가 줄어들지 않게 함"""
+    if os.getenv('METRICS_MULTIPROC_DIR'):
+        from request_metrics import REGISTRY
+        REGISTRY.mark_process_dead(worker.pid)
+        from query_profiler import query_profiler
+        if query_profiler.directory is not None:
+            query_profiler.mark_process_dead(worker.pid)
+
+def on_exit(server):
+    """마스터 종료: 갱신 중단 후 이 마스터가 만든 스냅샷 파일/측정값 디렉토리만 삭제"""
+    if _publisher is not None:
+        _publisher.stop(remove=_publisher.path == _owned_path)
+    if _owned_metrics_dir is not None:
+        shutil.rmtree(_owned_metrics_dir, ignore_errors=True)
@@ -0,0 +1,164 @@
+"""
+HTTP 응답 압축과 캐시 검증 헤더
+- 일정 크기 이상의 JSON 응답은 gzip/brotli로 압축합니다. (brotli는 설치되어 있을 때만)
+- 조회 API는 정책 데이터 버전으로 ETag/Last-Modified를 만들고,
+  클라이언트 캐시가 최신이면 쿼리와 직렬화 없이 304를 돌려줍니다.
+"""
+
+import gzip
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import make_response, request
+from werkzeug.http import is_resource_modified
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 gzip만 사용
+    brotli = None
+
+# 이 크기(bytes)보다 작은 응답은 압축하지 않음
+COMPRESS_MIN_SIZE = int(os.getenv('HTTP_COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.getenv('HTTP_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('HTTP_BROTLI_QUALITY', 5))
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html'}
+
+# 데이터 버전을 DB에서 다시 읽기 전까지 재사용하는 시간(초)
+DATA_VERSION_TTL = float(os.getenv('HTTP_CACHE_VERSION_TTL', 2))
+# 조회수 변경은 데이터 버전을 올리지 않으므로, 이 주기(초)마다 검증값을 바꿔 정렬 순서 반영
+VIEW_COUNT_WINDOW = int(os.getenv('HTTP_CACHE_VIEW_WINDOW', 300))
+
+def supported_encodings():
+    """서버가 지원하는 압축 방식 (선호 순서)"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def compress_body(data, encoding):
+    """응답 본문 압축"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+def compress_response(response):
+    """after_request 훅: 클라이언트가 허용한 방식으로 응답 압축"""
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    # 압축 여부와 관계없이 Accept-Encoding에 따라 응답이 달라질 수 있음을 캐시에 알림
+    response.vary.add('Accept-Encoding')
+
+    if (response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = request.accept_encodings.best_match(supported_encodings())
+    if not encoding:
+        return response
+
+    response.set_data(compress_body(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def init_compression(app):
+    """Flask 앱에 응답 압축 등록"""
+    app.after_request(compress_response)
+    print(f"✅ 응답 압축: {', '.join(supported_encodings())} ({COMPRESS_MIN_SIZE} bytes 이상)")
+
+class DataVersionCache:
+    """데이터 버전을 프로세스 안에서 잠깐 캐시 (304 응답마다 DB를 조회하지 않도록)
+
+    loader는 (버전 토큰, 마지막 변경 시각) 튜플을 돌려주는 함수이며,
+    실패하면 None을 돌려주거나 예외를 던질 수 있습니다.
+    """
+
+    def __init__(self, loader, ttl=DATA_VERSION_TTL):
+        self.loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if now < self._expires:
+            return self._value
+        with self._lock:
+            if now >= self._expires:
+                try:
+                    self._value = self.loader()
+                except Exception as e:
+                    print(f"⚠️ 데이터 버전 조회 실패: {e}")
+                    self._value = None
+                self._expires = time.monotonic() + self.ttl
+        return self._value
+
+class SnapshotDataVersion:
+    """응답 본문을 만드는 스냅샷의 데이터 버전 (검증값과 본문이 항상 같은 스냅샷에서 나오도록)
+
+    DataVersionCache는 DB에서 바로 읽으므로 스냅샷 갱신보다 먼저 바뀔 수 있습니다.
+    그 값으로 ETag를 만들면 새 ETag가 이전 본문에 붙고, 이후 요청은 그 오래된 본문에 304를 받게 됩니다.
+    get_snapshot()이 None이면 (SQL로 조회하는 경우) fallback의 버전을 사용하며,
+    version_of(snapshot)은 (버전 토큰, 마지막 변경 시각[, 조회수 정렬 구간 번호]) 튜플을 돌려줍니다.
+    """
+
+    def __init__(self, get_snapshot, fallback, version_of=lambda snapshot: snapshot.version):
+        self.get_snapshot = get_snapshot
+        self.fallback = fallback
+        self.version_of = version_of
+
+    def get(self):
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return self.fallback.get()
+        return self.version_of(snapshot)
+
+def build_validators(version, view_window=VIEW_COUNT_WINDOW):
+    """데이터 버전으로 (ETag 값, Last-Modified) 생성
+
+    version의 세 번째 값(조회수 정렬 구간 번호)이 있으면 현재 구간 대신 사용합니다.
+    """
+    token, modified_at, *bucket = version
+    if modified_at.tzinfo is None:
+        modified_at = modified_at.replace(tzinfo=timezone.utc)
+
+    if view_window > 0:
+        # 조회수 기반 정렬이 최대 view_window초 동안만 이전 상태로 보이도록 구간 번호를 포함
+        bucket = bucket[0] if bucket else int(time.time() // view_window)
+        bucket_start = datetime.fromtimestamp(bucket * view_window, tz=timezone.utc)
+        return f"{token}.{bucket}", max(modified_at, bucket_start)
+    return str(token), modified_at
+
+def conditional_on(version_cache, view_window=VIEW_COUNT_WINDOW):
+    """조회 API 데코레이터: 클라이언트 캐시가 최신이면 핸들러를 실행하지 않고 304 반환
+
+    조회수로 정렬하지 않는 데이터는 view_window=0으로 데이터 버전만 사용합니다.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_cache.get()
+            if version is None:
+                # 버전을 알 수 없으면 검증 헤더 없이 그대로 응답
+                return view(*args, **kwargs)
+
+            etag, last_modified = build_validators(version, view_window)
+            # 압축 방식마다 본문 바이트가 다르므로 weak ETag 사용
+            if not is_resource_modified(request.environ, etag=f'W/"{etag}"', last_modified=last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'public, no-cache'
+            return response
+        return wrapper
+    return decorator
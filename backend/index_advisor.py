@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+인덱스 어드바이저
+app_postgresql_api.py가 실행하는 쿼리를 EXPLAIN (ANALYZE, BUFFERS)로 분석해
+policies 테이블의 순차 스캔과 정렬을 찾아내고, 부분/커버링 인덱스를 제안·적용합니다.
+
+후보 인덱스는 모두 schema_migrations.POLICY_INDEXES에 정의되어 서버 시작 시 생성되므로,
+마이그레이션이 적용된 데이터베이스에서는 새 인덱스를 제안하지 않고 현재 실행 계획만 점검합니다.
+(후보 인덱스가 실행 계획에서 쓰이는지, 남은 순차 스캔/정렬이 있는지 확인하는 용도)
+인덱스 효과를 전/후로 비교하려면 --reset --apply로 후보 인덱스를 지우고 다시 만듭니다.
+
+사용법:
+    python index_advisor.py                      # 분석 및 인덱스 제안만
+    python index_advisor.py --seed 50000         # 합성 데이터 5만 건 생성 후 분석
+    python index_advisor.py --apply              # 제안된 인덱스 생성 후 전/후 비교
+    python index_advisor.py --reset --apply      # 후보 인덱스를 지우고 처음부터 비교
+    python index_advisor.py --check-age          # age_range 필터가 기존 조건과 같은 결과인지 검증
+"""
+
+import argparse
+import json
+import statistics
+import sys
+
+from policy_queries import (
+    AI_POLICIES_QUERY, REGION_POLICIES_QUERY, INCREMENT_VIEW_COUNT_QUERY, POLICY_DETAIL_QUERY,
+    CATEGORIES_QUERY, REGIONS_QUERY, STATS_TOTAL_QUERY, STATS_REGION_QUERY, STATS_CATEGORY_QUERY,
+    AGE_FILTER, LEGACY_AGE_FILTER,
+    build_policy_list_query, build_policy_count_query
+)
+from schema_migrations import POLICY_INDEXES
+from seed_data import connect, seed_postgres
+
+# 분석 대상 테이블 (작은 코드 테이블의 순차 스캔은 무시)
+WATCHED_TABLES = {'policies'}
+
+# 후보 인덱스: 이름 → 효과를 보는 쿼리 이름 목록 (DDL은 schema_migrations.POLICY_INDEXES)
+CANDIDATE_INDEXES = {
+    'idx_policies_active_rank':
+        ['ai_policies', 'policies_list', 'policies_list_age', 'policies_list_keyword', 'stats_total'],
+    'idx_policies_active_region_rank':
+        ['region_policies', 'policies_list_region', 'policies_count_region',
+         'policies_list_region_category_age', 'stats_regions'],
+    'idx_policies_active_category_rank':
+        ['policies_list_category', 'stats_categories'],
+    'idx_policies_age_range':
+        ['policies_count_age'],
+}
+
+def build_query_cases(cursor):
+    """app_postgresql_api.py의 쿼리를 대표 파라미터와 함께 구성"""
+    cursor.execute("""
+        SELECT r.name, COUNT(*) FROM policies p JOIN regions r ON p.region_id = r.id
+        GROUP BY r.name ORDER BY COUNT(*) DESC LIMIT 1
+    """)
+    row = cursor.fetchone()
+    region = row[0] if row else '서울특별시'
+    cursor.execute("""
+        SELECT c.name, COUNT(*) FROM policies p JOIN categories c ON p.category_id = c.id
+        GROUP BY c.name ORDER BY COUNT(*) DESC LIMIT 1
+    """)
+    row = cursor.fetchone()
+    category = row[0] if row else '기타지원'
+    cursor.execute("SELECT MIN(id) FROM policies")
+    policy_id = cursor.fetchone()[0] or 1
+
+    filter_sets = {
+        'policies_list': {},
+        'policies_list_region': {'region': region},
+        'policies_list_category': {'category': category},
+        'policies_list_age': {'age': 25},
+        'policies_list_keyword': {'keyword': '청년'},
+        'policies_list_region_category_age': {'region': region, 'category': category, 'age': 25},
+    }
+
+    cases = [('ai_policies', AI_POLICIES_QUERY, [])]
+    for name, filters in filter_sets.items():
+        query, params = build_policy_list_query(**filters)
+        cases.append((name, query, params))
+    for name in ['policies_list', 'policies_list_region', 'policies_list_age']:
+        query, params = build_policy_count_query(**filter_sets[name])
+        cases.append((name.replace('_list', '_count'), query, params))
+    cases += [
+        ('region_policies', REGION_POLICIES_QUERY, [region]),
+        ('policy_view_update', INCREMENT_VIEW_COUNT_QUERY, [policy_id]),
+        ('policy_detail', POLICY_DETAIL_QUERY, [policy_id]),
+        ('categories', CATEGORIES_QUERY, []),
+        ('regions', REGIONS_QUERY, []),
+        ('stats_total', STATS_TOTAL_QUERY, []),
+        ('stats_regions', STATS_REGION_QUERY, []),
+        ('stats_categories', STATS_CATEGORY_QUERY, []),
+    ]
+    return cases
+
+def verify_age_filter(conn, ages=range(0, 101)):
+    """age_range 포함 검사와 기존 BETWEEN/IS NULL 조건의 결과가 같은지 나이별로 비교"""
+    cursor = conn.cursor()
+    mismatches = []
+    for age in ages:
+        results = []
+        for condition in (AGE_FILTER, LEGACY_AGE_FILTER):
+            cursor.execute(f"SELECT array_agg(p.id ORDER BY p.id) FROM policies p WHERE {condition}", (age,))
+            results.append(cursor.fetchone()[0] or [])
+        if results[0] != results[1]:
+            mismatches.append((age, len(results[0]), len(results[1])))
+    conn.rollback()
+
+    if mismatches:
+        for age, new_count, old_count in mismatches:
+            print(f"❌ {age}세: age_range {new_count}건 / 기존 조건 {old_count}건")
+    else:
+        print(f"✅ age_range 필터 결과가 기존 조건과 일치합니다 ({len(ages)}개 나이 검사)")
+    return not mismatches
+
+def walk_plan(node, findings):
+    """실행 계획 트리를 순회하며 순차 스캔/정렬 노드 수집"""
+    relations = set()
+    for child in node.get('Plans', []):
+        relations |= walk_plan(child, findings)
+
+    node_type = node.get('Node Type')
+    relation = node.get('Relation Name')
+    if relation:
+        relations.add(relation)
+
+    if node_type == 'Seq Scan' and relation in WATCHED_TABLES:
+        findings.append(f"Seq Scan on {relation} (rows={node.get('Actual Rows')})")
+    elif node_type in ('Sort', 'Incremental Sort') and relations & WATCHED_TABLES:
+        sort_key = ', '.join(node.get('Sort Key', []))
+        findings.append(f"{node_type} [{sort_key}] ({node.get('Sort Method', '?')})")
+
+    return relations
+
+def explain_query(conn, query, params, runs):
+    """EXPLAIN (ANALYZE, BUFFERS)를 runs회 실행해 실행 시간 중앙값과 계획 반환"""
+    cursor = conn.cursor()
+    timings = []
+    plan = None
+    for _ in range(runs):
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+        result = cursor.fetchone()[0]
+        plan = result[0] if isinstance(result, list) else json.loads(result)[0]
+        timings.append(plan['Execution Time'])
+        # UPDATE 등 부작용이 남지 않도록 매번 롤백
+        conn.rollback()
+
+    findings = []
+    walk_plan(plan['Plan'], findings)
+    buffers = plan['Plan'].get('Shared Hit Blocks', 0) + plan['Plan'].get('Shared Read Blocks', 0)
+    return {
+        'time_ms': statistics.median(timings),
+        'buffers': buffers,
+        'findings': findings,
+    }
+
+def analyze_all(conn, cases, runs):
+    """모든 쿼리 분석"""
+    return {name: explain_query(conn, query, params, runs) for name, query, params in cases}
+
+def existing_indexes(conn):
+    """policies 테이블의 인덱스 이름 목록"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'policies'")
+    names = {row[0] for row in cursor.fetchall()}
+    conn.rollback()
+    return names
+
+def propose_indexes(results, present):
+    """문제가 발견된 쿼리에 도움이 되는 후보 인덱스 선택"""
+    flagged = {name for name, result in results.items() if result['findings']}
+    proposals = []
+    for index_name, targets in CANDIDATE_INDEXES.items():
+        if index_name in present:
+            continue
+        helped = sorted(flagged.intersection(targets))
+        if helped:
+            proposals.append((index_name, POLICY_INDEXES[index_name], helped))
+    return proposals
+
+def run_ddl(conn, statements):
+    """DDL 실행 후 통계 갱신"""
+    old_autocommit = conn.autocommit
+    conn.autocommit = True
+    cursor = conn.cursor()
+    for statement in statements:
+        cursor.execute(statement)
+    cursor.execute("VACUUM ANALYZE policies, regions, categories")
+    conn.autocommit = old_autocommit
+
+def print_report(title, results):
+    """분석 결과 출력"""
+    print(f"\n📊 {title}")
+    print("-" * 90)
+    for name, result in results.items():
+        mark = '⚠️ ' if result['findings'] else '✅'
+        print(f"{mark} {name:<36} {result['time_ms']:>9.3f} ms  buffers={result['buffers']}")
+        for finding in result['findings']:
+            print(f"      - {finding}")
+
+def print_comparison(before, after):
+    """인덱스 적용 전/후 비교 출력"""
+    print("\n📈 적용 전/후 비교")
+    print("-" * 90)
+    print(f"{'query':<38}{'before(ms)':>12}{'after(ms)':>12}{'speedup':>10}")
+    for name in before:
+        b, a = before[name]['time_ms'], after[name]['time_ms']
+        speedup = b / a if a else float('inf')
+        print(f"{name:<38}{b:>12.3f}{a:>12.3f}{speedup:>9.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='policies 쿼리 인덱스 어드바이저')
+    parser.add_argument('--dsn', help='PostgreSQL 접속 문자열 (기본값: DATABASE_URL)')
+    parser.add_argument('--seed', type=int, help='분석 전에 합성 정책 N개 생성 (기존 정책 삭제)')
+    parser.add_argument('--runs', type=int, default=5, help='쿼리별 반복 측정 횟수')
+    parser.add_argument('--apply', action='store_true', help='제안된 인덱스를 실제로 생성')
+    parser.add_argument('--reset', action='store_true', help='분석 전에 후보 인덱스를 삭제')
+    parser.add_argument('--check-age', action='store_true', help='age_range 필터 결과 검증')
+    parser.add_argument('--output', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    conn = connect(args.dsn)
+    try:
+        if args.seed:
+            seed_postgres(conn, args.seed)
+
+        if args.check_age and not verify_age_filter(conn):
+            sys.exit(1)
+
+        if args.reset:
+            print("🧹 후보 인덱스 삭제 중...")
+            run_ddl(conn, [f"DROP INDEX IF EXISTS {name}" for name in CANDIDATE_INDEXES])
+
+        cases = build_query_cases(conn.cursor())
+        conn.rollback()
+
+        before = analyze_all(conn, cases, args.runs)
+        print_report("현재 실행 계획", before)
+
+        present = existing_indexes(conn)
+        proposals = propose_indexes(before, present)
+        if not proposals:
+            candidates = ', '.join(name for name in CANDIDATE_INDEXES if name in present) or '없음'
+            print(f"\n✅ 추가로 제안할 인덱스가 없습니다. (이미 있는 후보 인덱스: {candidates})")
+        else:
+            print("\n💡 제안 인덱스")
+            for index_name, ddl, helped in proposals:
+                print(f"   {index_name} → {', '.join(helped)}")
+                print("      " + ' '.join(ddl.split()) + ';')
+
+        report = {'before': before, 'proposals': [p[0] for p in proposals]}
+
+        if args.apply and proposals:
+            print("\n🔧 인덱스 생성 중...")
+            run_ddl(conn, [ddl for _, ddl, _ in proposals])
+            after = analyze_all(conn, cases, args.runs)
+            print_report("인덱스 적용 후 실행 계획", after)
+            print_comparison(before, after)
+            report['after'] = after
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"\n✅ 결과 저장: {args.output}")
+
+    except Exception as e:
+        print(f"❌ 인덱스 분석 실패: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ import psycopg2
 import json
 from datetime import datetime
 from dotenv import load_dotenv
+from schema_migrations import apply_schema_migrations
 
 # 환경 변수 로드
 load_dotenv()
@@ -214,6 +215,9 @@ def initialize_database():
         else:
             print("✅ 데이터베이스가 이미 초기화되어 있습니다.")
         
+        # 기존 데이터베이스에도 새 컬럼/인덱스 반영
+        apply_schema_migrations(conn)
+        
         conn.close()
         return True
         
@@ -0,0 +1,185 @@
+"""
+LLM(OpenAI ChatCompletion) 호출 보호
+- 동시 호출 수 제한: 워커 프로세스마다 LLM_MAX_CONCURRENCY개까지만 호출하고,
+  자리가 나기를 LLM_QUEUE_TIMEOUT초 넘게 기다려야 하면 바로 포기합니다. (느린 upstream이 gunicorn 스레드를 모두 붙잡지 않도록)
+- 호출 제한 시간: 재시도와 대기를 포함해 LLM_TIMEOUT초 안에 끝나지 않으면 포기합니다.
+- 재시도: 타임아웃/연결 오류/429/5xx만 LLM_MAX_RETRIES번까지, 지수 백오프에 무작위 지연(full jitter)을 더해 재시도합니다.
+- 서킷 브레이커: 연속 LLM_BREAKER_FAILURES번 실패하면 LLM_BREAKER_RESET초 동안 호출하지 않고 바로 실패합니다.
+  그 뒤 한 번 시험 호출해서 성공하면 다시 정상 상태로 돌아갑니다.
+
+호출할 수 없거나 실패하면 LLMUnavailable을 발생시키므로 호출하는 쪽에서 대체 응답을 보내면 됩니다.
+상태는 /metrics의 llm_in_flight, llm_circuit_state, llm_rejected_total, llm_retries_total로 확인할 수 있습니다.
+
+사용법:
+    llm = LLMClient('gpt-3.5-turbo')
+    try:
+        response = llm.chat(messages, max_tokens=500)
+    except LLMUnavailable as e:
+        ...  # e.reason: 'circuit_open' | 'busy' | 'timeout' | 'error'
+"""
+
+import os
+import random
+import threading
+import time
+
+import openai
+
+from request_metrics import LLM_CIRCUIT_STATE, LLM_IN_FLIGHT, LLM_REJECTED, LLM_RETRIES, time_llm_call
+
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 20))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', 2))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 0.5))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', 4))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', 5))
+LLM_BREAKER_RESET = float(os.getenv('LLM_BREAKER_RESET', 30))
+
+# 재시도할 오류 (upstream 상태 문제). 요청 자체가 잘못된 오류(InvalidRequestError, AuthenticationError 등)는 바로 실패
+RETRYABLE_ERRORS = (
+    openai.error.Timeout,
+    openai.error.APIConnectionError,
+    openai.error.RateLimitError,
+    openai.error.ServiceUnavailableError,
+    openai.error.TryAgain,
+)
+# 재시도할 시간이 이보다 적게 남으면 포기 (초)
+MIN_ATTEMPT_TIME = 0.5
+
+class LLMUnavailable(Exception):
+    """LLM 응답을 받지 못함 (reason: circuit_open, busy, timeout, error)"""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+def is_retryable(error):
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    # 5xx는 APIError로 올라옴
+    return isinstance(error, openai.error.APIError) and (error.http_status or 500) >= 500
+
+class CircuitBreaker:
+    """연속 실패 수 기반 서킷 브레이커 (closed → open → half_open → closed)"""
+    STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, reset_timeout=LLM_BREAKER_RESET, name=''):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self._lock = threading.Lock()
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        LLM_CIRCUIT_STATE.set((name,), 0)
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._set_state('half_open')
+        return self._state
+
+    def _set_state(self, state):
+        if state != self._state:
+            print(f"🔌 LLM 서킷 브레이커 {self._state} → {state}")
+        self._state = state
+        LLM_CIRCUIT_STATE.set((self.name,), self.STATES[state])
+
+    def allow(self):
+        """호출해도 되는지 (half_open에서는 시험 호출 한 번만 허용)"""
+        with self._lock:
+            state = self._current_state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._set_state('closed')
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == 'half_open' or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state('open')
+            self._probing = False
+
+    def release(self):
+        """시험 호출이 upstream 상태와 무관한 이유로 끝났을 때 (다음 요청이 다시 시험)"""
+        with self._lock:
+            self._probing = False
+
+class LLMClient:
+    """동시 호출 제한, 제한 시간, 재시도, 서킷 브레이커를 적용한 ChatCompletion 호출"""
+
+    def __init__(self, model, timeout=LLM_TIMEOUT, max_concurrency=LLM_MAX_CONCURRENCY,
+                 queue_timeout=LLM_QUEUE_TIMEOUT, max_retries=LLM_MAX_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX, breaker=None):
+        self.model = model
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker(name=model)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def _reject(self, reason, message):
+        LLM_REJECTED.inc((self.model, reason))
+        return LLMUnavailable(reason, message)
+
+    def backoff(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (full jitter)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def chat(self, messages, **params):
+        """ChatCompletion 응답 (실패하면 LLMUnavailable)"""
+        deadline = time.monotonic() + self.timeout
+        if not self.breaker.allow():
+            raise self._reject('circuit_open', "LLM 서비스 장애로 호출을 잠시 중단했습니다.")
+        if not self._slots.acquire(timeout=min(self.queue_timeout, self.timeout)):
+            self.breaker.release()
+            raise self._reject('busy', "동시에 처리 중인 LLM 요청이 너무 많습니다.")
+        LLM_IN_FLIGHT.add((self.model,))
+        try:
+            return self._call_with_retries(messages, params, deadline)
+        finally:
+            LLM_IN_FLIGHT.add((self.model,), -1)
+            self._slots.release()
+
+    def _call_with_retries(self, messages, params, deadline):
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                with time_llm_call(self.model) as call:
+                    response = openai.ChatCompletion.create(
+                        model=self.model, messages=messages, request_timeout=remaining, **params)
+                    call['usage'] = response.get('usage')
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.release()
+                    raise self._reject('error', f"LLM 요청 실패: {e}") from e
+                delay = self.backoff(attempt)
+                if attempt >= self.max_retries or deadline - time.monotonic() - delay < MIN_ATTEMPT_TIME:
+                    self.breaker.record_failure()
+                    reason = 'timeout' if isinstance(e, openai.error.Timeout) else 'error'
+                    raise self._reject(reason, f"LLM 요청 실패 ({attempt + 1}번 시도): {e}") from e
+                attempt += 1
+                LLM_RETRIES.inc((self.model,))
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return response
@@ -11,6 +11,8 @@ import os
 from datetime import datetime
 from dotenv import load_dotenv
 
+from schema_migrations import apply_schema_migrations
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -45,6 +47,7 @@ def create_tables(conn):
         # SQL 실행
         cursor.execute(schema_sql)
         conn.commit()
+        apply_schema_migrations(conn)
         
         print("✅ 데이터베이스 테이블 생성 완료!")
         return True
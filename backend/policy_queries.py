@@ -0,0 +1,207 @@
+"""
+정책 API SQL 쿼리 모음
+app_postgresql_api.py의 핸들러와 index_advisor.py가 같은 쿼리를 사용하도록 한 곳에 모아둡니다.
+"""
+
+# 목록 응답에 사용하는 공통 SELECT 절
+POLICY_LIST_SELECT = '''
+    SELECT
+        p.id, p.title, p.description, p.url, p.conditions, p.benefits,
+        p.application_period, p.support_amount_min, p.support_amount_max,
+        p.age_min, p.age_max, p.status, p.priority, p.view_count,
+        r.name as region_name, c.name as category_name, c.color as category_color,
+        p.created_at, p.updated_at
+    FROM policies p
+    LEFT JOIN regions r ON p.region_id = r.id
+    LEFT JOIN categories c ON p.category_id = c.id
+'''
+
+# 메모리 스냅샷(policy_snapshot.py)용: 목록 컬럼 + 필터에만 쓰는 컬럼, 기본 정렬 순서
+POLICY_SNAPSHOT_RESPONSE_COLUMNS = [
+    'id', 'title', 'description', 'url', 'conditions', 'benefits',
+    'application_period', 'support_amount_min', 'support_amount_max',
+    'age_min', 'age_max', 'status', 'priority', 'view_count',
+    'region_name', 'category_name', 'category_color', 'created_at', 'updated_at',
+]
+POLICY_SNAPSHOT_QUERY = '''
+    SELECT
+        p.id, p.title, p.description, p.url, p.conditions, p.benefits,
+        p.application_period, p.support_amount_min, p.support_amount_max,
+        p.age_min, p.age_max, p.status, p.priority, p.view_count,
+        r.name as region_name, c.name as category_name, c.color as category_color,
+        p.created_at, p.updated_at, p.income_min, p.income_max
+    FROM policies p
+    LEFT JOIN regions r ON p.region_id = r.id
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.status = 'active'
+    ORDER BY p.priority DESC, p.view_count DESC, p.created_at DESC, p.id
+'''
+
+# 필터가 id 기준이므로 개수 조회에는 조인이 필요 없습니다.
+POLICY_COUNT_SELECT = '''
+    SELECT COUNT(*)
+    FROM policies p
+'''
+
+# 인기순 정렬 (priority → view_count → created_at)
+POLICY_ORDER_BY = " ORDER BY p.priority DESC, p.view_count DESC, p.created_at DESC"
+
+AI_POLICIES_QUERY = '''
+    SELECT
+        p.title, p.description, p.conditions, p.benefits,
+        p.application_period, p.support_amount_min, p.support_amount_max,
+        r.name as region_name, c.name as category_name,
+        p.age_min, p.age_max, p.status
+    FROM policies p
+    LEFT JOIN regions r ON p.region_id = r.id
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.status = 'active'
+    ORDER BY p.priority DESC, p.view_count DESC
+    LIMIT 20
+'''
+
+# 지역/카테고리는 이름을 id로 먼저 바꿔 region_id, category_id 인덱스를 탈 수 있게 합니다.
+REGION_FILTER = "p.region_id IN (SELECT id FROM regions WHERE name = %s)"
+CATEGORY_FILTER = "p.category_id IN (SELECT id FROM categories WHERE name = %s)"
+
+# age_range(int4range)는 age_min/age_max가 모두 NULL이면 전체 범위이므로 포함 검사 하나로 충분합니다.
+AGE_FILTER = "p.age_range @> %s::integer"
+LEGACY_AGE_FILTER = "(%s BETWEEN p.age_min AND p.age_max OR (p.age_min IS NULL AND p.age_max IS NULL))"
+
+REGION_POLICIES_QUERY = POLICY_LIST_SELECT + '''
+    WHERE ''' + REGION_FILTER + ''' AND p.status = 'active'
+    ORDER BY p.priority DESC, p.view_count DESC
+'''
+
+INCREMENT_VIEW_COUNT_QUERY = 'UPDATE policies SET view_count = view_count + 1 WHERE id = %s'
+INCREMENT_VIEW_COUNTS_QUERY = 'UPDATE policies SET view_count = view_count + 1 WHERE id = ANY(%s::integer[])'
+
+# age_range(int4range)는 JSON으로 직렬화할 수 없으므로 p.* 대신 컬럼을 나열합니다.
+POLICY_DETAIL_SELECT = '''
+    SELECT
+        p.id, p.title, p.description, p.url, p.region_id, p.category_id,
+        p.age_min, p.age_max, p.income_min, p.income_max,
+        p.application_start, p.application_end, p.support_amount_min, p.support_amount_max,
+        p.conditions, p.benefits, p.application_period, p.application_method,
+        p.required_documents, p.contact_info, p.status, p.priority, p.view_count,
+        p.created_at, p.updated_at,
+        r.name as region_name, c.name as category_name, c.color as category_color
+    FROM policies p
+    LEFT JOIN regions r ON p.region_id = r.id
+    LEFT JOIN categories c ON p.category_id = c.id
+'''
+POLICY_DETAIL_QUERY = POLICY_DETAIL_SELECT + "    WHERE p.id = %s"
+POLICY_DETAILS_QUERY = POLICY_DETAIL_SELECT + "    WHERE p.id = ANY(%s::integer[])"
+
+CATEGORIES_QUERY = '''
+    SELECT id, name, description, icon, color
+    FROM categories
+    ORDER BY name
+'''
+
+REGIONS_QUERY = '''
+    SELECT id, code, name, level
+    FROM regions
+    WHERE level = 1
+    ORDER BY name
+'''
+
+STATS_TOTAL_QUERY = "SELECT COUNT(*) as total FROM policies WHERE status = 'active'"
+
+STATS_REGION_QUERY = '''
+    SELECT r.name, COUNT(*) as count
+    FROM policies p
+    LEFT JOIN regions r ON p.region_id = r.id
+    WHERE p.status = 'active'
+    GROUP BY r.name
+    ORDER BY count DESC
+'''
+
+STATS_CATEGORY_QUERY = '''
+    SELECT c.name, COUNT(*) as count
+    FROM policies p
+    LEFT JOIN categories c ON p.category_id = c.id
+    WHERE p.status = 'active'
+    GROUP BY c.name
+    ORDER BY count DESC
+'''
+
+# HTTP 캐시 검증값 계산용 데이터 버전
+DATA_VERSION_QUERY = "SELECT version, updated_at FROM policy_data_version"
+
+def escape_like(keyword):
+    """LIKE 패턴 문자(%, _) 이스케이프 (키워드를 그대로의 부분 문자열로 찾도록)"""
+    return keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def build_policy_filters(region=None, category=None, age=None, keyword=None):
+    """/api/policies 검색 조건을 WHERE 절과 파라미터로 변환"""
+    where = " WHERE p.status = 'active'"
+    params = []
+
+    if region:
+        where += " AND " + REGION_FILTER
+        params.append(region)
+
+    if category:
+        where += " AND " + CATEGORY_FILTER
+        params.append(category)
+
+    if age is not None:
+        where += " AND " + AGE_FILTER
+        params.append(age)
+
+    if keyword:
+        # 메모리 스냅샷 검색(keyword_mask)과 같이 키워드 전체를 문자 그대로 찾음 (PostgreSQL LIKE의 기본 이스케이프 문자는 \)
+        where += " AND (p.title ILIKE %s OR p.description ILIKE %s OR p.conditions ILIKE %s OR p.benefits ILIKE %s)"
+        keyword_param = f"%{escape_like(keyword)}%"
+        params.extend([keyword_param, keyword_param, keyword_param, keyword_param])
+
+    return where, params
+
+def build_policy_list_query(region=None, category=None, age=None, keyword=None, limit=50, offset=0):
+    """/api/policies 목록 쿼리 생성"""
+    where, params = build_policy_filters(region, category, age, keyword)
+    query = POLICY_LIST_SELECT + where + POLICY_ORDER_BY + " LIMIT %s OFFSET %s"
+    return query, params + [limit, offset]
+
+def build_policy_count_query(region=None, category=None, age=None, keyword=None):
+    """/api/policies 총 개수 쿼리 생성"""
+    where, params = build_policy_filters(region, category, age, keyword)
+    return POLICY_COUNT_SELECT + where, params
+
+# 소득 기준(만원)은 기준이 없는 쪽을 제한 없음으로 봅니다.
+INCOME_FILTER = "(p.income_min IS NULL OR p.income_min <= %s) AND (p.income_max IS NULL OR p.income_max >= %s)"
+
+def build_eligibility_filters(region=None, age=None, income=None, category=None):
+    """/api/eligibility 조건을 WHERE 절과 파라미터로 변환 (지역이 없는 정책은 모든 지역에 포함)"""
+    where = " WHERE p.status = 'active'"
+    params = []
+
+    if region:
+        where += " AND (" + REGION_FILTER + " OR p.region_id IS NULL)"
+        params.append(region)
+
+    if category:
+        where += " AND " + CATEGORY_FILTER
+        params.append(category)
+
+    if age is not None:
+        where += " AND " + AGE_FILTER
+        params.append(age)
+
+    if income is not None:
+        where += " AND " + INCOME_FILTER
+        params.extend([income, income])
+
+    return where, params
+
+def build_eligibility_list_query(region=None, age=None, income=None, category=None, limit=20, offset=0):
+    """지원 가능 정책 목록 쿼리 생성 (스냅샷을 쓰지 않을 때)"""
+    where, params = build_eligibility_filters(region, age, income, category)
+    query = POLICY_LIST_SELECT + where + POLICY_ORDER_BY + ", p.id LIMIT %s OFFSET %s"
+    return query, params + [limit, offset]
+
+def build_eligibility_count_query(region=None, age=None, income=None, category=None):
+    """지원 가능 정책 수 쿼리 생성"""
+    where, params = build_eligibility_filters(region, age, income, category)
+    return POLICY_COUNT_SELECT + where, params
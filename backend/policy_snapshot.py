@@ -0,0 +1,323 @@
+"""
+메모리 정책 스냅샷
+활성 정책 전체를 컬럼 단위 배열로 읽어 두고, 지역/카테고리/나이별 비트셋을 미리 계산해
+필터 → 정렬 → 페이지를 DB 없이 프로세스 안에서 처리합니다.
+원본은 항상 DB이며, 데이터 버전이 바뀌면 새 스냅샷을 만들어 참조만 교체합니다.
+
+비트셋은 파이썬 정수이며 i번째 비트가 기본 정렬 순서의 i번째 정책을 뜻합니다.
+따라서 비트셋 AND 결과를 낮은 비트부터 읽으면 그대로 정렬된 결과가 됩니다.
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+# 나이별 비트셋을 미리 만들어 두는 범위 (이 범위 밖의 나이는 컬럼을 직접 비교)
+MAX_INDEXED_AGE = 120
+
+def positions_to_mask(positions, size):
+    """정책 위치 목록을 비트셋으로 변환"""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+def popcount(mask):
+    """비트셋의 1인 비트 수 (int.bit_count()는 Python 3.10+이므로 배포 환경 3.9에서도 동작하도록)"""
+    return bin(mask).count('1')
+
+def iter_mask(mask, start=0):
+    """비트셋의 1인 위치를 낮은 비트부터 반환 (start개는 건너뜀)"""
+    bits = bin(mask)[:1:-1]  # 낮은 비트가 앞에 오도록 뒤집은 문자열
+    position = bits.find('1')
+    skipped = 0
+    while position != -1:
+        if skipped >= start:
+            yield position
+        else:
+            skipped += 1
+        position = bits.find('1', position + 1)
+
+def compact_column(values):
+    """정수만 있는 컬럼은 array로, 나머지는 tuple로 보관"""
+    if values and all(type(value) is int for value in values):
+        try:
+            return array('q', values)
+        except OverflowError:
+            pass
+    return tuple(values)
+
+def age_eligible(age, age_min, age_max):
+    """나이 조건 판정 (PostgreSQL age_range와 같은 의미: 둘 다 없으면 전체, 하나만 없으면 해당 없음)"""
+    if age_min is None and age_max is None:
+        return True
+    if age_min is None or age_max is None:
+        return False
+    return age_min <= age <= age_max
+
+class PolicySnapshot:
+    """한 시점의 정책 목록 (불변, 여러 스레드에서 동시에 읽어도 안전)
+
+    columns/rows: 기본 정렬 순서대로 정렬된 조회 결과
+    response_columns: 응답 딕셔너리에 포함할 컬럼 (나머지는 필터용으로만 보관)
+    region_field, category_field: 지역/카테고리 이름 컬럼
+    age_fields, income_fields: (최솟값, 최댓값) 컬럼 이름
+    text_fields: 키워드 검색 대상 컬럼
+    """
+
+    def __init__(self, version, columns, rows, response_columns=None, id_field='id',
+                 region_field=None, category_field=None, age_fields=None, income_fields=None,
+                 text_fields=()):
+        self.version = version
+        self.loaded_at = time.time()
+        rows = list(rows)
+        self.size = len(rows)
+        self.all_mask = (1 << self.size) - 1
+
+        self.columns = {name: compact_column([row[i] for row in rows]) for i, name in enumerate(columns)}
+        self.response_columns = list(response_columns or columns)
+        self._response_arrays = [self.columns[name] for name in self.response_columns]
+        self.income_fields = income_fields
+
+        self._position_ids = self.columns[id_field]
+        self.position_by_id = {policy_id: position for position, policy_id in enumerate(self._position_ids)}
+
+        self.region_masks = self._build_value_masks(region_field)
+        self.category_masks = self._build_value_masks(category_field)
+        self.region_field = region_field
+        self.category_field = category_field
+
+        self.age_fields = age_fields
+        self.age_masks = self._build_age_masks(age_fields) if age_fields else None
+        self.income_index = self._build_income_index(income_fields) if income_fields else None
+
+        # 키워드 검색용 소문자 텍스트 (ILIKE와 같이 대소문자 무시)
+        self._search_text = None
+        if text_fields:
+            text_columns = [self.columns[name] for name in text_fields]
+            self._search_text = tuple(
+                '\n'.join(column[i] for column in text_columns if column[i]).lower()
+                for i in range(self.size)
+            )
+        self._keyword_masks = {}
+        self._keyword_lock = threading.Lock()
+
+    def _build_value_masks(self, field):
+        """컬럼 값별 비트셋 (지역, 카테고리)"""
+        if not field:
+            return {}
+        positions = {}
+        for position, value in enumerate(self.columns[field]):
+            positions.setdefault(value, []).append(position)
+        return {value: positions_to_mask(items, self.size) for value, items in positions.items()}
+
+    def _build_age_masks(self, age_fields):
+        """0~MAX_INDEXED_AGE세 각각에 해당하는 정책 비트셋"""
+        min_column, max_column = (self.columns[name] for name in age_fields)
+        unbounded = []
+        by_age = [[] for _ in range(MAX_INDEXED_AGE + 1)]
+        for position in range(self.size):
+            age_min, age_max = min_column[position], max_column[position]
+            if age_min is None and age_max is None:
+                unbounded.append(position)
+            elif age_min is not None and age_max is not None:
+                for age in range(max(age_min, 0), min(age_max, MAX_INDEXED_AGE) + 1):
+                    by_age[age].append(position)
+        unbounded_mask = positions_to_mask(unbounded, self.size)
+        return [positions_to_mask(items, self.size) | unbounded_mask for items in by_age]
+
+    def _build_income_index(self, income_fields):
+        """소득 경계값별 누적 비트셋
+
+        min_masks[j]: income_min이 없거나 min_values[j-1] 이하인 정책 (j=0은 income_min이 없는 정책만)
+        max_masks[j]: income_max가 없거나 max_values[j] 이상인 정책 (마지막은 income_max가 없는 정책만)
+        """
+        min_column, max_column = (self.columns[name] for name in income_fields)
+
+        def cumulative(column, reverse):
+            buffer = bytearray((self.size + 7) // 8)
+            bounded = []
+            for position, value in enumerate(column):
+                if value is None:
+                    buffer[position >> 3] |= 1 << (position & 7)
+                else:
+                    bounded.append((value, position))
+            bounded.sort(reverse=reverse)
+            values, masks = [], [int.from_bytes(buffer, 'little')]
+            for index, (value, position) in enumerate(bounded):
+                buffer[position >> 3] |= 1 << (position & 7)
+                if index + 1 == len(bounded) or bounded[index + 1][0] != value:
+                    values.append(value)
+                    masks.append(int.from_bytes(buffer, 'little'))
+            return values, masks
+
+        min_values, min_masks = cumulative(min_column, reverse=False)
+        max_values, max_masks = cumulative(max_column, reverse=True)
+        # 오름차순 bisect를 위해 max 쪽은 값과 비트셋 순서를 뒤집음 (null 전용 비트셋이 마지막)
+        return min_values, min_masks, max_values[::-1], max_masks[::-1]
+
+    def income_mask(self, income):
+        """소득(만원)이 income_min~income_max 안에 드는 정책 비트셋 (기준이 없는 쪽은 제한 없음)"""
+        if self.income_index is None:
+            return self.all_mask
+        min_values, min_masks, max_values, max_masks = self.income_index
+        return min_masks[bisect_right(min_values, income)] & max_masks[bisect_left(max_values, income)]
+
+    def age_mask(self, age):
+        """해당 나이가 지원 대상인 정책 비트셋"""
+        if self.age_masks is None:
+            return self.all_mask
+        if 0 <= age <= MAX_INDEXED_AGE:
+            return self.age_masks[age]
+        min_column, max_column = (self.columns[name] for name in self.age_fields)
+        return positions_to_mask(
+            (i for i in range(self.size) if age_eligible(age, min_column[i], max_column[i])), self.size)
+
+    def keyword_mask(self, keyword):
+        """키워드를 포함하는 정책 비트셋 (스냅샷이 불변이므로 결과를 재사용)"""
+        if self._search_text is None:
+            return self.all_mask
+        needle = keyword.lower()
+        mask = self._keyword_masks.get(needle)
+        if mask is None:
+            mask = positions_to_mask(self._keyword_positions(needle), self.size)
+            with self._keyword_lock:
+                if len(self._keyword_masks) >= 256:
+                    self._keyword_masks.clear()
+                self._keyword_masks[needle] = mask
+        return mask
+
+    def _keyword_positions(self, needle):
+        """소문자 키워드를 포함하는 정책 위치"""
+        return (i for i, text in enumerate(self._search_text) if needle in text)
+
+    def filter_mask(self, region=None, category=None, age=None, keyword=None):
+        """검색 조건 비트셋 (조건이 없으면 전체)"""
+        mask = self.all_mask
+        if region:
+            mask &= self.region_masks.get(region, 0)
+        if category:
+            mask &= self.category_masks.get(category, 0)
+        if age is not None:
+            mask &= self.age_mask(age)
+        if keyword:
+            mask &= self.keyword_mask(keyword)
+        return mask
+
+    def eligibility_mask(self, region=None, age=None, income=None, category=None):
+        """사용자 조건으로 지원 가능한 정책 비트셋 (지역이 지정되지 않은 정책은 모든 지역에 포함)"""
+        mask = self.all_mask
+        if region:
+            mask &= self.region_masks.get(region, 0) | self.region_masks.get(None, 0)
+        if category:
+            mask &= self.category_masks.get(category, 0)
+        if age is not None:
+            mask &= self.age_mask(age)
+        if income is not None:
+            mask &= self.income_mask(income)
+        return mask
+
+    def row(self, position):
+        """한 정책의 응답 딕셔너리"""
+        return dict(zip(self.response_columns, [column[position] for column in self._response_arrays]))
+
+    def positions(self, mask=None, limit=None, offset=0):
+        """비트셋에 해당하는 정책 위치 (기본 정렬 순서)"""
+        if mask is None:
+            end = self.size if limit is None else min(self.size, offset + limit)
+            return range(offset, end)
+        return islice(iter_mask(mask, offset), limit)
+
+    def rows(self, mask=None, limit=None, offset=0):
+        """비트셋에 해당하는 정책을 기본 정렬 순서로 반환"""
+        return [self.row(position) for position in self.positions(mask, limit, offset)]
+
+    def ids(self, mask=None, limit=None, offset=0):
+        """비트셋에 해당하는 정책 id (응답 딕셔너리를 만들지 않음)"""
+        return [self._position_ids[position] for position in self.positions(mask, limit, offset)]
+
+    def page_after(self, mask=None, after=None, limit=50, offset=0):
+        """keyset 페이지: after(정책 id) 다음 위치부터 offset개를 건너뛴 limit개의 위치와 다음 페이지 여부
+
+        after가 스냅샷에 없는 id이면 빈 페이지를 돌려줍니다. (SQL keyset 쿼리와 같은 의미)
+        """
+        if mask is None:
+            mask = self.all_mask
+        if after is not None:
+            position = self.position_of(after)
+            if position is None:
+                return [], False
+            mask &= ~((1 << (position + 1)) - 1)
+        positions = list(islice(iter_mask(mask, offset), limit + 1))
+        return positions[:limit], len(positions) > limit
+
+    def position_of(self, policy_id):
+        """정책 id의 정렬 위치 (없으면 None)"""
+        return self.position_by_id.get(policy_id)
+
+    def rows_by_ids(self, ids):
+        """id 목록 순서대로 정책 반환 (스냅샷에 없는 id는 제외)"""
+        positions = (self.position_of(policy_id) for policy_id in ids)
+        return [self.row(position) for position in positions if position is not None]
+
+    def query(self, region=None, category=None, age=None, keyword=None, limit=None, offset=0):
+        """필터 → 기본 정렬 → 페이지 (정책 목록, 전체 개수)"""
+        mask = self.filter_mask(region, category, age, keyword)
+        if mask == self.all_mask:
+            return self.rows(limit=limit, offset=offset), self.size
+        return self.rows(mask, limit, offset), popcount(mask)
+
+    def value_counts(self, field):
+        """지역/카테고리별 정책 수 (많은 순)"""
+        masks = self.region_masks if field == self.region_field else self.category_masks
+        counts = [(value, popcount(mask)) for value, mask in masks.items()]
+        return sorted(counts, key=lambda item: item[1], reverse=True)
+
+class PolicySnapshotStore:
+    """최신 PolicySnapshot 보관 및 갱신
+
+    version_func()가 돌려주는 값이 바뀌면 loader(version)로 새 스냅샷을 만든 뒤 참조만 교체합니다.
+    버전 확인은 check_interval초에 한 번만 하고, 새 스냅샷을 만드는 동안에도 요청은 이전 스냅샷으로 처리됩니다.
+    """
+
+    def __init__(self, loader, version_func, check_interval=1.0):
+        self.loader = loader
+        self.version_func = version_func
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._version = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """최신 스냅샷 (한 번도 로드하지 못했으면 None)"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+
+        # 다른 스레드가 갱신 중이면 기다리지 않고 이전 스냅샷 사용
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            if self._snapshot is None or time.monotonic() >= self._next_check:
+                self.refresh()
+        finally:
+            self._lock.release()
+        return self._snapshot
+
+    def refresh(self):
+        """버전이 바뀌었으면 스냅샷 다시 로드"""
+        try:
+            # 버전을 먼저 읽으므로 로드 중에 바뀐 내용은 다음 확인 때 다시 반영됨
+            version = self.version_func()
+            if version is not None and (self._snapshot is None or self._version != version):
+                started = time.perf_counter()
+                snapshot = self.loader(version)
+                self._snapshot = snapshot
+                self._version = version
+                print(f"✅ 정책 스냅샷 로드: {snapshot.size}개 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        except Exception as e:
+            print(f"⚠️ 정책 스냅샷 갱신 실패: {e}")
+        self._next_check = time.monotonic() + self.check_interval
@@ -0,0 +1,97 @@
+"""
+서버 측 prepared statement 지원
+고정 쿼리는 연결마다 한 번만 PREPARE 하고 이후에는 이름으로 EXECUTE 하여
+매 요청마다 반복되던 SQL 파싱/플래닝 비용을 줄입니다.
+"""
+
+import re
+
+import psycopg2.extensions
+
+from policy_queries import (
+    AI_POLICIES_QUERY, REGION_POLICIES_QUERY, INCREMENT_VIEW_COUNT_QUERY, POLICY_DETAIL_QUERY,
+    INCREMENT_VIEW_COUNTS_QUERY, POLICY_DETAILS_QUERY,
+    CATEGORIES_QUERY, REGIONS_QUERY, STATS_TOTAL_QUERY, STATS_REGION_QUERY, STATS_CATEGORY_QUERY,
+    DATA_VERSION_QUERY, build_policy_list_query, build_policy_count_query
+)
+
+# 이름 → SQL (핸들러에서 사용하는 고정 쿼리)
+FIXED_STATEMENTS = {
+    'ai_policies': AI_POLICIES_QUERY,
+    'region_policies': REGION_POLICIES_QUERY,
+    'increment_view_count': INCREMENT_VIEW_COUNT_QUERY,
+    'policy_detail': POLICY_DETAIL_QUERY,
+    'increment_view_counts': INCREMENT_VIEW_COUNTS_QUERY,
+    'policy_details': POLICY_DETAILS_QUERY,
+    'categories': CATEGORIES_QUERY,
+    'regions': REGIONS_QUERY,
+    'stats_total': STATS_TOTAL_QUERY,
+    'stats_region': STATS_REGION_QUERY,
+    'stats_category': STATS_CATEGORY_QUERY,
+    'data_version': DATA_VERSION_QUERY,
+}
+
+_PLACEHOLDER = re.compile(r'%s')
+
+class PreparedConnection(psycopg2.extensions.connection):
+    """이 연결에서 PREPARE 된 statement 이름을 기억하는 연결 클래스"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+def to_positional(sql):
+    """psycopg2의 %s 자리표시자를 PREPARE용 $1, $2 ... 로 변환"""
+    counter = iter(range(1, 10000))
+    return _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+
+def execute_prepared(cursor, name, sql, params=(), custom_plan=False):
+    """PREPARE 된 statement를 이름으로 실행 (처음 사용하는 연결이면 먼저 PREPARE)
+
+    custom_plan=True이면 파싱 결과만 재사용하고 실행 계획은 매번 파라미터 값으로 다시 세웁니다.
+    나이/키워드처럼 값에 따라 선택도가 크게 달라지는 조건은 generic plan이 오히려 느려지기 때문입니다.
+    """
+    prepared = getattr(cursor.connection, 'prepared', None)
+    if prepared is None:
+        # 일반 연결이면 그대로 실행
+        cursor.execute(sql, params)
+        return
+
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {to_positional(sql)}")
+        prepared.add(name)
+
+    statement = f"EXECUTE {name}"
+    if params:
+        statement += f" ({', '.join(['%s'] * len(params))})"
+    if custom_plan:
+        # 같은 요청(트랜잭션) 안에서만 적용되고 풀에 반환될 때 롤백으로 초기화됨
+        statement = "SET LOCAL plan_cache_mode = force_custom_plan; " + statement
+    cursor.execute(statement, params or None)
+
+def execute_fixed(cursor, name, params=()):
+    """FIXED_STATEMENTS에 등록된 쿼리 실행"""
+    execute_prepared(cursor, name, FIXED_STATEMENTS[name], params)
+
+def filter_shape(region=None, category=None, age=None, keyword=None):
+    """어떤 검색 조건이 있는지를 나타내는 키 (예: '1010' = 지역 + 나이)
+
+    조건 조합은 최대 16가지이므로 목록/개수 쿼리를 합쳐도 연결당 32개를 넘지 않습니다.
+    """
+    return ''.join('1' if value not in (None, '') else '0' for value in (region, category, age, keyword))
+
+def needs_custom_plan(age=None, keyword=None):
+    """값에 따라 선택도가 크게 달라지는 조건(나이, 키워드)이 있는지 확인"""
+    return age is not None or bool(keyword)
+
+def execute_policy_list(cursor, region=None, category=None, age=None, keyword=None, limit=50, offset=0):
+    """/api/policies 목록 쿼리를 조건 조합별 prepared statement로 실행"""
+    query, params = build_policy_list_query(region, category, age, keyword, limit, offset)
+    execute_prepared(cursor, f"policy_list_{filter_shape(region, category, age, keyword)}", query, params,
+                     custom_plan=needs_custom_plan(age, keyword))
+
+def execute_policy_count(cursor, region=None, category=None, age=None, keyword=None):
+    """/api/policies 총 개수 쿼리를 조건 조합별 prepared statement로 실행"""
+    query, params = build_policy_count_query(region, category, age, keyword)
+    execute_prepared(cursor, f"policy_count_{filter_shape(region, category, age, keyword)}", query, params,
+                     custom_plan=needs_custom_plan(age, keyword))
@@ -0,0 +1,349 @@
+"""
+API 프로세스 안의 쿼리 프로파일러
+- 실행된 쿼리를 모양(fingerprint)별로 묶어 호출 수와 실행 시간(합계/평균/최대/백분위)을 집계합니다.
+  리터럴과 자리표시자는 ?로 바꾸므로 같은 조건 조합의 쿼리는 값이 달라도 하나로 묶입니다.
+  (/api/policies의 조건 조합별 prepared statement는 EXECUTE policy_list_1010처럼 이름으로 구분됨)
+- SLOW_QUERY_MS보다 오래 걸린 쿼리는 같은 연결에서 EXPLAIN한 실행 계획과 함께 로그로 남깁니다.
+  (같은 모양은 SLOW_QUERY_EXPLAIN_INTERVAL초에 한 번만 EXPLAIN)
+- 결과는 ADMIN_TOKEN이 있어야 볼 수 있는 관리자 엔드포인트에서 확인합니다.
+    GET    /api/admin/queries?sort=total&limit=50   모양별 통계와 최근 느린 쿼리
+    DELETE /api/admin/queries                       통계 초기화
+- METRICS_MULTIPROC_DIR이 있으면(gunicorn.conf.py) 워커마다 집계를 그 아래 queries/<pid>.json으로 저장하고
+  (request_metrics의 저장 주기에 맞춰), 관리자 엔드포인트는 모든 워커의 집계를 합쳐 응답합니다.
+  종료된 워커의 집계는 gunicorn 마스터가 archive.json에 합쳐 둡니다. 없으면 요청을 받은 워커의 값만 응답합니다.
+"""
+
+import glob
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import psycopg2.extensions
+from flask import jsonify, request
+
+from admin_auth import ADMIN_TOKEN, admin_required
+from request_metrics import (
+    METRICS_ENABLED, METRICS_MULTIPROC_DIR, REGISTRY, query_observers, read_json_file, write_json_file
+)
+
+QUERY_PROFILER_ENABLED = os.getenv('QUERY_PROFILER', 'true').lower() == 'true'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 60))
+# 워커별 집계 파일 디렉토리 (측정 지표 저장 스레드가 함께 저장)
+QUERY_PROFILE_DIR = (os.path.join(METRICS_MULTIPROC_DIR, 'queries')
+                     if METRICS_ENABLED and METRICS_MULTIPROC_DIR else None)
+ARCHIVE_FILE = 'archive.json'
+# DELETE /api/admin/queries 시각 (이보다 먼저 시작한 워커는 다음 저장 때 집계를 비움)
+RESET_FILE = 'reset.json'
+
+# 백분위 계산에 쓰는 모양별 최근 실행 시간 수와 보관할 느린 쿼리 수
+RECENT_SAMPLES = 256
+SLOW_LOG_SIZE = 100
+# 모양 계산 결과를 재사용할 SQL 문자열 수 (쿼리 문자열은 템플릿에서 만들어지므로 종류가 적음)
+FINGERPRINT_CACHE_SIZE = 2048
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+# execute_prepared가 custom plan을 쓸 때 붙이는 앞부분
+_SET_LOCAL = re.compile(r"^\s*SET\s+LOCAL\s+[^;]+;\s*", re.IGNORECASE)
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|VALUES|EXECUTE)\b", re.IGNORECASE)
+
+_fingerprints = {}
+
+def fingerprint(sql):
+    """쿼리 모양: 리터럴/자리표시자를 ?로, 값 목록을 (?+)로 바꾸고 공백 정리"""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    cached = _fingerprints.get(sql)
+    if cached is not None:
+        return cached
+    text = _SET_LOCAL.sub('', sql)
+    text = _STRING.sub('?', text)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    text = _VALUE_LIST.sub('(?+)', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    if len(_fingerprints) < FINGERPRINT_CACHE_SIZE:
+        _fingerprints[sql] = text
+    return text
+
+class QueryStats:
+    """한 쿼리 모양의 집계"""
+
+    def __init__(self, query, recent_size=RECENT_SAMPLES):
+        self.query = query
+        self.id = hashlib.md5(query.encode('utf-8')).hexdigest()[:12]
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.recent = deque(maxlen=recent_size)
+        self.routes = {}
+        self.plan = None
+        self.explained_at = 0.0
+
+    def add(self, seconds, route, slow):
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        self.routes[route] = self.routes.get(route, 0) + 1
+        if slow:
+            self.slow += 1
+
+    def dump(self):
+        """다른 워커의 집계와 합칠 수 있는 값"""
+        return {"query": self.query, "calls": self.calls, "total": self.total, "max": self.max,
+                "slow": self.slow, "recent": list(self.recent), "routes": self.routes, "plan": self.plan}
+
+    def merge(self, data):
+        self.calls += data['calls']
+        self.total += data['total']
+        self.max = max(self.max, data['max'])
+        self.slow += data['slow']
+        self.recent.extend(data['recent'])
+        for route, calls in data['routes'].items():
+            self.routes[route] = self.routes.get(route, 0) + calls
+        self.plan = self.plan or data['plan']
+
+    def as_dict(self):
+        recent = sorted(self.recent)
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p / 100 * len(recent)))] * 1000 if recent else 0.0
+
+        return {
+            "id": self.id,
+            "query": self.query,
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.calls * 1000, 3) if self.calls else 0.0,
+            "p50_ms": round(percentile(50), 3),
+            "p95_ms": round(percentile(95), 3),
+            "max_ms": round(self.max * 1000, 3),
+            "slow_calls": self.slow,
+            "routes": self.routes,
+            "plan": self.plan,
+        }
+
+class QueryProfiler:
+    """request_metrics.query_observers에 등록되어 모든 쿼리를 모양별로 집계"""
+
+    SORT_KEYS = {
+        'total': lambda stats: stats.total,
+        'mean': lambda stats: stats.total / stats.calls if stats.calls else 0.0,
+        'max': lambda stats: stats.max,
+        'calls': lambda stats: stats.calls,
+        'slow': lambda stats: stats.slow,
+    }
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS, explain_interval=SLOW_QUERY_EXPLAIN_INTERVAL,
+                 directory=QUERY_PROFILE_DIR):
+        self.slow_seconds = slow_ms / 1000
+        self.explain_interval = explain_interval
+        self.directory = directory
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._slow_log = deque(maxlen=SLOW_LOG_SIZE)
+
+    def observe(self, sql, params, seconds, cursor, route):
+        query = fingerprint(sql)
+        slow = seconds >= self.slow_seconds
+        with self._lock:
+            stats = self._stats.get(query)
+            if stats is None:
+                stats = self._stats[query] = QueryStats(query)
+            stats.add(seconds, route, slow)
+            explain = slow and time.monotonic() - stats.explained_at >= self.explain_interval
+            if explain:
+                stats.explained_at = time.monotonic()
+        if slow:
+            self._log_slow(stats, sql, params, seconds, cursor, route, explain)
+
+    def _log_slow(self, stats, sql, params, seconds, cursor, route, explain):
+        plan = self._explain(cursor, sql, params) if explain else None
+        if plan is not None:
+            stats.plan = plan
+        self._slow_log.append({
+            "id": stats.id,
+            "route": route,
+            "duration_ms": round(seconds * 1000, 3),
+            "params": [str(value)[:100] for value in params] if isinstance(params, (list, tuple)) else params,
+            "at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "worker": os.getpid(),
+        })
+        print(f"🐢 느린 쿼리 {seconds * 1000:.1f}ms [{stats.id}] {route}: {stats.query[:200]}")
+        if plan:
+            print("   " + "\n   ".join(plan))
+
+    def _explain(self, cursor, sql, params):
+        """느린 쿼리의 실행 계획 (같은 연결에서 실행해야 prepared statement를 EXPLAIN할 수 있음)"""
+        if cursor is None or cursor.connection.closed:
+            return None
+        if isinstance(sql, bytes):
+            sql = sql.decode('utf-8', 'replace')
+        statement = _SET_LOCAL.sub('', sql)
+        if not _EXPLAINABLE.match(statement):
+            return None
+        conn = cursor.connection
+        # EXPLAIN은 측정하지 않는 기본 커서로 실행하고, 실패해도 요청의 트랜잭션이 깨지지 않게 savepoint 사용
+        with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as explain_cursor:
+            in_transaction = not conn.autocommit
+            try:
+                if in_transaction:
+                    explain_cursor.execute("SAVEPOINT query_profiler_explain")
+                explain_cursor.execute("EXPLAIN " + statement, params or None)
+                plan = [row[0] for row in explain_cursor.fetchall()]
+                if in_transaction:
+                    explain_cursor.execute("RELEASE SAVEPOINT query_profiler_explain")
+                return plan
+            except Exception as e:
+                if in_transaction:
+                    explain_cursor.execute("ROLLBACK TO SAVEPOINT query_profiler_explain")
+                return [f"EXPLAIN 실패: {e}"]
+
+    def dump(self):
+        """이 워커의 집계 (워커별 파일 내용)"""
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "stats": [stats.dump() for stats in self._stats.values()],
+                "slow_queries": list(self._slow_log),
+            }
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def flush(self):
+        """이 워커의 집계를 파일로 저장 (다른 워커에서 초기화했으면 먼저 비움)"""
+        os.makedirs(self.directory, exist_ok=True)
+        reset_at = read_json_file(self._path(RESET_FILE)).get('at', 0)
+        if reset_at > self.started_at:
+            self._clear(reset_at)
+        write_json_file(self._path(f"{os.getpid()}.json"), self.dump())
+
+    def collect(self):
+        """모든 워커 파일과 archive.json을 합친 (시작 시각, 워커 수, 모양별 QueryStats, 느린 쿼리)"""
+        self.flush()
+        reset_at = read_json_file(self._path(RESET_FILE)).get('at', 0)
+        started_at, workers, merged, slow_log = self.started_at, 0, {}, []
+        for path in glob.glob(self._path('*.json')):
+            if os.path.basename(path) == RESET_FILE:
+                continue
+            data = read_json_file(path)
+            # 초기화 전에 저장된 파일은 해당 워커가 다음에 저장할 때까지 제외
+            if not data or data['started_at'] < reset_at:
+                continue
+            if os.path.basename(path) != ARCHIVE_FILE:
+                workers += 1
+            started_at = min(started_at, data['started_at'])
+            for dumped in data['stats']:
+                stats = merged.get(dumped['query'])
+                if stats is None:
+                    stats = merged[dumped['query']] = QueryStats(dumped['query'], recent_size=None)
+                stats.merge(dumped)
+            slow_log += data['slow_queries']
+        slow_log.sort(key=lambda entry: entry['at'])
+        return started_at, workers, merged, slow_log[-SLOW_LOG_SIZE:]
+
+    def report(self, sort='total', limit=50):
+        """모양별 통계 (워커별 파일이 있으면 모든 워커 합계, 없으면 이 워커의 값만)"""
+        key = self.SORT_KEYS.get(sort, self.SORT_KEYS['total'])
+        if self.directory is not None:
+            started_at, workers, merged, slow_log = self.collect()
+            scope = {"scope": "all_workers", "workers": workers}
+        else:
+            with self._lock:
+                started_at, merged, slow_log = self.started_at, dict(self._stats), list(self._slow_log)
+            scope = {"scope": "single_worker", "worker": os.getpid()}
+        with self._lock:
+            ordered = sorted(merged.values(), key=key, reverse=True)[:limit]
+            queries = [stats.as_dict() for stats in ordered]
+        return {
+            "since": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started_at)),
+            **scope,
+            "slow_query_ms": self.slow_seconds * 1000,
+            "query_shapes": len(merged),
+            "queries": queries,
+            "slow_queries": slow_log[::-1],
+        }
+
+    def _clear(self, started_at):
+        with self._lock:
+            self._stats.clear()
+            self._slow_log.clear()
+            self.started_at = started_at
+
+    def reset(self):
+        """통계 초기화 (워커별 파일이 있으면 모든 워커의 집계와 archive.json도)"""
+        now = time.time()
+        self._clear(now)
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        write_json_file(self._path(RESET_FILE), {"at": now})
+        archive_path = self._path(ARCHIVE_FILE)
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+
+    def mark_process_dead(self, pid):
+        """종료된 워커 파일을 archive.json에 합친 뒤 삭제 (gunicorn 마스터의 child_exit에서 호출)"""
+        path = self._path(f"{pid}.json")
+        data = read_json_file(path)
+        reset_at = read_json_file(self._path(RESET_FILE)).get('at', 0)
+        if data and data['started_at'] >= reset_at:
+            archive_path = self._path(ARCHIVE_FILE)
+            archive = read_json_file(archive_path)
+            if not archive or archive['started_at'] < reset_at:
+                archive = {"started_at": data['started_at'], "stats": [], "slow_queries": []}
+            merged = {}
+            for dumped in archive['stats'] + data['stats']:
+                stats = merged.get(dumped['query'])
+                if stats is None:
+                    stats = merged[dumped['query']] = QueryStats(dumped['query'])
+                stats.merge(dumped)
+            slow_log = sorted(archive['slow_queries'] + data['slow_queries'], key=lambda entry: entry['at'])
+            write_json_file(archive_path, {
+                "started_at": min(archive['started_at'], data['started_at']),
+                "stats": [stats.dump() for stats in merged.values()],
+                "slow_queries": slow_log[-SLOW_LOG_SIZE:],
+            })
+        if os.path.exists(path):
+            os.remove(path)
+
+query_profiler = QueryProfiler()
+
+@admin_required
+def query_report():
+    """GET /api/admin/queries: 쿼리 모양별 통계 (sort=total|mean|max|calls|slow, limit)"""
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except ValueError:
+        return jsonify({"success": False, "error": "limit은 정수여야 합니다."}), 400
+    return jsonify({"success": True, **query_profiler.report(request.args.get('sort', 'total'), limit)})
+
+@admin_required
+def reset_query_report():
+    """DELETE /api/admin/queries: 통계 초기화"""
+    query_profiler.reset()
+    return jsonify({"success": True})
+
+def init_query_profiler(app):
+    """쿼리 관찰자와 관리자 엔드포인트 등록"""
+    if not QUERY_PROFILER_ENABLED:
+        return
+    query_observers.append(query_profiler.observe)
+    if query_profiler.directory is not None:
+        REGISTRY.flush_callbacks.append(query_profiler.flush)
+    app.add_url_rule('/api/admin/queries', 'query_report', query_report, methods=['GET'])
+    app.add_url_rule('/api/admin/queries', 'reset_query_report', reset_query_report, methods=['DELETE'])
+    print(f"✅ 쿼리 프로파일러: {SLOW_QUERY_MS:.0f}ms 이상 느린 쿼리 기록"
+          + (" (워커 합산)" if query_profiler.directory else " (이 워커만)")
+          + ("" if ADMIN_TOKEN else " (ADMIN_TOKEN이 없어 관리자 엔드포인트 비활성화)"))
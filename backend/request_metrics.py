@@ -0,0 +1,379 @@
+"""
+API 요청 측정 지표 (Prometheus 텍스트 형식)
+- 경로별 응답 시간 히스토그램, 상태 코드별 요청 수, 처리 중인 요청 수
+- 요청별 DB 쿼리 수/시간 (InstrumentedCursor를 커넥션의 cursor_factory로 사용)
+- LLM 호출 시간과 토큰 사용량, 동시 호출 수와 서킷 브레이커 상태 (/api/chat, llm_client.py)
+
+/metrics는 관리자 엔드포인트와 같이 ADMIN_TOKEN이 있어야 볼 수 있습니다. (admin_auth.py)
+
+측정값은 워커 프로세스 메모리에 모으고, METRICS_MULTIPROC_DIR이 있으면 워커마다
+METRICS_FLUSH_INTERVAL초에 한 번 그 디렉토리의 <pid>.json 파일로 저장합니다.
+/metrics는 어느 워커가 받더라도 모든 워커의 파일을 합쳐 서버 전체의 값 하나로 응답합니다.
+(카운터/히스토그램은 합계, 게이지는 살아 있는 워커의 합계 또는 최댓값)
+종료된 워커의 카운터/히스토그램은 gunicorn 마스터가 archive.json에 합쳐 두므로 값이 줄어들지 않습니다.
+gunicorn.conf.py로 실행하면 디렉토리 설정과 종료된 워커 정리를 자동으로 합니다.
+요청 경로에서는 잠금 한 번과 bisect 정도만 하므로 부담이 거의 없습니다.
+"""
+
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+import psycopg2.extensions
+from flask import Response, request
+
+from admin_auth import ADMIN_TOKEN, admin_required
+
+# /metrics 엔드포인트 사용 여부
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# 워커별 측정값 파일 디렉토리 (없으면 이 프로세스의 값만 응답)
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1))
+# 종료된 워커의 카운터/히스토그램을 합쳐 두는 파일
+ARCHIVE_FILE = 'archive.json'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """라벨 값 튜플별로 값을 저장하는 지표"""
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def dump(self):
+        """파일 저장용 [[라벨 값 목록, 값], ...]"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._series.items()]
+
+    def merge(self, series, value):
+        """series(라벨 튜플 → 값)에 다른 워커의 값 합치기"""
+        for key, item in value:
+            key = tuple(key)
+            series[key] = series[key] + item if key in series else item
+
+    def render(self, series=None):
+        if series is None:
+            series = {}
+            self.merge(series, self.dump())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [line for key, value in sorted(series.items()) for line in self._render_series(key, value)]
+        return lines
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"]
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+class Gauge(Metric):
+    """mode: 여러 워커의 값을 합치는 방법 ('sum' 또는 'max', 종료된 워커의 값은 버림)"""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labels=(), mode='sum'):
+        super().__init__(name, documentation, labels)
+        self.mode = mode
+
+    def merge(self, series, value):
+        if self.mode != 'max':
+            return super().merge(series, value)
+        for key, item in value:
+            key = tuple(key)
+            series[key] = max(series[key], item) if key in series else item
+
+    def add(self, labels=(), amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def set(self, labels=(), value=0):
+        with self._lock:
+            self._series[labels] = value
+
+class Histogram(Metric):
+    """구간별 개수는 누적하지 않고 저장하고 출력할 때 누적"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def dump(self):
+        with self._lock:
+            return [[list(key), [list(counts), total, count]] for key, (counts, total, count) in self._series.items()]
+
+    def merge(self, series, value):
+        for key, (counts, total, count) in value:
+            key = tuple(key)
+            current = series.get(key)
+            if current is None:
+                series[key] = [list(counts), total, count]
+            else:
+                current[0] = [a + b for a, b in zip(current[0], counts)]
+                current[1] += total
+                current[2] += count
+
+    def _render_series(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, float('inf')), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labels, key, [('le', _format_number(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, key)
+        lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+def write_json_file(path, data):
+    """같은 디렉토리의 임시 파일에 쓴 뒤 교체 (읽는 쪽이 쓰다 만 파일을 보지 않도록)"""
+    fd, temp_path = tempfile.mkstemp(prefix='.metrics-', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def read_json_file(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+class MetricsRegistry:
+    def __init__(self, directory=METRICS_MULTIPROC_DIR, flush_interval=METRICS_FLUSH_INTERVAL):
+        self.metrics = []
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._flusher_pid = None
+        self._flusher_lock = threading.Lock()
+        # 같은 주기로 함께 저장할 워커별 데이터 (query_profiler에서 등록)
+        self.flush_callbacks = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def worker_file(self, pid=None):
+        return os.path.join(self.directory, f"{pid or os.getpid()}.json")
+
+    def flush(self):
+        """이 워커의 측정값을 파일로 저장"""
+        write_json_file(self.worker_file(), {metric.name: metric.dump() for metric in self.metrics})
+        for callback in self.flush_callbacks:
+            callback()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"⚠️ 측정 지표 저장 실패: {e}")
+
+    def start_flusher(self):
+        """워커에서 처음 호출될 때 저장 스레드 시작 (gunicorn은 앱을 import한 뒤 fork할 수 있으므로 pid로 확인)"""
+        if self.directory is None or self._flusher_pid == os.getpid():
+            return
+        with self._flusher_lock:
+            if self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def collect(self):
+        """모든 워커 파일과 archive.json을 합친 {지표 이름: series}"""
+        self.flush()
+        merged = {metric.name: {} for metric in self.metrics}
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            data = read_json_file(path)
+            for metric in self.metrics:
+                if metric.name in data:
+                    metric.merge(merged[metric.name], data[metric.name])
+        return merged
+
+    def render(self):
+        if self.directory is None:
+            return '\n'.join(line for metric in self.metrics for line in metric.render()) + '\n'
+        merged = self.collect()
+        return '\n'.join(line for metric in self.metrics for line in metric.render(merged[metric.name])) + '\n'
+
+    def mark_process_dead(self, pid):
+        """종료된 워커 파일을 archive.json에 합친 뒤 삭제 (게이지는 버림, gunicorn 마스터의 child_exit에서 호출)"""
+        path = self.worker_file(pid)
+        data = read_json_file(path)
+        if data:
+            archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+            archive = read_json_file(archive_path)
+            for metric in self.metrics:
+                if isinstance(metric, Gauge) or metric.name not in data:
+                    continue
+                series = {}
+                metric.merge(series, archive.get(metric.name, []))
+                metric.merge(series, data[metric.name])
+                archive[metric.name] = [[list(key), value] for key, value in series.items()]
+            write_json_file(archive_path, archive)
+        if os.path.exists(path):
+            os.remove(path)
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    'http_requests_total', '처리한 HTTP 요청 수', ('method', 'route', 'status')))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    'http_request_duration_seconds', 'HTTP 요청 처리 시간', ('method', 'route')))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    'http_requests_in_flight', '처리 중인 HTTP 요청 수'))
+DB_QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    'http_request_db_queries', '요청 하나가 실행한 DB 쿼리 수', ('route',), QUERY_COUNT_BUCKETS))
+DB_TIME_PER_REQUEST = REGISTRY.register(Histogram(
+    'http_request_db_seconds', '요청 하나의 DB 쿼리 시간 합계', ('route',)))
+DB_QUERIES = REGISTRY.register(Counter(
+    'db_queries_total', '실행한 DB 쿼리 수', ('route',)))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    'llm_request_duration_seconds', 'LLM API 호출 시간', ('model', 'outcome'), LLM_BUCKETS))
+LLM_TOKENS = REGISTRY.register(Counter(
+    'llm_tokens_total', 'LLM 토큰 사용량', ('model', 'type')))
+LLM_IN_FLIGHT = REGISTRY.register(Gauge(
+    'llm_in_flight', '처리 중인 LLM 호출 수', ('model',)))
+LLM_CIRCUIT_STATE = REGISTRY.register(Gauge(
+    'llm_circuit_state', 'LLM 서킷 브레이커 상태 (0: 정상, 1: 시험 호출, 2: 차단, 워커 중 최댓값)', ('model',), mode='max'))
+LLM_REJECTED = REGISTRY.register(Counter(
+    'llm_rejected_total', '대체 응답으로 끝난 LLM 호출 수', ('model', 'reason')))
+LLM_RETRIES = REGISTRY.register(Counter(
+    'llm_retries_total', 'LLM 호출 재시도 수', ('model',)))
+
+# 현재 스레드가 처리 중인 요청의 DB 사용량 (요청 밖의 쿼리는 route="-"로 집계)
+_request_state = threading.local()
+# 쿼리가 성공할 때마다 호출되는 함수 목록 (sql, params, seconds, cursor, route) - query_profiler에서 등록
+query_observers = []
+
+def record_query(sql, params, seconds, cursor=None, failed=False):
+    """InstrumentedCursor가 쿼리 실행 후 호출"""
+    state = _request_state
+    if getattr(state, 'route', None) is not None:
+        state.db_queries += 1
+        state.db_seconds += seconds
+    else:
+        DB_QUERIES.inc(('-',))
+    if not failed:
+        for observer in query_observers:
+            observer(sql, params, seconds, cursor, getattr(state, 'route', None) or '-')
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """execute 시간을 재서 요청별 DB 사용량에 더하는 커서 (connect(cursor_factory=...)로 사용)"""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception:
+            record_query(query, vars, time.perf_counter() - started, self, failed=True)
+            raise
+        record_query(query, vars, time.perf_counter() - started, self)
+        return result
+
+@contextmanager
+def time_llm_call(model):
+    """LLM 호출 시간 측정 (블록 안에서 call['usage']에 응답의 usage를 넣으면 토큰 수도 기록)"""
+    call = {'usage': None}
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield call
+        outcome = 'ok'
+    finally:
+        LLM_LATENCY.observe((model, outcome), time.perf_counter() - started)
+        usage = call['usage']
+        if usage:
+            for kind in ('prompt_tokens', 'completion_tokens'):
+                if usage.get(kind):
+                    LLM_TOKENS.inc((model, kind.split('_')[0]), usage[kind])
+
+def _start_request():
+    REGISTRY.start_flusher()
+    state = _request_state
+    state.started = time.perf_counter()
+    state.route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    state.status = 500
+    state.db_queries = 0
+    state.db_seconds = 0.0
+    HTTP_IN_FLIGHT.add()
+
+def _capture_status(response):
+    _request_state.status = response.status_code
+    return response
+
+def _finish_request(exception=None):
+    state = _request_state
+    route = getattr(state, 'route', None)
+    if route is None:
+        return
+    elapsed = time.perf_counter() - state.started
+    HTTP_IN_FLIGHT.add(amount=-1)
+    HTTP_REQUESTS.inc((request.method, route, str(state.status)))
+    HTTP_LATENCY.observe((request.method, route), elapsed)
+    DB_QUERIES_PER_REQUEST.observe((route,), state.db_queries)
+    if state.db_queries:
+        DB_TIME_PER_REQUEST.observe((route,), state.db_seconds)
+        DB_QUERIES.inc((route,), state.db_queries)
+    state.route = None
+
+@admin_required
+def metrics_endpoint():
+    """GET /metrics: Prometheus 텍스트 형식 (관리자 토큰 필요)"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+def init_request_metrics(app):
+    """Flask 앱에 요청 측정과 /metrics 엔드포인트 등록"""
+    if not METRICS_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_capture_status)
+    app.teardown_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint, methods=['GET'])
+    scope = f"워커 합산, {REGISTRY.directory}" if REGISTRY.directory else "이 프로세스"
+    print(f"✅ 요청 측정 지표: /metrics ({scope})"
+          + ("" if ADMIN_TOKEN else " (ADMIN_TOKEN이 없어 /metrics 비활성화)"))
@@ -0,0 +1,135 @@
+"""
+스키마 변경 적용
+이미 초기화된 데이터베이스에도 새 컬럼/인덱스가 반영되도록 여러 번 실행해도 안전한 문장만 모아둡니다.
+새로 만드는 데이터베이스도 database_schema.sql 실행 후 이 목록을 적용합니다.
+(POLICY_INDEXES의 부분/커버링 인덱스는 여기에만 정의되어 있습니다)
+"""
+
+# 연령 조건: 두 값이 모두 NULL이면 전체 연령, 하나만 NULL이거나 min > max이면 빈 범위
+# ("나이 BETWEEN age_min AND age_max OR 둘 다 NULL" 조건과 정확히 같은 의미)
+AGE_RANGE_EXPRESSION = '''
+    CASE
+        WHEN age_min IS NULL AND age_max IS NULL THEN int4range(NULL, NULL)
+        WHEN age_min IS NULL OR age_max IS NULL OR age_min > age_max THEN 'empty'::int4range
+        ELSE int4range(age_min, age_max, '[]')
+    END
+'''
+
+# 응답 내용에 영향을 주는 컬럼 (view_count 변경은 데이터 버전을 올리지 않음)
+POLICY_CONTENT_COLUMNS = [
+    'title', 'description', 'url', 'region_id', 'category_id', 'age_min', 'age_max',
+    'income_min', 'income_max', 'application_start', 'application_end',
+    'support_amount_min', 'support_amount_max', 'conditions', 'benefits', 'application_period',
+    'application_method', 'required_documents', 'contact_info', 'status', 'priority',
+]
+
+BUMP_DATA_VERSION_FUNCTION = '''
+    CREATE OR REPLACE FUNCTION bump_policy_data_version()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE policy_data_version SET version = version + 1, updated_at = clock_timestamp();
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+'''
+
+def create_trigger_if_missing(name, table, events):
+    """트리거가 없을 때만 생성하는 DO 블록 (매 시작마다 DROP/CREATE로 테이블을 잠그지 않도록)"""
+    return f'''
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = '{name}') THEN
+            CREATE TRIGGER {name} AFTER {events} ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_policy_data_version();
+        END IF;
+    END
+    $$
+'''
+
+# 활성 정책 조회용 부분/커버링 인덱스: 이름 → DDL (index_advisor.py도 이 정의를 사용)
+POLICY_INDEXES = {
+    'idx_policies_age_range':
+        "CREATE INDEX IF NOT EXISTS idx_policies_age_range ON policies USING gist(age_range) "
+        "WHERE status = 'active'",
+    'idx_policies_active_rank':
+        '''CREATE INDEX IF NOT EXISTS idx_policies_active_rank
+           ON policies(priority DESC, view_count DESC, created_at DESC)
+           WHERE status = 'active' ''',
+    'idx_policies_active_region_rank':
+        '''CREATE INDEX IF NOT EXISTS idx_policies_active_region_rank
+           ON policies(region_id, priority DESC, view_count DESC, created_at DESC)
+           INCLUDE (category_id, age_min, age_max)
+           WHERE status = 'active' ''',
+    'idx_policies_active_category_rank':
+        '''CREATE INDEX IF NOT EXISTS idx_policies_active_category_rank
+           ON policies(category_id, priority DESC, view_count DESC, created_at DESC)
+           INCLUDE (region_id, age_min, age_max)
+           WHERE status = 'active' ''',
+}
+
+SCHEMA_MIGRATIONS = [
+    "ALTER TABLE policies ADD COLUMN IF NOT EXISTS application_period TEXT",
+    "ALTER TABLE policies ADD COLUMN IF NOT EXISTS age_range int4range "
+    "GENERATED ALWAYS AS (" + AGE_RANGE_EXPRESSION + ") STORED",
+    *POLICY_INDEXES.values(),
+    # 크롤링 파이프라인이 URL로 기존 정책을 찾아 갱신
+    "CREATE INDEX IF NOT EXISTS idx_policies_url ON policies(url)",
+    # 정책 데이터 버전 (HTTP ETag/Last-Modified 계산용, 항상 한 행)
+    '''CREATE TABLE IF NOT EXISTS policy_data_version (
+           id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+           version BIGINT NOT NULL DEFAULT 1,
+           updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+       )''',
+    "INSERT INTO policy_data_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING",
+    BUMP_DATA_VERSION_FUNCTION,
+    create_trigger_if_missing(
+        'policies_bump_data_version', 'policies',
+        f"INSERT OR DELETE OR TRUNCATE OR UPDATE OF {', '.join(POLICY_CONTENT_COLUMNS)}"),
+    create_trigger_if_missing('regions_bump_data_version', 'regions', 'INSERT OR UPDATE OR DELETE OR TRUNCATE'),
+    create_trigger_if_missing('categories_bump_data_version', 'categories', 'INSERT OR UPDATE OR DELETE OR TRUNCATE'),
+    # /api/chat 대화 세션 (chat_sessions.py)
+    '''CREATE TABLE IF NOT EXISTS chat_sessions (
+           id TEXT PRIMARY KEY,
+           summary TEXT NOT NULL DEFAULT '',
+           messages JSONB NOT NULL DEFAULT '[]',
+           updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+       )''',
+    "CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated_at ON chat_sessions(updated_at)",
+]
+
+def split_sql_statements(sql):
+    """SQL 스크립트를 문장 단위로 분리 ($$ ... $$ 함수 본문 안의 세미콜론은 무시)"""
+    statements = []
+    current = []
+    in_dollar_quote = False
+    for i, part in enumerate(sql.split('$$')):
+        if i > 0:
+            current.append('$$')
+        if in_dollar_quote:
+            current.append(part)
+        else:
+            pieces = part.split(';')
+            current.append(pieces[0])
+            for piece in pieces[1:]:
+                statements.append(''.join(current).strip())
+                current = [piece]
+        in_dollar_quote = not in_dollar_quote
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+def apply_schema_migrations(conn):
+    """스키마 변경 적용 (문장별 SAVEPOINT로 실패해도 나머지는 계속 진행)"""
+    cursor = conn.cursor()
+    applied = 0
+    for statement in SCHEMA_MIGRATIONS:
+        cursor.execute("SAVEPOINT schema_migration")
+        try:
+            cursor.execute(statement)
+            cursor.execute("RELEASE SAVEPOINT schema_migration")
+            applied += 1
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT schema_migration")
+            print(f"⚠️ 스키마 변경 실패: {e}")
+    conn.commit()
+    print(f"✅ 스키마 변경 {applied}/{len(SCHEMA_MIGRATIONS)}개 확인 완료")
+    return applied
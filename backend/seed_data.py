@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+합성 정책 데이터 생성 스크립트
+인덱스 점검과 성능 측정을 위해 로컬 PostgreSQL에 가짜 정책 데이터를 채워 넣습니다.
+
+사용법:
+    python seed_data.py --count 10000
+    python seed_data.py --count 10000 --dsn postgresql://postgres@localhost:5432/welfare
+    python seed_data.py --count 10000 --sqlite welfare_policies.db
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+import psycopg2
+import psycopg2.extras
+
+from schema_migrations import apply_schema_migrations
+from sqlite_db import initialize_sqlite_database
+
+TITLE_WORDS = ['청년', '신혼부부', '대학생', '구직자', '창업', '주거', '월세', '전세', '교통비', '문화',
+               '저축', '장학금', '의료비', '취업', '자립', '마음건강', '역량강화', '면접정장']
+TITLE_SUFFIXES = ['지원사업', '지원금', '바우처', '프로그램', '대출 이자지원', '통장', '수당']
+CONDITION_SENTENCES = [
+    '신청일 현재 해당 지역에 주민등록을 둔 청년',
+    '기준 중위소득 150% 이하 가구의 구성원',
+    '무주택자이며 본인 명의의 임대차 계약을 체결한 자',
+    '현재 근로활동 중이며 근로소득이 월 50만원 초과인 자',
+    '최종학교 졸업 후 2년 이내의 미취업 청년',
+]
+# SQLite 배포의 region 컬럼 값 (크롤링 JSON과 같은 약칭)
+SQLITE_REGIONS = ['서울', '인천', '경기']
+BENEFIT_SENTENCES = [
+    '월 최대 20만원을 최장 12개월간 지원합니다',
+    '본인 저축액과 동일한 금액을 매칭하여 적립합니다',
+    '연 1회 최대 100만원 한도 내 실비를 지원합니다',
+    '전문 상담사와의 1:1 상담 프로그램을 무료로 제공합니다',
+    '대출 이자의 최대 2%를 지원합니다',
+]
+
+def generate_policies(count, seed=42):
+    """합성 정책 데이터 생성 (region_index, category_index는 0부터 시작하는 순번)"""
+    rng = random.Random(seed)
+    base_time = datetime(2024, 1, 1)
+
+    for i in range(count):
+        age_roll = rng.random()
+        if age_roll < 0.15:
+            age_min, age_max = None, None
+        elif age_roll < 0.18:
+            # 하한만 있는 데이터 (크롤링 결과에 실제로 존재)
+            age_min, age_max = rng.choice([19, 39]), None
+        else:
+            age_min = rng.choice([0, 15, 18, 19, 20, 24])
+            age_max = age_min + rng.choice([9, 14, 19, 20, 29, 39])
+
+        created_at = base_time + timedelta(minutes=rng.randint(0, 60 * 24 * 600))
+        yield {
+            'title': f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {rng.choice(TITLE_SUFFIXES)} {i}",
+            'description': ' '.join(rng.sample(BENEFIT_SENTENCES, 2)),
+            'url': f"https://example.go.kr/policy/{i}",
+            'region_index': rng.randrange(1 << 16),
+            'category_index': rng.randrange(1 << 16),
+            'age_min': age_min,
+            'age_max': age_max,
+            'income_min': None,
+            'income_max': rng.choice([None, 150, 200, 300, 500]),
+            'support_amount_min': rng.choice([None, 10, 20, 50]),
+            'support_amount_max': rng.choice([None, 100, 200, 500, 1000]),
+            'conditions': ' '.join(rng.sample(CONDITION_SENTENCES, 3)),
+            'benefits': ' '.join(rng.sample(BENEFIT_SENTENCES, 3)),
+            'application_period': rng.choice(['2025.05.01~2025.05.21', '상시', '미정']),
+            'status': 'active' if rng.random() < 0.9 else rng.choice(['inactive', 'expired']),
+            'priority': rng.choice([0, 0, 0, 1, 2, 5]),
+            'view_count': int(rng.paretovariate(1.5) * 10),
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+def ensure_schema(conn, schema_file='database_schema.sql'):
+    """policies 테이블이 없으면 스키마 파일 실행"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT EXISTS (
+            SELECT FROM information_schema.tables
+            WHERE table_name = 'policies'
+        );
+    """)
+    if not cursor.fetchone()[0]:
+        print("📊 테이블 생성 중...")
+        with open(schema_file, 'r', encoding='utf-8') as f:
+            cursor.execute(f.read())
+        conn.commit()
+    apply_schema_migrations(conn)
+
+def seed_postgres(conn, count, seed=42, truncate=True):
+    """PostgreSQL policies 테이블에 합성 데이터 삽입"""
+    ensure_schema(conn)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT id FROM regions WHERE level = 1 ORDER BY id")
+    region_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT id FROM categories ORDER BY id")
+    category_ids = [row[0] for row in cursor.fetchall()]
+    if not region_ids or not category_ids:
+        raise RuntimeError("regions/categories 기본 데이터가 없습니다.")
+
+    if truncate:
+        cursor.execute("TRUNCATE policies RESTART IDENTITY CASCADE")
+
+    columns = ['title', 'description', 'url', 'region_id', 'category_id', 'age_min', 'age_max',
+               'income_min', 'income_max', 'support_amount_min', 'support_amount_max',
+               'conditions', 'benefits', 'application_period', 'status', 'priority', 'view_count',
+               'created_at', 'updated_at']
+    rows = []
+    for policy in generate_policies(count, seed):
+        policy['region_id'] = region_ids[policy['region_index'] % len(region_ids)]
+        policy['category_id'] = category_ids[policy['category_index'] % len(category_ids)]
+        rows.append(tuple(policy[column] for column in columns))
+
+    psycopg2.extras.execute_values(
+        cursor,
+        f"INSERT INTO policies ({', '.join(columns)}) VALUES %s",
+        rows,
+        page_size=1000
+    )
+    conn.commit()
+
+    # 통계 갱신 (플래너가 새 데이터 분포를 알 수 있도록)
+    old_autocommit = conn.autocommit
+    conn.autocommit = True
+    cursor.execute("VACUUM ANALYZE policies, regions, categories")
+    conn.autocommit = old_autocommit
+
+    print(f"✅ 합성 정책 {count}개 삽입 완료")
+    return count
+
+def seed_sqlite(path, count, seed=42, truncate=True):
+    """SQLite welfare_policies 테이블에 합성 데이터 삽입 (age_range는 크롤링 결과처럼 나이 목록 JSON)"""
+    initialize_sqlite_database(path)
+    conn = sqlite3.connect(path)
+    if truncate:
+        conn.execute("DELETE FROM welfare_policies")
+
+    rows = []
+    for policy in generate_policies(count, seed):
+        if policy['age_min'] is not None and policy['age_max'] is not None:
+            age_range = list(range(policy['age_min'], policy['age_max'] + 1))
+        else:
+            age_range = []
+        rows.append((
+            policy['title'], policy['url'], SQLITE_REGIONS[policy['region_index'] % len(SQLITE_REGIONS)],
+            json.dumps(age_range), policy['application_period'], policy['conditions'], policy['benefits'],
+            policy['created_at'].isoformat(sep=' '), policy['updated_at'].isoformat(sep=' ')
+        ))
+
+    conn.executemany('''
+        INSERT INTO welfare_policies (
+            title, url, region, age_range, application_period, conditions, benefits, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+    print(f"✅ 합성 정책 {count}개 삽입 완료 ({path})")
+    return count
+
+def connect(dsn=None):
+    """DSN 또는 환경 변수 설정으로 PostgreSQL 연결"""
+    dsn = dsn or os.getenv('DATABASE_URL')
+    if dsn:
+        return psycopg2.connect(dsn)
+    from init_db import get_postgres_config
+    return psycopg2.connect(**get_postgres_config())
+
+def main():
+    parser = argparse.ArgumentParser(description='합성 정책 데이터 생성')
+    parser.add_argument('--count', type=int, default=10000, help='생성할 정책 수')
+    parser.add_argument('--seed', type=int, default=42, help='난수 시드')
+    parser.add_argument('--dsn', help='PostgreSQL 접속 문자열 (기본값: DATABASE_URL)')
+    parser.add_argument('--sqlite', help='PostgreSQL 대신 이 SQLite 파일에 생성')
+    parser.add_argument('--append', action='store_true', help='기존 정책을 지우지 않고 추가')
+    args = parser.parse_args()
+
+    if args.sqlite:
+        seed_sqlite(args.sqlite, args.count, args.seed, truncate=not args.append)
+        return
+
+    conn = connect(args.dsn)
+    try:
+        seed_postgres(conn, args.count, args.seed, truncate=not args.append)
+    except Exception as e:
+        print(f"❌ 데이터 생성 실패: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+API 응답 JSON 직렬화
+orjson이 설치되어 있으면 orjson으로, 없으면 표준 json 모듈로 응답을 만듭니다.
+Flask의 app.json에 연결하면 기존 jsonify 호출도 그대로 이 직렬화기를 사용합니다.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성: 없으면 표준 json 사용
+    orjson = None
+
+# 표준 json처럼 정수 키도 허용 (datetime/date는 orjson이 직접 ISO 8601 문자열로 출력)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+def default_serializer(value):
+    """JSON 기본 타입이 아닌 값 변환 (orjson/표준 json 공통)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"JSON으로 직렬화할 수 없는 타입: {type(value).__name__}")
+
+def dumps(payload):
+    """객체를 JSON bytes로 직렬화"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=default_serializer, option=ORJSON_OPTIONS)
+    return json.dumps(payload, default=default_serializer, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+def loads(data):
+    """JSON bytes/문자열을 객체로 변환"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+def rows_as_dicts(cursor, rows):
+    """일반 커서의 튜플 결과를 컬럼명 딕셔너리 목록으로 변환
+
+    RealDictCursor는 행마다 RealDictRow를 만든 뒤 dict(...)로 한 번 더 복사해야 하지만,
+    튜플 커서는 컬럼명 목록을 한 번만 만들고 zip으로 바로 딕셔너리를 만듭니다.
+    """
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in rows]
+
+def row_as_dict(cursor, row):
+    """튜플 한 행을 컬럼명 딕셔너리로 변환 (행이 없으면 None)"""
+    if row is None:
+        return None
+    return dict(zip([column[0] for column in cursor.description], row))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson 기반 Flask JSON provider (jsonify, request.get_json에서 사용)"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        # 문자열로 되돌리지 않고 bytes를 그대로 응답 본문에 사용
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+def install_json_provider(app):
+    """Flask 앱의 JSON 직렬화기를 FastJSONProvider로 교체"""
+    app.json = FastJSONProvider(app)
+    backend = 'orjson' if orjson is not None else 'json'
+    print(f"✅ JSON 직렬화: {backend}")
+    return app.json
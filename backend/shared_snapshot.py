@@ -0,0 +1,327 @@
+"""
+프로세스 간 공유 정책 스냅샷 파일
+gunicorn 마스터가 PolicySnapshot을 한 번 만들어 파일로 쓰고, 워커는 같은 파일을 읽기 전용 mmap으로 엽니다.
+행 JSON/비트셋/검색 텍스트는 페이지 캐시에 한 벌만 있으므로 워커 수가 늘어도 메모리 사용량이 늘지 않습니다.
+갱신은 임시 파일에 쓴 뒤 os.replace로 한 번에 교체하며, 워커는 파일이 바뀐 것을 확인하면 새로 매핑합니다.
+
+파일 구조: MAGIC(8) | 헤더 길이(8, little endian) | 헤더 JSON | 8바이트 단위로 정렬된 섹션들
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from policy_snapshot import MAX_INDEXED_AGE, PolicySnapshot, age_eligible, positions_to_mask
+from serializers import dumps, loads
+
+MAGIC = b'WPSNAP01'
+HEADER_PREFIX = struct.Struct('<8sQ')
+# 나이 컬럼의 NULL 표시
+NULL_INT = -(1 << 63)
+
+def default_snapshot_path(pid=None):
+    """기본 스냅샷 파일 위치 (/dev/shm이 있으면 메모리 파일시스템 사용)
+
+    같은 호스트에서 여러 서버(예: 운영 서버와 bench_api.py)가 실행되어도 서로의 파일을 덮어쓰거나
+    지우지 않도록 파일 이름에 발행하는 프로세스(gunicorn 마스터)의 pid를 넣습니다.
+    """
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, f'welfare_policy_snapshot-{pid or os.getpid()}.bin')
+
+def align8(size):
+    return (size + 7) & ~7
+
+def blob_with_offsets(chunks):
+    """bytes 목록을 이어 붙인 blob과 (개수 + 1)개의 시작 위치 배열"""
+    offsets = array('Q', [0])
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        offsets.append(total)
+    return b''.join(chunks), offsets
+
+class SectionWriter:
+    """8바이트 정렬된 섹션을 차례로 쌓고 [위치, 길이]를 반환"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def add(self, data):
+        padding = align8(self.size) - self.size
+        if padding:
+            self.chunks.append(b'\0' * padding)
+            self.size += padding
+        offset = self.size
+        self.chunks.append(data)
+        self.size += len(data)
+        return [offset, len(data)]
+
+def write_snapshot_file(snapshot, path):
+    """PolicySnapshot을 공유 스냅샷 파일로 저장 (임시 파일에 쓴 뒤 원자적으로 교체)"""
+    size = snapshot.size
+    mask_bytes = (size + 7) // 8
+    sections = SectionWriter()
+
+    def add_mask(mask):
+        return sections.add(mask.to_bytes(mask_bytes, 'little'))[0]
+
+    rows, row_offsets = blob_with_offsets([dumps(snapshot.row(position)) for position in range(size)])
+    id_order = sorted(snapshot.position_by_id.items())
+    header = {
+        'version': snapshot.version,
+        'size': size,
+        'mask_bytes': mask_bytes,
+        'region_field': snapshot.region_field,
+        'category_field': snapshot.category_field,
+        'sections': {
+            'rows': sections.add(rows),
+            'row_offsets': sections.add(row_offsets.tobytes()),
+            'ids': sections.add(array('q', snapshot._position_ids).tobytes()),
+            'sorted_ids': sections.add(array('q', [policy_id for policy_id, _ in id_order]).tobytes()),
+            'sorted_positions': sections.add(array('q', [position for _, position in id_order]).tobytes()),
+        },
+        # JSON 키는 문자열만 가능하므로 [값, 위치] 목록으로 저장 (지역 이름이 NULL일 수 있음)
+        'region_masks': [[value, add_mask(mask)] for value, mask in snapshot.region_masks.items()],
+        'category_masks': [[value, add_mask(mask)] for value, mask in snapshot.category_masks.items()],
+        'age_masks': None,
+        'income_index': None,
+    }
+
+    if snapshot._search_text is not None:
+        # 행 사이에 \0을 두어 키워드가 두 정책에 걸쳐 일치하지 않도록 함
+        text, text_offsets = blob_with_offsets([(text + '\0').encode('utf-8') for text in snapshot._search_text])
+        header['sections']['text'] = sections.add(text)
+        header['sections']['text_offsets'] = sections.add(text_offsets.tobytes())
+
+    if snapshot.age_masks is not None:
+        header['age_masks'] = [add_mask(mask) for mask in snapshot.age_masks]
+        for name, field in zip(('age_min', 'age_max'), snapshot.age_fields):
+            values = array('q', [NULL_INT if value is None else value for value in snapshot.columns[field]])
+            header['sections'][name] = sections.add(values.tobytes())
+
+    if snapshot.income_index is not None:
+        min_values, min_masks, max_values, max_masks = snapshot.income_index
+        header['income_index'] = [min_values, [add_mask(mask) for mask in min_masks],
+                                  max_values, [add_mask(mask) for mask in max_masks]]
+
+    header_json = dumps(header)
+    prefix = HEADER_PREFIX.pack(MAGIC, len(header_json)) + header_json
+    prefix += b'\0' * (align8(len(prefix)) - len(prefix))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.policy_snapshot-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(prefix)
+            for chunk in sections.chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return len(prefix) + sections.size
+
+def snapshot_file_version(path):
+    """스냅샷 파일 식별값 (파일이 교체되면 바뀜, 아직 없으면 None)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns
+
+class MappedMasks:
+    """값 → 비트셋 (mmap의 bytes를 조회할 때마다 정수로 변환하므로 워커별 사본이 없음)"""
+
+    def __init__(self, snapshot, entries):
+        self._snapshot = snapshot
+        self._offsets = {value: offset for value, offset in entries}
+
+    def get(self, value, default=None):
+        offset = self._offsets.get(value)
+        return default if offset is None else self._snapshot.mask_at(offset)
+
+    def items(self):
+        return [(value, self._snapshot.mask_at(offset)) for value, offset in self._offsets.items()]
+
+    def keys(self):
+        return self._offsets.keys()
+
+    def __contains__(self, value):
+        return value in self._offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+class MappedMaskList:
+    """비트셋 목록 (나이별/소득 경계값별, 인덱스로 조회할 때 정수로 변환)"""
+
+    def __init__(self, snapshot, offsets):
+        self._snapshot = snapshot
+        self._offsets = offsets
+
+    def __getitem__(self, index):
+        return self._snapshot.mask_at(self._offsets[index])
+
+    def __len__(self):
+        return len(self._offsets)
+
+class MappedPolicySnapshot(PolicySnapshot):
+    """공유 스냅샷 파일을 읽기 전용으로 매핑한 PolicySnapshot (조회 메서드는 그대로 사용)"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = HEADER_PREFIX.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"정책 스냅샷 파일 형식이 아닙니다: {path}")
+        header = loads(self._mmap[HEADER_PREFIX.size:HEADER_PREFIX.size + header_length])
+        self._data_start = align8(HEADER_PREFIX.size + header_length)
+        self._data = memoryview(self._mmap)[self._data_start:]
+        self._sections = header['sections']
+
+        version = header['version']
+        self.version = tuple(version) if isinstance(version, list) else version
+        self.loaded_at = time.time()
+        self.path = path
+        self.size = header['size']
+        self.all_mask = (1 << self.size) - 1
+        self.mask_bytes = header['mask_bytes']
+
+        self._rows = self._section('rows')
+        self._row_offsets = self._section('row_offsets', 'Q')
+        self._position_ids = self._section('ids', 'q')
+        self._sorted_ids = self._section('sorted_ids', 'q')
+        self._sorted_positions = self._section('sorted_positions', 'q')
+
+        self.region_field = header['region_field']
+        self.category_field = header['category_field']
+        self.region_masks = MappedMasks(self, header['region_masks'])
+        self.category_masks = MappedMasks(self, header['category_masks'])
+
+        self.age_masks = None
+        if header['age_masks'] is not None:
+            self.age_masks = MappedMaskList(self, header['age_masks'])
+            self._age_min = self._section('age_min', 'q')
+            self._age_max = self._section('age_max', 'q')
+
+        self.income_index = None
+        if header['income_index'] is not None:
+            min_values, min_offsets, max_values, max_offsets = header['income_index']
+            self.income_index = (min_values, MappedMaskList(self, min_offsets),
+                                 max_values, MappedMaskList(self, max_offsets))
+
+        self._search_text = None
+        if 'text' in self._sections:
+            self._search_text = True
+            self._text_offsets = self._section('text_offsets', 'Q')
+        self._keyword_masks = {}
+        self._keyword_lock = threading.Lock()
+
+    def _section(self, name, fmt=None):
+        offset, length = self._sections[name]
+        view = self._data[offset:offset + length]
+        return view.cast(fmt) if fmt else view
+
+    def mask_at(self, offset):
+        """섹션 위치의 비트셋을 정수로 변환"""
+        return int.from_bytes(self._data[offset:offset + self.mask_bytes], 'little')
+
+    def age_mask(self, age):
+        if self.age_masks is None or 0 <= age <= MAX_INDEXED_AGE:
+            return super().age_mask(age)
+
+        def bound(value):
+            return None if value == NULL_INT else value
+        return positions_to_mask(
+            (i for i in range(self.size)
+             if age_eligible(age, bound(self._age_min[i]), bound(self._age_max[i]))), self.size)
+
+    def _keyword_positions(self, needle):
+        # 검색 텍스트 blob을 mmap.find로 훑고, 일치 위치가 속한 정책으로 변환
+        needle = needle.encode('utf-8')
+        if b'\0' in needle:
+            return
+        offsets = self._text_offsets
+        start, length = self._sections['text']
+        base = self._data_start + start
+        end = base + length
+        found = self._mmap.find(needle, base, end)
+        while found != -1:
+            position = bisect_right(offsets, found - base) - 1
+            yield position
+            found = self._mmap.find(needle, base + offsets[position + 1], end)
+
+    def row(self, position):
+        return loads(self._rows[self._row_offsets[position]:self._row_offsets[position + 1]])
+
+    def position_of(self, policy_id):
+        index = bisect_left(self._sorted_ids, policy_id)
+        if index < len(self._sorted_ids) and self._sorted_ids[index] == policy_id:
+            return self._sorted_positions[index]
+        return None
+
+class SnapshotPublisher:
+    """gunicorn 마스터용: 데이터 버전이 바뀌면 스냅샷 파일을 다시 만들어 교체
+
+    loader(version)는 PolicySnapshot을, version_func()은 현재 데이터 버전을 돌려줍니다.
+    """
+
+    def __init__(self, loader, version_func, path, interval=5.0):
+        self.loader = loader
+        self.version_func = version_func
+        self.path = path
+        self.interval = interval
+        self._version = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self):
+        """버전이 바뀌었으면 스냅샷 파일 다시 쓰기"""
+        version = self.version_func()
+        if version is None or version == self._version:
+            return False
+        started = time.perf_counter()
+        snapshot = self.loader(version)
+        file_size = write_snapshot_file(snapshot, self.path)
+        self._version = version
+        print(f"✅ 공유 정책 스냅샷 갱신: {snapshot.size}개, {file_size / 1024 / 1024:.1f}MB "
+              f"({(time.perf_counter() - started) * 1000:.0f}ms) → {self.path}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                print(f"⚠️ 공유 정책 스냅샷 갱신 실패: {e}")
+
+    def start(self):
+        """첫 스냅샷을 바로 만들고 갱신 스레드 시작
+
+        첫 스냅샷 파일을 썼으면 True (False이면 워커가 이 파일을 읽으면 안 됨)
+        """
+        try:
+            self.publish()
+        except Exception as e:
+            print(f"❌ 공유 정책 스냅샷 생성 실패: {e}")
+        self._thread = threading.Thread(target=self._run, name='snapshot-publisher', daemon=True)
+        self._thread.start()
+        return self._version is not None
+
+    def stop(self, remove=True):
+        """갱신 중단 (remove이면 스냅샷 파일 삭제)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,270 @@
+"""
+SQLite 데이터베이스 연결 관리 (app_flask_api_server.py용)
+- 시작할 때 쓰기 가능한 연결로 한 번만 WAL 모드와 스키마를 설정합니다.
+- 요청 처리는 스레드마다 하나씩 유지하는 읽기 전용 연결을 재사용합니다.
+- 조회 API는 age_range를 미리 디코딩해 둔 메모리 스냅샷(PolicySnapshot)에서 응답합니다.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import urllib.parse
+from datetime import datetime, timezone
+
+from policy_queries import escape_like
+from policy_snapshot import PolicySnapshot
+
+SQLITE_DB_PATH = os.getenv('SQLITE_DB_PATH', 'welfare_policies.db')
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+# 연결마다 컴파일된 statement를 보관하는 개수
+SQLITE_CACHED_STATEMENTS = int(os.getenv('SQLITE_CACHED_STATEMENTS', 128))
+
+WELFARE_POLICIES_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS welfare_policies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        url TEXT,
+        region TEXT,
+        age_range TEXT,
+        application_period TEXT,
+        conditions TEXT,
+        benefits TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+# 지역별 목록(WHERE region = ? ORDER BY title)과 전체 목록(ORDER BY COALESCE(region, ''), title)을 처리하는 인덱스
+# 전체 목록은 region이 NULL인 행도 keyset 비교가 되도록 COALESCE(region, '') 식 인덱스를 사용합니다.
+REGION_KEY = "COALESCE(region, '')"
+SQLITE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_welfare_policies_region_title ON welfare_policies(region, title, id)",
+    f"CREATE INDEX IF NOT EXISTS idx_welfare_policies_region_key_title ON welfare_policies({REGION_KEY}, title, id)",
+]
+
+# 키워드 검색용 FTS5 테이블 (한국어는 띄어쓰기 단위 토큰화가 맞지 않으므로 trigram 사용)
+# 내용은 welfare_policies에 두고(external content) 트리거로 색인만 동기화합니다.
+SQLITE_FTS_SCHEMA = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS welfare_policies_fts USING fts5(
+           title, conditions, benefits,
+           content='welfare_policies', content_rowid='id', tokenize='trigram'
+       )''',
+    '''CREATE TRIGGER IF NOT EXISTS welfare_policies_fts_insert AFTER INSERT ON welfare_policies BEGIN
+           INSERT INTO welfare_policies_fts(rowid, title, conditions, benefits)
+           VALUES (new.id, new.title, new.conditions, new.benefits);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS welfare_policies_fts_delete AFTER DELETE ON welfare_policies BEGIN
+           INSERT INTO welfare_policies_fts(welfare_policies_fts, rowid, title, conditions, benefits)
+           VALUES ('delete', old.id, old.title, old.conditions, old.benefits);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS welfare_policies_fts_update
+       AFTER UPDATE OF title, conditions, benefits ON welfare_policies BEGIN
+           INSERT INTO welfare_policies_fts(welfare_policies_fts, rowid, title, conditions, benefits)
+           VALUES ('delete', old.id, old.title, old.conditions, old.benefits);
+           INSERT INTO welfare_policies_fts(rowid, title, conditions, benefits)
+           VALUES (new.id, new.title, new.conditions, new.benefits);
+       END''',
+]
+
+# trigram 토크나이저는 3글자 이상이어야 MATCH 할 수 있으므로 더 짧은 키워드는 LIKE로 검색
+FTS_MIN_KEYWORD_LENGTH = 3
+# bm25 컬럼 가중치 (title, conditions, benefits)
+FTS_RANK = "bm25(welfare_policies_fts, 10.0, 1.0, 1.0)"
+
+SEARCH_MATCH_QUERY = f'''
+    SELECT f.rowid FROM welfare_policies_fts f
+    JOIN welfare_policies p ON p.id = f.rowid
+    WHERE welfare_policies_fts MATCH ? {{region_filter}}
+    ORDER BY {FTS_RANK}
+    LIMIT ? OFFSET ?
+'''
+SEARCH_MATCH_COUNT_QUERY = '''
+    SELECT COUNT(*) FROM welfare_policies_fts f
+    JOIN welfare_policies p ON p.id = f.rowid
+    WHERE welfare_policies_fts MATCH ? {region_filter}
+'''
+SEARCH_LIKE_WHERE = r'''
+    WHERE (p.title LIKE ? ESCAPE '\' OR p.conditions LIKE ? ESCAPE '\' OR p.benefits LIKE ? ESCAPE '\')
+    {region_filter}
+'''
+
+# 페이지 조회: 인덱스만 읽어 id를 구하고 행 내용은 스냅샷에서 가져옴
+# keyset(after)은 마지막으로 받은 정책 id 다음부터 (region이 NULL인 행은 ''로 비교)
+PAGE_ALL_QUERY = f'''
+    SELECT id FROM welfare_policies
+    ORDER BY {REGION_KEY}, title, id
+    LIMIT ? OFFSET ?
+'''
+PAGE_ALL_AFTER_QUERY = f'''
+    SELECT id FROM welfare_policies
+    WHERE ({REGION_KEY}, title, id) > (SELECT {REGION_KEY}, title, id FROM welfare_policies WHERE id = ?)
+    ORDER BY {REGION_KEY}, title, id
+    LIMIT ? OFFSET ?
+'''
+PAGE_REGION_QUERY = '''
+    SELECT id FROM welfare_policies
+    WHERE region = ?
+    ORDER BY title, id
+    LIMIT ? OFFSET ?
+'''
+PAGE_REGION_AFTER_QUERY = '''
+    SELECT id FROM welfare_policies
+    WHERE region = ? AND (title, id) > (SELECT title, id FROM welfare_policies WHERE id = ?)
+    ORDER BY title, id
+    LIMIT ? OFFSET ?
+'''
+
+def read_pragmas():
+    """읽기 전용 연결에 적용할 PRAGMA 목록"""
+    return [
+        f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA query_only = ON",
+    ]
+
+def initialize_sqlite_database(path=SQLITE_DB_PATH):
+    """WAL 모드 설정 및 테이블/인덱스 생성 (쓰기 가능한 연결로 시작 시 한 번 실행)
+
+    journal_mode=WAL은 DB 파일에 저장되므로 이후 읽기 전용 연결에도 그대로 적용됩니다.
+    """
+    try:
+        conn = sqlite3.connect(path)
+        journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        conn.execute(WELFARE_POLICIES_SCHEMA)
+        for statement in SQLITE_INDEXES:
+            conn.execute(statement)
+        initialize_fts(conn)
+        conn.commit()
+        conn.close()
+        print(f"✅ SQLite 초기화 완료: {path} (journal_mode={journal_mode})")
+        return True
+    except Exception as e:
+        print(f"⚠️ SQLite 초기화 실패: {e}")
+        return False
+
+def initialize_fts(conn):
+    """FTS5 검색 테이블/트리거 생성 (처음 만들 때는 기존 행 전체를 색인)"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'welfare_policies_fts'"
+    ).fetchone()
+    try:
+        for statement in SQLITE_FTS_SCHEMA:
+            conn.execute(statement)
+    except sqlite3.OperationalError as e:
+        # FTS5 또는 trigram 토크나이저(SQLite 3.34+)가 없으면 LIKE 검색만 사용
+        print(f"⚠️ FTS5 검색 테이블 생성 실패 (LIKE 검색 사용): {e}")
+        return False
+    if not exists:
+        conn.execute("INSERT INTO welfare_policies_fts(welfare_policies_fts) VALUES ('rebuild')")
+        print("✅ FTS5 검색 색인 생성 완료")
+    return True
+
+def open_read_connection(path=SQLITE_DB_PATH):
+    """읽기 전용 URI 모드 연결 생성"""
+    uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, cached_statements=SQLITE_CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row  # 딕셔너리 형태로 결과 반환
+    for pragma in read_pragmas():
+        conn.execute(pragma)
+    return conn
+
+_local = threading.local()
+
+def get_read_connection(path=SQLITE_DB_PATH):
+    """현재 스레드의 읽기 전용 연결 (없거나 DB 파일이 교체되었으면 새로 연결)"""
+    file_id = os.stat(path).st_ino
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.key == (path, file_id):
+        return conn
+
+    if conn is not None:
+        conn.close()
+    _local.conn = open_read_connection(path)
+    _local.key = (path, file_id)
+    return _local.conn
+
+def sqlite_data_version(path=SQLITE_DB_PATH):
+    """DB 파일(및 WAL 파일)의 마지막 수정 시각을 데이터 버전으로 사용 (버전 토큰, 수정 시각)"""
+    mtime_ns = max(os.stat(file).st_mtime_ns for file in (path, path + '-wal') if os.path.exists(file))
+    return mtime_ns, datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc)
+
+def decode_age_range(value):
+    """age_range 컬럼(JSON 나이 목록) 디코딩"""
+    return json.loads(value) if value else []
+
+# 스냅샷 응답 컬럼 (기존 목록 API 응답과 같은 컬럼)
+SNAPSHOT_COLUMNS = ['id', 'title', 'url', 'region', 'age_range', 'application_period', 'conditions', 'benefits']
+
+def load_policy_snapshot(version, path=SQLITE_DB_PATH):
+    """welfare_policies 전체를 PolicySnapshot으로 로드
+
+    age_range는 이때 한 번만 디코딩하고, 나이 필터용 age_min/age_max 컬럼을 함께 보관합니다.
+    정렬 순서(region, title, id)는 페이지 조회 쿼리와 같습니다.
+    """
+    cursor = get_read_connection(path).execute(f'''
+        SELECT {', '.join(SNAPSHOT_COLUMNS)}
+        FROM welfare_policies
+        ORDER BY {REGION_KEY}, title, id
+    ''')
+    age_index = SNAPSHOT_COLUMNS.index('age_range')
+    rows = []
+    for row in cursor:
+        values = list(row)
+        age_range = decode_age_range(values[age_index])
+        values[age_index] = age_range
+        values.extend((min(age_range), max(age_range)) if age_range else (None, None))
+        rows.append(values)
+    return PolicySnapshot(
+        version, SNAPSHOT_COLUMNS + ['age_min', 'age_max'], rows,
+        response_columns=SNAPSHOT_COLUMNS, region_field='region',
+        age_fields=('age_min', 'age_max'), text_fields=('title', 'conditions', 'benefits')
+    )
+
+def page_policy_ids(conn, region=None, limit=50, offset=0, after=None):
+    """정렬 순서대로 한 페이지의 정책 id 조회 (limit + 1개를 읽어 다음 페이지 여부 판단)"""
+    if region is None:
+        if after is None:
+            cursor = conn.execute(PAGE_ALL_QUERY, (limit + 1, offset))
+        else:
+            cursor = conn.execute(PAGE_ALL_AFTER_QUERY, (after, limit + 1, offset))
+    elif after is None:
+        cursor = conn.execute(PAGE_REGION_QUERY, (region, limit + 1, offset))
+    else:
+        cursor = conn.execute(PAGE_REGION_AFTER_QUERY, (region, after, limit + 1, offset))
+
+    ids = [row[0] for row in cursor]
+    return ids[:limit], len(ids) > limit
+
+def search_policy_ids(conn, keyword, region=None, limit=50, offset=0):
+    """키워드 검색 결과 한 페이지의 정책 id와 전체 개수
+
+    키워드 전체를 하나의 부분 문자열로 찾으므로 PostgreSQL 서버의 ILIKE '%keyword%'와 같은 의미입니다.
+    3글자 이상이면 FTS5 색인으로 찾아 bm25 순위(제목 가중치 높음)로 정렬하고,
+    더 짧으면 LIKE 검색 후 기본 목록 순서(region, title, id)로 정렬합니다.
+    """
+    region_filter = "AND p.region = ?" if region else ""
+    region_params = (region,) if region else ()
+
+    if len(keyword) >= FTS_MIN_KEYWORD_LENGTH:
+        phrase = '"' + keyword.replace('"', '""') + '"'
+        try:
+            total = conn.execute(SEARCH_MATCH_COUNT_QUERY.format(region_filter=region_filter),
+                                 (phrase, *region_params)).fetchone()[0]
+            cursor = conn.execute(SEARCH_MATCH_QUERY.format(region_filter=region_filter),
+                                  (phrase, *region_params, limit, offset))
+            return [row[0] for row in cursor], total
+        except sqlite3.OperationalError as e:
+            if 'welfare_policies_fts' not in str(e):
+                raise
+            # FTS5 테이블이 없는 DB: LIKE 검색으로 대체
+
+    pattern = f"%{escape_like(keyword)}%"
+    where = SEARCH_LIKE_WHERE.format(region_filter=region_filter)
+    params = (pattern, pattern, pattern, *region_params)
+    total = conn.execute(f"SELECT COUNT(*) FROM welfare_policies p {where}", params).fetchone()[0]
+    cursor = conn.execute(f"SELECT p.id FROM welfare_policies p {where} ORDER BY COALESCE(p.region, ''), p.title, p.id LIMIT ? OFFSET ?",
+                          (*params, limit, offset))
+    return [row[0] for row in cursor], total
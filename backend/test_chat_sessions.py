@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+대화 세션(chat_sessions) 단위 테스트
+백그라운드 요약이 저장되는 사이에 기록된 질문/답변이 사라지지 않는지 저장소별로 확인합니다.
+(실제 OpenAI API는 호출하지 않음)
+
+실행: python test_chat_sessions.py  (또는 python -m pytest test_chat_sessions.py)
+"""
+
+import os
+import tempfile
+import unittest
+
+from chat_sessions import ChatSessions, MemorySessionStore, SqliteSessionStore, new_session
+
+def turn(number):
+    return [{"role": "user", "content": f"질문 {number}"}, {"role": "assistant", "content": f"답변 {number}"}]
+
+class CompactTestMixin:
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+        self.sessions = ChatSessions(self.store, llm=None, max_turns=2, keep_turns=1)
+        self.session = new_session()
+        self.session['messages'] = turn(1) + turn(2) + turn(3)
+        self.store.save(self.session)
+        self.old = self.session['messages'][:4]
+
+    def tearDown(self):
+        self.sessions._summarizer.shutdown()
+
+    def test_compact_keeps_recent_turns(self):
+        self.sessions.summarize = lambda previous, messages: '요약'
+        self.sessions.compact(self.session['id'], '', self.old)
+        saved = self.store.get(self.session['id'])
+        self.assertEqual(saved['summary'], '요약')
+        self.assertEqual(saved['messages'], turn(3))
+
+    def test_turn_recorded_during_compact_is_kept(self):
+        original_get = self.store.get
+        calls = []
+
+        def get_then_record(session_id):
+            # 요약이 세션을 읽은 직후 다른 요청이 질문/답변을 기록
+            read = original_get(session_id)
+            if not calls:
+                latest = original_get(session_id)
+                latest['messages'] += turn(4)
+                self.store.save(latest)
+            calls.append(session_id)
+            return read
+
+        self.store.get = get_then_record
+        self.sessions.summarize = lambda previous, messages: '요약'
+        self.sessions.compact(self.session['id'], '', self.old)
+        self.assertEqual(len(calls), 2)
+        saved = original_get(self.session['id'])
+        self.assertEqual(saved['summary'], '요약')
+        self.assertEqual(saved['messages'], turn(3) + turn(4))
+
+    def test_replace_rejects_stale_read(self):
+        read = self.store.get(self.session['id'])
+        latest = self.store.get(self.session['id'])
+        latest['messages'] += turn(4)
+        self.store.save(latest)
+        self.assertFalse(self.store.replace({**read, 'summary': '요약'}, read))
+        self.assertEqual(self.store.get(self.session['id'])['summary'], '')
+
+class MemoryStoreCompactTest(CompactTestMixin, unittest.TestCase):
+    def make_store(self):
+        return MemorySessionStore()
+
+class SqliteStoreCompactTest(CompactTestMixin, unittest.TestCase):
+    def make_store(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        return SqliteSessionStore(self.path)
+
+    def tearDown(self):
+        super().tearDown()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+if __name__ == '__main__':
+    unittest.main()
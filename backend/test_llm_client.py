@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+LLM 호출 보호(llm_client) 단위 테스트
+서킷 브레이커 상태 변화와 호출 거절/재시도 규칙을 확인합니다. (실제 OpenAI API는 호출하지 않음)
+
+실행: python test_llm_client.py  (또는 python -m pytest test_llm_client.py)
+"""
+
+import time
+import unittest
+from unittest import mock
+
+import openai
+
+from llm_client import CircuitBreaker, LLMClient, LLMUnavailable, is_retryable
+from request_metrics import LLM_CIRCUIT_STATE
+
+RESET = 0.05
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=RESET, name='test-breaker')
+
+    def open_breaker(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_half_open_allows_single_probe(self):
+        self.open_breaker()
+        time.sleep(RESET * 1.5)
+        self.assertEqual(self.breaker.state, 'half_open')
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+    def test_probe_success_closes(self):
+        self.open_breaker()
+        time.sleep(RESET * 1.5)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertTrue(self.breaker.allow())
+
+    def test_probe_failure_reopens(self):
+        self.open_breaker()
+        time.sleep(RESET * 1.5)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertFalse(self.breaker.allow())
+
+    def test_release_lets_next_request_probe(self):
+        self.open_breaker()
+        time.sleep(RESET * 1.5)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, 'half_open')
+        self.assertTrue(self.breaker.allow())
+
+    def test_state_gauge(self):
+        self.open_breaker()
+        self.assertEqual(dict((tuple(key), value) for key, value in LLM_CIRCUIT_STATE.dump())[('test-breaker',)], 2)
+
+def response(content='답변'):
+    return {'choices': [{'message': {'content': content}}], 'usage': {'prompt_tokens': 3, 'completion_tokens': 1}}
+
+class LLMClientTest(unittest.TestCase):
+    def client(self, **options):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, name='test-client')
+        options = {'timeout': 5, 'max_retries': 2, 'backoff_base': 0, 'breaker': breaker, **options}
+        return LLMClient('test-model', **options)
+
+    def test_retries_then_succeeds(self):
+        client = self.client()
+        errors = [openai.error.RateLimitError('rate limited'), openai.error.APIConnectionError('reset')]
+        with mock.patch('openai.ChatCompletion.create', side_effect=[*errors, response()]) as create:
+            self.assertEqual(client.chat([])['choices'][0]['message']['content'], '답변')
+        self.assertEqual(create.call_count, 3)
+        self.assertEqual(client.breaker.state, 'closed')
+
+    def test_gives_up_after_max_retries(self):
+        client = self.client(max_retries=1)
+        with mock.patch('openai.ChatCompletion.create', side_effect=openai.error.Timeout('slow')) as create:
+            with self.assertRaises(LLMUnavailable) as caught:
+                client.chat([])
+        self.assertEqual(caught.exception.reason, 'timeout')
+        self.assertEqual(create.call_count, 2)
+
+    def test_non_retryable_error_does_not_trip_breaker(self):
+        client = self.client()
+        error = openai.error.InvalidRequestError('bad request', 'messages')
+        with mock.patch('openai.ChatCompletion.create', side_effect=error) as create:
+            for _ in range(3):
+                with self.assertRaises(LLMUnavailable) as caught:
+                    client.chat([])
+                self.assertEqual(caught.exception.reason, 'error')
+        self.assertEqual(create.call_count, 3)
+        self.assertEqual(client.breaker.state, 'closed')
+
+    def test_open_breaker_rejects_without_calling(self):
+        client = self.client(max_retries=0)
+        with mock.patch('openai.ChatCompletion.create', side_effect=openai.error.ServiceUnavailableError('down')) as create:
+            for _ in range(2):
+                with self.assertRaises(LLMUnavailable):
+                    client.chat([])
+            with self.assertRaises(LLMUnavailable) as caught:
+                client.chat([])
+        self.assertEqual(caught.exception.reason, 'circuit_open')
+        self.assertEqual(create.call_count, 2)
+
+    def test_busy_when_no_slot(self):
+        client = self.client(max_concurrency=1, queue_timeout=0.01)
+        client._slots.acquire()
+        try:
+            with self.assertRaises(LLMUnavailable) as caught:
+                client.chat([])
+        finally:
+            client._slots.release()
+        self.assertEqual(caught.exception.reason, 'busy')
+
+    def test_is_retryable(self):
+        self.assertTrue(is_retryable(openai.error.APIError('server error', http_status=502)))
+        self.assertFalse(is_retryable(openai.error.APIError('client error', http_status=400)))
+        self.assertFalse(is_retryable(openai.error.AuthenticationError('no key')))
+
+if __name__ == '__main__':
+    unittest.main()
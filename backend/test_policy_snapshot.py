@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+메모리 정책 스냅샷(policy_snapshot) 단위 테스트
+비트셋 필터 결과를 행을 하나씩 비교하는 단순 구현과 맞춰 봅니다.
+
+실행: python test_policy_snapshot.py  (또는 python -m pytest test_policy_snapshot.py)
+"""
+
+import random
+import unittest
+
+from policy_snapshot import PolicySnapshot, age_eligible, iter_mask, popcount, positions_to_mask
+
+COLUMNS = ['id', 'title', 'region_name', 'category_name', 'age_min', 'age_max', 'income_min', 'income_max']
+REGIONS = ['서울특별시', '부산광역시', '경기도', None]
+CATEGORIES = ['주거지원', '취업지원', '창업지원']
+TITLES = ['청년 월세 지원', '취업 100% 보장', '창업_지원금', '노인 일자리', 'Youth Housing']
+
+def make_rows(size, seed=1):
+    rng = random.Random(seed)
+    rows = []
+    for policy_id in range(1, size + 1):
+        age_min = rng.choice([None, rng.randint(0, 40)])
+        age_max = rng.choice([None, (age_min or 0) + rng.randint(0, 40)])
+        income_min = rng.choice([None, None, rng.randrange(0, 300, 50)])
+        income_max = rng.choice([None, (income_min or 0) + rng.randrange(0, 500, 50)])
+        rows.append((policy_id, rng.choice(TITLES), rng.choice(REGIONS), rng.choice(CATEGORIES),
+                     age_min, age_max, income_min, income_max))
+    return rows
+
+def make_snapshot(rows):
+    return PolicySnapshot(
+        1, COLUMNS, rows, response_columns=['id', 'title'],
+        region_field='region_name', category_field='category_name',
+        age_fields=('age_min', 'age_max'), income_fields=('income_min', 'income_max'),
+        text_fields=('title',)
+    )
+
+class MaskTest(unittest.TestCase):
+    def test_positions_round_trip(self):
+        positions = [0, 1, 7, 8, 9, 63, 64, 200]
+        mask = positions_to_mask(positions, 201)
+        self.assertEqual(popcount(mask), len(positions))
+        self.assertEqual(popcount(0), 0)
+        self.assertEqual(list(iter_mask(mask)), positions)
+        self.assertEqual(list(iter_mask(mask, start=3)), positions[3:])
+
+    def test_empty_mask(self):
+        self.assertEqual(positions_to_mask([], 10), 0)
+        self.assertEqual(list(iter_mask(0)), [])
+
+class PolicySnapshotFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_rows(300)
+        self.snapshot = make_snapshot(self.rows)
+
+    def expected_ids(self, region=None, category=None, age=None, keyword=None):
+        return [row[0] for row in self.rows
+                if (not region or row[2] == region)
+                and (not category or row[3] == category)
+                and (age is None or age_eligible(age, row[4], row[5]))
+                and (not keyword or keyword.lower() in row[1].lower())]
+
+    def test_filter_matches_row_scan(self):
+        cases = [
+            {}, {'region': '서울특별시'}, {'category': '창업지원'}, {'age': 25}, {'age': 130},
+            {'keyword': '청년'}, {'keyword': 'youth'}, {'region': '경기도', 'category': '주거지원', 'age': 30},
+            {'region': '없는 지역'},
+        ]
+        for case in cases:
+            with self.subTest(**case):
+                mask = self.snapshot.filter_mask(**case)
+                self.assertEqual(self.snapshot.ids(mask), self.expected_ids(**case))
+
+    def test_keyword_is_literal_substring(self):
+        # SQL 경로(ILIKE, 이스케이프)와 같이 %와 _는 문자 그대로 찾음
+        for keyword in ['%', '_', '100%', '창업_']:
+            with self.subTest(keyword=keyword):
+                self.assertEqual(self.snapshot.ids(self.snapshot.keyword_mask(keyword)), self.expected_ids(keyword=keyword))
+
+    def test_query_pages_in_order(self):
+        expected = self.expected_ids(region='부산광역시')
+        policies, total = self.snapshot.query(region='부산광역시', limit=7, offset=5)
+        self.assertEqual(total, len(expected))
+        self.assertEqual([policy['id'] for policy in policies], expected[5:12])
+        self.assertEqual(set(policies[0]), {'id', 'title'})
+
+    def test_unfiltered_query(self):
+        policies, total = self.snapshot.query(limit=3, offset=298)
+        self.assertEqual(total, 300)
+        self.assertEqual([policy['id'] for policy in policies], [299, 300])
+
+    def test_rows_by_ids_skips_missing(self):
+        self.assertEqual([row['id'] for row in self.snapshot.rows_by_ids([5, 999, 2])], [5, 2])
+
+    def test_value_counts(self):
+        counts = dict(self.snapshot.value_counts('region_name'))
+        for region in REGIONS:
+            self.assertEqual(counts.get(region, 0), sum(1 for row in self.rows if row[2] == region))
+
+def income_eligible(income, income_min, income_max):
+    """SQL 조건과 같은 의미: 기준이 없는 쪽은 제한 없음"""
+    return (income_min is None or income_min <= income) and (income_max is None or income_max >= income)
+
+class EligibilityTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_rows(300, seed=2)
+        self.snapshot = make_snapshot(self.rows)
+
+    def test_income_mask_matches_row_scan(self):
+        # 경계값(50 단위)과 그 사이, 범위 밖 값을 모두 확인
+        for income in [-1, 0, 1, 49, 50, 51, 250, 300, 799, 800, 801, 10_000]:
+            with self.subTest(income=income):
+                expected = [row[0] for row in self.rows if income_eligible(income, row[6], row[7])]
+                self.assertEqual(self.snapshot.ids(self.snapshot.income_mask(income)), expected)
+
+    def test_income_index_without_bounds(self):
+        rows = [(1, '정책', None, '주거지원', None, None, None, None),
+                (2, '정책', None, '주거지원', None, None, 100, None)]
+        snapshot = make_snapshot(rows)
+        self.assertEqual(snapshot.ids(snapshot.income_mask(0)), [1])
+        self.assertEqual(snapshot.ids(snapshot.income_mask(100)), [1, 2])
+
+    def test_eligibility_includes_policies_without_region(self):
+        for profile in [{'region': '서울특별시'}, {'region': '부산광역시', 'age': 20, 'income': 150},
+                        {'region': '경기도', 'category': '취업지원', 'age': 45}, {'income': 0}, {}]:
+            with self.subTest(**profile):
+                region, age, income, category = (profile.get(name) for name in ('region', 'age', 'income', 'category'))
+                expected = [row[0] for row in self.rows
+                            if (not region or row[2] in (region, None))
+                            and (not category or row[3] == category)
+                            and (age is None or age_eligible(age, row[4], row[5]))
+                            and (income is None or income_eligible(income, row[6], row[7]))]
+                mask = self.snapshot.eligibility_mask(region, age, income, category)
+                self.assertEqual(self.snapshot.ids(mask), expected)
+
+if __name__ == '__main__':
+    unittest.main()
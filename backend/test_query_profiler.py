@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+쿼리 프로파일러(query_profiler) 단위 테스트
+값만 다른 쿼리가 같은 모양(fingerprint)으로 묶이고, 모양이 다른 쿼리는 구분되는지,
+워커별 집계 파일이 하나의 통계로 합쳐지는지 확인합니다.
+
+실행: python test_query_profiler.py  (또는 python -m pytest test_query_profiler.py)
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from query_profiler import QueryProfiler, QueryStats, fingerprint
+from request_metrics import write_json_file
+
+class FingerprintTest(unittest.TestCase):
+    def test_literals_collapse(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM policies WHERE id = 42 AND title = 'it''s' AND score > 1.5"),
+            "SELECT * FROM policies WHERE id = ? AND title = ? AND score > ?")
+
+    def test_placeholders_collapse(self):
+        expected = "SELECT id FROM policies WHERE region = ? LIMIT ? OFFSET ?"
+        for sql in ["SELECT id FROM policies WHERE region = %s LIMIT %s OFFSET %s",
+                    "SELECT id FROM policies WHERE region = %(region)s LIMIT %(limit)s OFFSET %(offset)s",
+                    "SELECT id FROM policies WHERE region = $1 LIMIT $2 OFFSET $3",
+                    "SELECT id FROM policies WHERE region = '서울' LIMIT 50 OFFSET 100"]:
+            with self.subTest(sql=sql):
+                self.assertEqual(fingerprint(sql), expected)
+
+    def test_value_lists_of_any_length_collapse(self):
+        short = fingerprint("SELECT * FROM policies WHERE id IN (1, 2)")
+        long = fingerprint("SELECT * FROM policies WHERE id IN (%s, %s, %s, %s, %s)")
+        self.assertEqual(short, long)
+        self.assertEqual(short, "SELECT * FROM policies WHERE id IN (?+)")
+
+    def test_single_value_is_not_a_list(self):
+        self.assertEqual(fingerprint("SELECT * FROM policies WHERE id IN (7)"),
+                         "SELECT * FROM policies WHERE id IN (?)")
+
+    def test_whitespace_and_set_local(self):
+        self.assertEqual(
+            fingerprint("SET LOCAL plan_cache_mode = force_custom_plan;\n  EXECUTE policy_list_1010  (%s,\n %s)"),
+            "EXECUTE policy_list_1010 (?+)")
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertNotEqual(fingerprint("EXECUTE policy_list_1010 (%s, %s)"),
+                            fingerprint("EXECUTE policy_list_0110 (%s, %s)"))
+        self.assertEqual(fingerprint("SELECT t1.id FROM t1"), "SELECT t1.id FROM t1")
+
+    def test_bytes_query(self):
+        self.assertEqual(fingerprint(b"SELECT 1"), "SELECT ?")
+
+class QueryStatsTest(unittest.TestCase):
+    def test_summary(self):
+        stats = QueryStats("SELECT ?")
+        for ms in range(1, 101):
+            stats.add(ms / 1000, '/api/policies', slow=ms > 90)
+        summary = stats.as_dict()
+        self.assertEqual(summary['calls'], 100)
+        self.assertEqual(summary['slow_calls'], 10)
+        self.assertAlmostEqual(summary['mean_ms'], 50.5)
+        self.assertAlmostEqual(summary['p50_ms'], 51.0)
+        self.assertAlmostEqual(summary['p95_ms'], 96.0)
+        self.assertAlmostEqual(summary['max_ms'], 100.0)
+        self.assertEqual(summary['routes'], {'/api/policies': 100})
+
+class MultiWorkerReportTest(unittest.TestCase):
+    OTHER_PID = 999999
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.profiler = QueryProfiler(slow_ms=1000, directory=self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def observe(self, profiler, sql, ms, route='/api/policies'):
+        profiler.observe(sql, None, ms / 1000, None, route)
+
+    def write_other_worker(self):
+        """다른 워커(OTHER_PID)의 집계 파일"""
+        other = QueryProfiler(slow_ms=1000, directory=None)
+        other.started_at = self.profiler.started_at
+        self.observe(other, "SELECT * FROM policies WHERE id = 2", 30, route='/api/policies/<id>')
+        self.observe(other, "SELECT 1", 5)
+        write_json_file(os.path.join(self.directory, f"{self.OTHER_PID}.json"), other.dump())
+
+    def summary(self):
+        report = self.profiler.report()
+        return report, {query['query']: query for query in report['queries']}
+
+    def test_report_merges_workers(self):
+        self.observe(self.profiler, "SELECT * FROM policies WHERE id = 1", 10)
+        self.write_other_worker()
+        report, queries = self.summary()
+        self.assertEqual(report['scope'], 'all_workers')
+        self.assertEqual(report['workers'], 2)
+        merged = queries["SELECT * FROM policies WHERE id = ?"]
+        self.assertEqual(merged['calls'], 2)
+        self.assertAlmostEqual(merged['total_ms'], 40.0)
+        self.assertAlmostEqual(merged['max_ms'], 30.0)
+        self.assertEqual(merged['routes'], {'/api/policies': 1, '/api/policies/<id>': 1})
+        self.assertEqual(queries["SELECT ?"]['calls'], 1)
+
+    def test_dead_worker_is_archived(self):
+        self.write_other_worker()
+        self.profiler.mark_process_dead(self.OTHER_PID)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, f"{self.OTHER_PID}.json")))
+        report, queries = self.summary()
+        self.assertEqual(report['workers'], 1)
+        self.assertEqual(queries["SELECT ?"]['calls'], 1)
+
+    def test_reset_clears_all_workers(self):
+        self.observe(self.profiler, "SELECT 1", 5)
+        self.write_other_worker()
+        self.profiler.reset()
+        report, queries = self.summary()
+        self.assertEqual(queries, {})
+        self.assertEqual(report['workers'], 1)
+
+    def test_single_worker_without_directory(self):
+        profiler = QueryProfiler(directory=None)
+        self.observe(profiler, "SELECT 1", 5)
+        report = profiler.report()
+        self.assertEqual(report['scope'], 'single_worker')
+        self.assertEqual(report['worker'], os.getpid())
+        self.assertEqual(report['queries'][0]['calls'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+SQLite 목록 페이지 조회(page_policy_ids, PolicySnapshot.page_after) 단위 테스트
+keyset(after)과 offset 페이지가 region이 NULL인 행을 포함해 전체 목록을 빠짐없이 돌려주는지,
+스냅샷 페이지가 SQL 페이지와 같은 결과를 내는지 확인합니다.
+
+실행: python test_sqlite_paging.py  (또는 python -m pytest test_sqlite_paging.py)
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from sqlite_db import (
+    initialize_sqlite_database, load_policy_snapshot, open_read_connection, page_policy_ids, sqlite_data_version
+)
+
+ROWS = [
+    ('정책 다', None), ('정책 가', None), ('정책 나', None),
+    ('정책 A', '서울'), ('정책 C', '서울'), ('정책 B', '서울'),
+    ('정책 가', '부산'),
+]
+
+def page_all(conn, region, limit):
+    """next_after를 따라가며 모든 페이지의 id를 모음"""
+    ids, after = [], None
+    while True:
+        page, has_more = page_policy_ids(conn, region, limit, after=after)
+        ids += page
+        if not has_more:
+            return ids
+        after = page[-1]
+
+class PagePolicyIdsTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        initialize_sqlite_database(self.path)
+        conn = sqlite3.connect(self.path)
+        conn.executemany("INSERT INTO welfare_policies (title, region) VALUES (?, ?)", ROWS)
+        conn.commit()
+        self.expected = [row[0] for row in conn.execute(
+            "SELECT id FROM welfare_policies ORDER BY COALESCE(region, ''), title, id")]
+        conn.close()
+        self.conn = open_read_connection(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_keyset_pages_through_null_regions(self):
+        for limit in (1, 2, 3, 10):
+            self.assertEqual(page_all(self.conn, None, limit), self.expected, f"limit={limit}")
+
+    def test_offset_matches_keyset(self):
+        ids = []
+        for offset in range(0, len(ROWS), 2):
+            ids += page_policy_ids(self.conn, None, 2, offset=offset)[0]
+        self.assertEqual(ids, self.expected)
+
+    def test_null_regions_come_first(self):
+        first_page, has_more = page_policy_ids(self.conn, None, 3)
+        self.assertTrue(has_more)
+        regions = {row[0] for row in self.conn.execute(
+            f"SELECT region FROM welfare_policies WHERE id IN ({','.join('?' * len(first_page))})", first_page)}
+        self.assertEqual(regions, {None})
+
+    def test_region_keyset(self):
+        ids = page_all(self.conn, '서울', 2)
+        titles = [self.conn.execute("SELECT title FROM welfare_policies WHERE id = ?", (i,)).fetchone()[0] for i in ids]
+        self.assertEqual(titles, ['정책 A', '정책 B', '정책 C'])
+
+    def test_snapshot_pages_match_sql(self):
+        snapshot = load_policy_snapshot(sqlite_data_version(self.path), self.path)
+        self.assertEqual(snapshot.ids(), self.expected)
+        for region in (None, '서울', '없는 지역'):
+            mask = snapshot.all_mask if region is None else snapshot.region_masks.get(region, 0)
+            for limit in (1, 2, 4):
+                # next_after는 항상 같은 지역 목록의 정책 id
+                for after in (None, *snapshot.ids(mask)):
+                    with self.subTest(region=region, limit=limit, after=after):
+                        positions, has_more = snapshot.page_after(mask, after=after, limit=limit, offset=1)
+                        ids = [snapshot.row(position)['id'] for position in positions]
+                        self.assertEqual((ids, has_more),
+                                         page_policy_ids(self.conn, region, limit, offset=1, after=after))
+
+    def test_snapshot_page_after_unknown_id(self):
+        snapshot = load_policy_snapshot(sqlite_data_version(self.path), self.path)
+        self.assertEqual(snapshot.page_after(after=999), ([], False))
+
+    def test_all_query_uses_expression_index(self):
+        plan = ' '.join(row[-1] for row in self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM welfare_policies "
+            "ORDER BY COALESCE(region, ''), title, id LIMIT 10"))
+        self.assertIn('idx_welfare_policies_region_key_title', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+if __name__ == '__main__':
+    unittest.main()
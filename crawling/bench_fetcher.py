@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+HTTP 수집 처리량 비교 (로컬 fixture 서버, 요청마다 지연 시간 적용)
+- requests.get: crawling.py의 기존 방식 (요청마다 새 연결)
+- requests.Session: WelfareCrawler의 기존 방식 (연결 재사용, 순차 요청, time.sleep(1) 제외)
+- AsyncFetcher: fetcher.py (연결 재사용 + 호스트별 동시 요청)
+
+사용법:
+    python bench_fetcher.py
+    python bench_fetcher.py --pages 200 --latency 0.1 --per-host 8
+"""
+
+import argparse
+import time
+
+import requests
+
+from fetcher import fetch_all
+from fixture_server import start_fixture_server
+
+def run_requests_get(urls):
+    return [requests.get(url) for url in urls]
+
+def run_requests_session(urls):
+    session = requests.Session()
+    return [session.get(url, timeout=10) for url in urls]
+
+def measure(name, server, func, urls):
+    connections = server.connections
+    started = time.perf_counter()
+    results = func(urls)
+    elapsed = time.perf_counter() - started
+    ok = sum(1 for result in results if getattr(result, 'ok', False))
+    print(f"{name:<28}{len(urls) / elapsed:>10.1f}{elapsed:>10.2f}s{ok:>8}{server.connections - connections:>8}")
+    return len(urls) / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP 수집 처리량 비교')
+    parser.add_argument('--pages', type=int, default=100, help='수집할 페이지 수')
+    parser.add_argument('--latency', type=float, default=0.05, help='fixture 서버 응답 지연(초)')
+    parser.add_argument('--per-host', type=int, default=8, help='AsyncFetcher 호스트별 동시 요청 수')
+    parser.add_argument('--charset', default='utf-8', help='fixture 페이지 인코딩 (예: euc-kr)')
+    args = parser.parse_args()
+
+    server = start_fixture_server(latency=args.latency, charset=args.charset)
+    urls = [f"{server.base_url}/detail/{number}" for number in range(args.pages)]
+
+    print(f"\n📊 페이지 {args.pages}개, 응답 지연 {args.latency * 1000:.0f}ms")
+    print("-" * 70)
+    print(f"{'method':<28}{'pages/s':>10}{'elapsed':>11}{'ok':>8}{'conns':>8}")
+    baseline = measure('requests.get', server, run_requests_get, urls)
+    measure('requests.Session', server, run_requests_session, urls)
+    fetched = measure(f'AsyncFetcher (per_host={args.per_host})', server,
+                      lambda items: fetch_all(items, per_host=args.per_host, per_host_delay=0), urls)
+    print(f"\n✅ AsyncFetcher: requests.get 대비 {fetched / baseline:.1f}배")
+
+    # 인코딩 확인: charset 헤더 없이 <meta charset>만 있는 페이지도 올바르게 디코딩되는지
+    server.send_charset = False
+    page = fetch_all(urls[:1], per_host_delay=0)[0]
+    print(f"✅ 인코딩 감지: {page.encoding} (제목: {page.text.split('<h2>')[1].split('</h2>')[0]})")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+크롤링 측정 지표
+URL별 수집 시간(대기/연결/응답 대기/본문 수신), 응답 크기, 파싱 시간, 필드별 추출 성공 여부를 모아
+백분위 요약을 출력하고 JSON 파일로 저장합니다. 실행마다 파일을 남기면 크롤링 성능 변화를 비교할 수 있습니다.
+
+사용법:
+    metrics = CrawlMetrics('welfare')
+    pages = fetch_all(urls, metrics=metrics)          # 수집 결과는 fetcher가 기록
+    with metrics.time_parse(url) as parsed:
+        parsed.result = parse_policy_page(url, region, html)
+    metrics.print_summary()
+    metrics.write_json('metrics.json')
+"""
+
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+
+# 추출 성공 여부를 셀 필드와 "못 찾음"으로 보는 기본값
+POLICY_FIELDS = ('title', 'region', 'age_range', 'application_period', 'conditions', 'benefits')
+MISSING_VALUES = ('', '제목 없음', '미정', None)
+FETCH_PHASES = ('queue', 'connect', 'tls', 'send', 'wait', 'download', 'backoff')
+PERCENTILES = (50, 90, 99)
+
+def percentile(values, p):
+    """정렬된 값의 p 백분위 (nearest-rank)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+def describe(values):
+    """개수/합계/평균/백분위/최댓값"""
+    ordered = sorted(values)
+    summary = {'count': len(ordered), 'sum': sum(ordered), 'mean': sum(ordered) / len(ordered) if ordered else 0.0}
+    for p in PERCENTILES:
+        summary[f'p{p}'] = percentile(ordered, p)
+    summary['max'] = ordered[-1] if ordered else 0.0
+    return summary
+
+def is_missing(value):
+    return value in MISSING_VALUES or (isinstance(value, (list, dict)) and not value)
+
+class ParseRecord:
+    """time_parse 블록 안에서 추출 결과를 넘겨받는 객체"""
+
+    def __init__(self):
+        self.result = None
+
+class CrawlMetrics:
+    """한 번의 크롤링 실행에서 URL별 수집/파싱 측정값 기록"""
+
+    def __init__(self, name='crawl', fields=POLICY_FIELDS):
+        self.name = name
+        self.fields = fields
+        self.started_at = time.time()
+        self.fetches = []
+        self.parses = []
+
+    def record_fetch(self, page):
+        """fetcher.FetchResult 하나 기록"""
+        self.fetches.append({
+            'url': page.url,
+            'status': page.status,
+            'error': page.error,
+            'bytes': len(page.content),
+            'elapsed': page.elapsed,
+            'from_cache': page.from_cache,
+            'attempts': page.attempts,
+            'http_version': page.http_version,
+            'timings': dict(page.timings),
+        })
+
+    def record_parse(self, url, seconds, result):
+        """추출 결과 기록 (result가 None이면 내용 영역을 찾지 못한 페이지)"""
+        self.parses.append({
+            'url': url,
+            'seconds': seconds,
+            'found': result is not None,
+            'missing': [field for field in self.fields if is_missing(result.get(field))] if result else list(self.fields),
+        })
+
+    @contextmanager
+    def time_parse(self, url):
+        """with 블록의 실행 시간을 파싱 시간으로 기록 (결과는 record.result에 저장)"""
+        record = ParseRecord()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.record_parse(url, time.perf_counter() - started, record.result)
+
+    def summary(self):
+        network = [fetch for fetch in self.fetches if not fetch['from_cache'] and fetch['attempts']]
+        ok = [fetch for fetch in self.fetches if fetch['status'] is not None and 200 <= fetch['status'] < 300]
+        found = [parse for parse in self.parses if parse['found']]
+        return {
+            'name': self.name,
+            'wall_seconds': time.time() - self.started_at,
+            'fetch': {
+                'requests': len(self.fetches),
+                'ok': len(ok),
+                'failed': len(self.fetches) - len(ok),
+                'from_cache': sum(1 for fetch in self.fetches if fetch['from_cache']),
+                'retried': sum(1 for fetch in self.fetches if fetch['attempts'] > 1),
+                'latency': describe([fetch['elapsed'] for fetch in network]),
+                'bytes': describe([fetch['bytes'] for fetch in ok]),
+                'phases': {
+                    phase: describe([fetch['timings'].get(phase, 0.0) for fetch in network])
+                    for phase in FETCH_PHASES
+                    if any(phase in fetch['timings'] for fetch in network)
+                },
+            },
+            'parse': {
+                'pages': len(self.parses),
+                'found': len(found),
+                'seconds': describe([parse['seconds'] for parse in self.parses]),
+                'fields': {
+                    field: {
+                        'hit': sum(1 for parse in found if field not in parse['missing']),
+                        'miss': sum(1 for parse in found if field in parse['missing']),
+                    }
+                    for field in self.fields
+                },
+            },
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        fetch = summary['fetch']
+        parse = summary['parse']
+        print(f"\n📊 크롤링 지표 ({self.name}, {summary['wall_seconds']:.2f}s)")
+        print(f"   수집: 요청 {fetch['requests']}개, 성공 {fetch['ok']}, 실패 {fetch['failed']}, "
+              f"캐시 {fetch['from_cache']}, 재시도 {fetch['retried']}, 수신 {fetch['bytes']['sum'] / 1024:.0f}KB")
+        print(f"   {'구간(ms)':<12}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'합계(s)':>10}")
+        rows = [('total', fetch['latency'])] + list(fetch['phases'].items()) + [('parse', parse['seconds'])]
+        for name, stats in rows:
+            print(f"   {name:<12}{stats['p50'] * 1000:>9.1f}{stats['p90'] * 1000:>9.1f}"
+                  f"{stats['p99'] * 1000:>9.1f}{stats['max'] * 1000:>9.1f}{stats['sum']:>10.2f}")
+        print(f"   추출: 페이지 {parse['pages']}개 중 내용 영역 발견 {parse['found']}개")
+        for field, counts in parse['fields'].items():
+            total = counts['hit'] + counts['miss']
+            rate = counts['hit'] / total * 100 if total else 0.0
+            print(f"   {field:<20}{counts['hit']:>6}/{total:<6}{rate:>6.1f}%")
+
+    def write_json(self, path):
+        """요약과 URL별 측정값을 JSON 파일로 저장"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'summary': self.summary(), 'fetches': self.fetches, 'parses': self.parses},
+                      f, ensure_ascii=False, indent=2)
+        print(f"✅ 크롤링 지표 저장: {path}")
@@ -0,0 +1,197 @@
+"""
+크롤링 상태 저장소 (state 디렉터리 하나에 저장)
+- ResponseCache: HTTP 응답 캐시. 본문은 SHA-256 이름의 파일로 저장(내용이 같으면 한 번만 저장)하고,
+  URL → 본문 해시/상태 코드/인코딩/수집 시각은 SQLite 색인에 기록합니다. TTL이 지난 응답은 다시 요청합니다.
+- Frontier: 크롤링할 URL과 상태(pending/done/failed). 중단된 크롤링을 남은 URL부터 이어서 실행합니다.
+
+디렉터리 구조:
+    <state_dir>/state.db                  색인과 frontier (SQLite, WAL)
+    <state_dir>/objects/ab/abcdef...      응답 본문
+
+사용법:
+    cache = ResponseCache('crawl_state')
+    async with AsyncFetcher(cache=cache) as f: ...      # 캐시를 거쳐 수집
+    async with AsyncFetcher(cache=cache, offline=True)  # 네트워크 없이 캐시에서만 읽기
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+
+# 캐시 유효 시간(초)
+CACHE_TTL = float(os.getenv('CRAWL_CACHE_TTL', 24 * 3600))
+# 실패한 URL을 다시 시도하는 최대 횟수 (이어서 실행할 때)
+MAX_ATTEMPTS = int(os.getenv('CRAWL_MAX_ATTEMPTS', 3))
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    encoding TEXT NOT NULL,
+    final_url TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    region TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    seq INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_frontier_state ON frontier(state, seq);
+'''
+
+def open_state_db(state_dir):
+    """state 디렉터리의 SQLite 연결 (없으면 생성)"""
+    os.makedirs(state_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(state_dir, 'state.db'))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+class CachedResponse:
+    """캐시에 저장된 응답 하나"""
+
+    def __init__(self, url, content, status, encoding, final_url, fetched_at):
+        self.url = url
+        self.content = content
+        self.status = status
+        self.encoding = encoding
+        self.final_url = final_url
+        self.fetched_at = fetched_at
+
+class ResponseCache:
+    """내용 주소 기반 디스크 HTTP 응답 캐시"""
+
+    def __init__(self, state_dir, ttl=CACHE_TTL):
+        self.state_dir = state_dir
+        self.objects_dir = os.path.join(state_dir, 'objects')
+        self.ttl = ttl
+        self.conn = open_state_db(state_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def get(self, url, ignore_ttl=False):
+        """유효한 캐시 응답 (없거나 TTL이 지났으면 None)"""
+        row = self.conn.execute(
+            'SELECT sha256, status, encoding, final_url, fetched_at FROM responses WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None or (not ignore_ttl and time.time() - row[4] > self.ttl):
+            self.misses += 1
+            return None
+        try:
+            with open(self._object_path(row[0]), 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResponse(url, content, row[1], row[2], row[3], row[4])
+
+    def put(self, url, content, status, encoding, final_url=None):
+        """응답 저장 (같은 본문은 파일 하나를 함께 사용)"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (url, sha256, status, encoding, final_url, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, digest, status, encoding, final_url or url, time.time()),
+            )
+        return digest
+
+    def policy_pages(self):
+        """frontier에 있는 정책 상세 페이지의 캐시 목록 [(URL, 지역, 본문 파일 경로, 인코딩)] (목록 페이지 제외)"""
+        rows = self.conn.execute(
+            'SELECT r.url, f.region, r.sha256, r.encoding FROM responses r '
+            'JOIN frontier f ON f.url = r.url ORDER BY f.seq'
+        )
+        return [(url, region, self._object_path(digest), encoding) for url, region, digest, encoding in rows]
+
+    def urls(self):
+        return [row[0] for row in self.conn.execute('SELECT url FROM responses ORDER BY url')]
+
+    def prune(self):
+        """TTL이 지난 색인과 어느 URL도 가리키지 않는 본문 파일 삭제"""
+        with self.conn:
+            expired = self.conn.execute('DELETE FROM responses WHERE fetched_at < ?', (time.time() - self.ttl,)).rowcount
+        referenced = {row[0] for row in self.conn.execute('SELECT DISTINCT sha256 FROM responses')}
+        removed = 0
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name not in referenced:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+        return expired, removed
+
+    def close(self):
+        self.conn.close()
+
+class Frontier:
+    """크롤링할 URL 목록과 상태 (중단 후 이어서 실행)"""
+
+    def __init__(self, state_dir, max_attempts=MAX_ATTEMPTS):
+        self.conn = open_state_db(state_dir)
+        self.max_attempts = max_attempts
+
+    def reset(self):
+        """새 크롤링 시작: 이전 URL 목록 삭제"""
+        with self.conn:
+            self.conn.execute('DELETE FROM frontier')
+
+    def add(self, jobs):
+        """(URL, 지역) 추가 (이미 있는 URL은 그대로 둠)"""
+        now = time.time()
+        start = self.conn.execute('SELECT COALESCE(MAX(seq), 0) FROM frontier').fetchone()[0]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO frontier (url, region, seq, updated_at) VALUES (?, ?, ?, ?)',
+                [(url, region, start + index, now) for index, (url, region) in enumerate(jobs, 1)],
+            )
+
+    def pending(self):
+        """아직 끝나지 않은 (URL, 지역) 목록 (실패는 max_attempts번까지 다시 시도)"""
+        return self.conn.execute(
+            "SELECT url, region FROM frontier WHERE state = 'pending' "
+            "OR (state = 'failed' AND attempts < ?) ORDER BY seq", (self.max_attempts,)
+        ).fetchall()
+
+    def jobs(self):
+        """전체 (URL, 지역) 목록"""
+        return self.conn.execute('SELECT url, region FROM frontier ORDER BY seq').fetchall()
+
+    def mark_done(self, urls):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE frontier SET state = 'done', attempts = attempts + 1, error = NULL, updated_at = ? WHERE url = ?",
+                [(now, url) for url in urls],
+            )
+
+    def mark_failed(self, url, error):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE frontier SET state = 'failed', attempts = attempts + 1, error = ?, updated_at = ? WHERE url = ?",
+                (error, time.time(), url),
+            )
+
+    def counts(self):
+        """상태별 URL 수"""
+        return dict(self.conn.execute('SELECT state, COUNT(*) FROM frontier GROUP BY state').fetchall())
+
+    def close(self):
+        self.conn.close()
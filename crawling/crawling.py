@@ -1,8 +1,10 @@
-import requests
 from bs4 import BeautifulSoup
 import re
 import json
 import os
+import time
+from crawl_metrics import CrawlMetrics
+from fetcher import fetch_all
 
 print("현재 작업 디렉토리:", os.getcwd())
 
@@ -21,11 +23,17 @@ urls = [
 ]
 
 all_results = []
+metrics = CrawlMetrics('crawling.py')
 
-for url in urls:
-    res = requests.get(url)
-    res.encoding = 'utf-8'
-    soup = BeautifulSoup(res.text, 'html.parser')
+# 모든 페이지를 연결을 재사용하며 동시에 수집 (본문은 서버 charset으로 디코딩)
+pages = fetch_all(urls, metrics=metrics)
+
+for url, page in zip(urls, pages):
+    if not page.ok:
+        print(f"❌ 페이지 수집 실패 ({url}): {page.error or page.status}")
+        continue
+    parse_started = time.perf_counter()
+    soup = BeautifulSoup(page.text, 'html.parser')
 
     result = {}
     result['url'] = url
@@ -44,6 +52,7 @@ for url in urls:
 
     if content_box is None:
         print(f"Warning: 내용 영역을 찾을 수 없습니다: {url}")
+        metrics.record_parse(url, time.perf_counter() - parse_started, None)
         continue
 
     content_text = content_box.get_text(separator=" ", strip=True)
@@ -96,6 +105,7 @@ for url in urls:
 
     result['conditions'] = result['conditions'].strip()
     result['benefits'] = result['benefits'].strip()
+    metrics.record_parse(url, time.perf_counter() - parse_started, result)
 
     # 결과 출력
     print(f"✅ title: {result['title']}")
@@ -115,3 +125,8 @@ with open(json_path, 'w', encoding='utf-8') as f:
     json.dump(all_results, f, ensure_ascii=False, indent=4)
 
 print(f"✅ 크롤링 결과가 {json_path} 파일로 저장되었습니다.")
+
+# 구간별 시간과 필드 추출률 (CRAWL_METRICS_FILE을 지정하면 JSON으로도 저장)
+metrics.print_summary()
+if os.getenv('CRAWL_METRICS_FILE'):
+    metrics.write_json(os.getenv('CRAWL_METRICS_FILE'))
@@ -0,0 +1,301 @@
+"""
+크롤러 공용 비동기 HTTP 수집기
+crawling.py와 WelfareCrawler가 함께 사용합니다.
+
+- httpx.AsyncClient 하나로 keep-alive 연결을 재사용하고, 서버가 지원하면 HTTP/2로 요청을 다중화합니다.
+- 호스트별 동시 요청 수와 요청 간격을 제한해 정부 사이트에 부담을 주지 않습니다.
+- 본문은 서버가 알려준 charset(없으면 <meta charset>)으로 디코딩합니다.
+
+사용법:
+    from fetcher import fetch_all
+    pages = fetch_all(urls)          # 동기 코드에서
+    async with AsyncFetcher() as f:  # 비동기 코드에서
+        page = await f.fetch(url)
+    fetch_all(urls, cache=ResponseCache('crawl_state'))  # crawl_store의 디스크 캐시를 거쳐 수집
+"""
+
+import asyncio
+import codecs
+import os
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx의 HTTP/2 지원에 필요)
+    HTTP2_AVAILABLE = True
+except ImportError:  # 선택 의존성: 없으면 HTTP/1.1 keep-alive만 사용
+    HTTP2_AVAILABLE = False
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# 타임아웃(초)과 연결 풀 크기
+CONNECT_TIMEOUT = float(os.getenv('CRAWL_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.getenv('CRAWL_READ_TIMEOUT', 15))
+MAX_CONNECTIONS = int(os.getenv('CRAWL_MAX_CONNECTIONS', 20))
+# 서버 부하 방지: 호스트별 동시 요청 수와 같은 호스트 요청 사이의 최소 간격(초)
+PER_HOST_LIMIT = int(os.getenv('CRAWL_PER_HOST', 4))
+PER_HOST_DELAY = float(os.getenv('CRAWL_PER_HOST_DELAY', 0.2))
+# 연결 오류/5xx/429 응답 재시도 횟수
+RETRIES = int(os.getenv('CRAWL_RETRIES', 2))
+# 재시도 대기 시간: 0 ~ min(최대, 기본 * 2^(재시도-1))초에서 무작위 (full jitter)
+BACKOFF_BASE = float(os.getenv('CRAWL_BACKOFF_BASE', 0.5))
+BACKOFF_MAX = float(os.getenv('CRAWL_BACKOFF_MAX', 8))
+# 429/503 응답의 Retry-After를 따를 때 최대 대기 시간(초)
+RETRY_AFTER_MAX = float(os.getenv('CRAWL_RETRY_AFTER_MAX', 60))
+
+DEADLINE_ERROR = 'time budget exceeded'
+NOT_CACHED_ERROR = 'not in cache'
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 (없거나 잘못된 값이면 None)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+def normalize_encoding(name):
+    """codecs가 아는 인코딩 이름으로 변환 (모르는 이름이면 None)"""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip('"\'')).name
+    except LookupError:
+        return None
+
+def detect_encoding(content_type, content):
+    """응답 인코딩: Content-Type의 charset → <meta charset> → utf-8"""
+    match = re.search(r'charset\s*=\s*([^\s;]+)', content_type or '', re.IGNORECASE)
+    encoding = normalize_encoding(match.group(1)) if match else None
+    if encoding is None:
+        meta = _META_CHARSET.search(content[:4096])
+        encoding = normalize_encoding(meta.group(1).decode('ascii', 'ignore')) if meta else None
+    # euc-kr로 표시된 페이지에도 cp949 전용 글자가 섞여 있는 경우가 많음
+    if encoding == 'euc_kr':
+        encoding = 'cp949'
+    return encoding or 'utf-8'
+
+# httpcore trace 단계 → 측정 구간 (DNS 조회는 connect_tcp에 포함)
+TRACE_PHASES = {
+    'connect_tcp': 'connect', 'start_tls': 'tls',
+    'send_request_headers': 'send', 'send_request_body': 'send',
+    'receive_response_headers': 'wait', 'receive_response_body': 'download',
+}
+
+class PhaseTrace:
+    """httpx 요청의 trace 이벤트로 구간별 시간 측정 (connect/tls/send/wait/download, 초)"""
+
+    def __init__(self, timings):
+        self.timings = timings
+        self._started = {}
+
+    async def __call__(self, event_name, info):
+        step, state = event_name.rsplit('.', 2)[-2:]
+        phase = TRACE_PHASES.get(step)
+        if phase is None:
+            return
+        if state == 'started':
+            self._started[step] = time.perf_counter()
+        elif step in self._started:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - self._started.pop(step)
+
+class FetchResult:
+    """한 URL의 수집 결과 (실패하면 status=None, error에 사유)
+    timings: 구간별 시간(초) - queue(호스트별 동시 요청 제한/요청 간격 대기), connect, tls, send, wait, download, backoff(재시도 대기)"""
+
+    def __init__(self, url, status=None, content=b'', encoding='utf-8', final_url=None,
+                 http_version=None, elapsed=0.0, error=None, attempts=1, from_cache=False, timings=None):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.encoding = encoding
+        self.final_url = final_url or url
+        self.http_version = http_version
+        self.elapsed = elapsed
+        self.error = error
+        self.attempts = attempts
+        self.from_cache = from_cache
+        self.timings = timings or {}
+        self._text = None
+
+    @property
+    def ok(self):
+        return self.status is not None and 200 <= self.status < 300
+
+    @property
+    def text(self):
+        """서버 charset으로 디코딩한 본문"""
+        if self._text is None:
+            self._text = self.content.decode(self.encoding, errors='replace')
+        return self._text
+
+    def __repr__(self):
+        return f"<FetchResult {self.status or self.error} {self.url}>"
+
+class AsyncFetcher:
+    """keep-alive/HTTP2 연결을 재사용하는 비동기 수집기"""
+
+    def __init__(self, http2=True, max_connections=MAX_CONNECTIONS, per_host=PER_HOST_LIMIT,
+                 per_host_delay=PER_HOST_DELAY, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 retries=RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 headers=None, deadline=None, cache=None, offline=False, metrics=None):
+        if offline and cache is None:
+            raise ValueError('offline 모드에는 cache가 필요합니다')
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.per_host_delay = per_host_delay
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.headers = {'User-Agent': USER_AGENT, **(headers or {})}
+        # time.monotonic() 기준 마감 시각: 지나면 새 요청을 보내지 않음 (크롤링 시간 예산)
+        self.deadline = deadline
+        # crawl_store.ResponseCache: 2xx 응답을 저장하고 TTL 안의 응답은 요청 없이 반환
+        # offline=True면 네트워크를 쓰지 않고 TTL과 관계없이 캐시에서만 읽음
+        self.cache = cache
+        self.offline = offline
+        # crawl_metrics.CrawlMetrics: 모든 수집 결과를 기록
+        self.metrics = metrics
+        self.client = None
+        self._host_slots = {}
+        self._host_locks = {}
+        self._next_request_at = {}
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            headers=self.headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_connections),
+            follow_redirects=True,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    async def _wait_turn(self, host):
+        """같은 호스트 요청 사이에 per_host_delay초 간격 유지"""
+        if self.per_host_delay <= 0:
+            return
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            wait = self._next_request_at.get(host, 0.0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_request_at[host] = loop.time() + self.per_host_delay
+
+    def _delay_host(self, host, delay):
+        """Retry-After 동안 같은 호스트의 다른 요청도 보내지 않음"""
+        loop = asyncio.get_running_loop()
+        self._next_request_at[host] = max(self._next_request_at.get(host, 0.0), loop.time() + delay)
+
+    def backoff(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (full jitter: 여러 요청이 같은 시각에 다시 몰리지 않도록)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    async def fetch(self, url):
+        """URL 하나 수집 (연결 오류와 5xx/429는 지수 백오프(full jitter)로 재시도, 429/503은 Retry-After를 따름)"""
+        page = await self._fetch(url)
+        if self.metrics is not None:
+            self.metrics.record_fetch(page)
+        return page
+
+    async def _fetch(self, url):
+        started = time.perf_counter()
+        if self.cache is not None:
+            cached = self.cache.get(url, ignore_ttl=self.offline)
+            if cached is not None:
+                return FetchResult(url, cached.status, cached.content, cached.encoding,
+                                   final_url=cached.final_url, from_cache=True,
+                                   elapsed=time.perf_counter() - started)
+            if self.offline:
+                return FetchResult(url, error=NOT_CACHED_ERROR, attempts=0)
+        host = urlsplit(url).netloc
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host))
+        timings = {'queue': 0.0}
+        trace = PhaseTrace(timings)
+        error = None
+        retry_after = None
+        waiting = started
+        async with slots:
+            for attempt in range(1, self.retries + 2):
+                await self._wait_turn(host)
+                timings['queue'] += time.perf_counter() - waiting
+                if self.expired():
+                    return FetchResult(url, elapsed=time.perf_counter() - started,
+                                       error=DEADLINE_ERROR, attempts=attempt - 1, timings=timings)
+                try:
+                    response = await self.client.get(url, extensions={'trace': trace})
+                    retryable = response.status_code >= 500 or response.status_code == 429
+                    if not retryable or attempt > self.retries:
+                        content = response.content
+                        page = FetchResult(
+                            url, response.status_code, content,
+                            detect_encoding(response.headers.get('content-type'), content),
+                            final_url=str(response.url), http_version=response.http_version,
+                            elapsed=time.perf_counter() - started, attempts=attempt, timings=timings,
+                        )
+                        if self.cache is not None and page.ok:
+                            self.cache.put(url, content, page.status, page.encoding, page.final_url)
+                        return page
+                    error = f"HTTP {response.status_code}"
+                    retry_after = None
+                    if response.status_code in (429, 503):
+                        retry_after = parse_retry_after(response.headers.get('retry-after'))
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {e}"
+                    retry_after = None
+                if attempt <= self.retries:
+                    if retry_after is not None:
+                        backoff = min(retry_after, RETRY_AFTER_MAX)
+                        self._delay_host(host, backoff)
+                    else:
+                        backoff = self.backoff(attempt)
+                    await asyncio.sleep(backoff)
+                    timings['backoff'] = timings.get('backoff', 0.0) + backoff
+                waiting = time.perf_counter()
+        return FetchResult(url, elapsed=time.perf_counter() - started, error=error,
+                           attempts=self.retries + 1, timings=timings)
+
+    async def fetch_all(self, urls):
+        """여러 URL을 동시에 수집 (결과는 입력 순서)"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    async def iter_fetch(self, urls):
+        """먼저 끝난 순서대로 결과 반환"""
+        for task in asyncio.as_completed([self.fetch(url) for url in urls]):
+            yield await task
+
+def fetch_all(urls, **options):
+    """동기 코드용: 여러 URL을 한 이벤트 루프에서 동시에 수집 (결과는 입력 순서)"""
+    async def run():
+        async with AsyncFetcher(**options) as fetcher:
+            return await fetcher.fetch_all(list(urls))
+    return asyncio.run(run())
+
+def fetch(url, **options):
+    """동기 코드용: URL 하나 수집"""
+    return fetch_all([url], **options)[0]
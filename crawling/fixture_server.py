@@ -0,0 +1,133 @@
+"""
+크롤러 성능 측정용 로컬 fixture 서버
+정책 상세 페이지와 비슷한 HTML을 돌려주며, 요청마다 지연 시간을 넣어 실제 사이트의 응답 속도를 흉내 냅니다.
+HTTP/1.1 keep-alive를 지원하므로 연결 재사용 효과도 측정할 수 있습니다.
+
+경로:
+    /detail/<번호>         정책 상세 페이지
+    /list?pgno=<페이지>    정책 목록 페이지 (listing_pages > 0일 때, 10페이지 단위 페이지 이동 + 매 페이지 상단 고정 공지)
+"""
+
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DETAIL_TEMPLATE = '''<!DOCTYPE html>
+<html><head><meta charset="{charset}"><title>청년정책 {number}</title></head>
+<body>
+<div class="title-area"><h2>청년 {kind} 지원사업 {number}</h2></div>
+<div class="txt-tp1">
+  <h3>지원대상</h3>
+  <ul class="ls-st1"><li>만 {age_min}세~{age_max}세 {region} 거주 청년</li><li>중위소득 {income}% 이하</li></ul>
+  <h3>지원내용</h3>
+  <ul class="ls-st1"><li>월 {amount}만원 지원 (최대 {months}개월)</li></ul>
+  <h3>신청방법</h3>
+  <p>신청기간: 2024-0{month}-01 ~ 2024-0{month}-28, 온라인 신청</p>
+  {filler}
+</div>
+</body></html>'''
+
+def render_detail(number, charset='utf-8'):
+    """정책 번호로 항상 같은 상세 페이지 생성"""
+    rng = random.Random(number)
+    age_min = rng.choice([15, 18, 19, 20])
+    return DETAIL_TEMPLATE.format(
+        charset=charset, number=number,
+        kind=rng.choice(['주거', '취업', '교육', '자산형성', '문화']),
+        age_min=age_min, age_max=age_min + rng.choice([9, 14, 19]),
+        region=rng.choice(['서울', '인천', '경기']),
+        income=rng.choice([100, 120, 150]), amount=rng.choice([10, 20, 30, 50]),
+        months=rng.choice([6, 10, 12]), month=rng.randint(1, 9),
+        filler='<p>' + '정책 안내 문구입니다. ' * rng.randint(50, 150) + '</p>',
+    )
+
+LIST_TEMPLATE = '''<!DOCTYPE html>
+<html><head><meta charset="{charset}"><title>청년정책 목록</title></head>
+<body>
+<ul class="board-list">{items}</ul>
+<div class="paging">{paging}</div>
+</body></html>'''
+
+# 모든 목록 페이지 상단에 반복되는 고정 공지 (중복 URL 제거 확인용)
+PINNED_POLICIES = (0, 1)
+PAGE_BLOCK = 10
+
+def render_list(page, total_pages, per_page, charset='utf-8'):
+    """목록 페이지: 상세 링크에는 pgno/menudiv가 붙고, 페이지 이동은 현재 10페이지 묶음 + 이전/다음만 보여 줌"""
+    numbers = list(PINNED_POLICIES)
+    numbers += range(len(PINNED_POLICIES) + (page - 1) * per_page, len(PINNED_POLICIES) + page * per_page)
+    items = ''.join(f'<li><a href="/detail/{number}?pgno={page}&amp;menudiv=1">청년정책 {number}</a></li>'
+                    for number in numbers)
+    block_start = (page - 1) // PAGE_BLOCK * PAGE_BLOCK + 1
+    block_end = min(block_start + PAGE_BLOCK - 1, total_pages)
+    paging = [f'<a href="/list?pgno={number}&amp;menudiv=1">{number}</a>' for number in range(block_start, block_end + 1)]
+    if block_start > 1:
+        paging.insert(0, f'<a href="/list?pgno={block_start - 1}&amp;menudiv=1">이전</a>')
+    if block_end < total_pages:
+        paging.append(f'<a href="/list?pgno={block_end + 1}&amp;menudiv=1">다음</a>')
+    return LIST_TEMPLATE.format(charset=charset, items=''.join(items), paging=''.join(paging))
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    # 헤더와 본문을 한 번에 보내 keep-alive 연결에서 Nagle/지연 ACK 대기가 생기지 않도록 함
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if server.latency > 0:
+            time.sleep(server.latency)
+        url = urlsplit(self.path)
+        parts = url.path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'detail' and parts[1].isdigit():
+            self._send(200, render_detail(int(parts[1]), server.charset))
+        elif parts == ['list'] and server.listing_pages:
+            page = int(parse_qs(url.query).get('pgno', ['1'])[0])
+            if 1 <= page <= server.listing_pages:
+                self._send(200, render_list(page, server.listing_pages, server.per_page, server.charset))
+            else:
+                self._send(404, '<html><body>not found</body></html>')
+        else:
+            self._send(404, '<html><body>not found</body></html>')
+
+    def _send(self, status, html):
+        body = html.encode(self.server.charset)
+        self.send_response(status)
+        self.send_header('Content-Type', f'text/html; charset={self.server.charset}'
+                         if self.server.send_charset else 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 동시 연결이 많을 때 listen 대기열(기본 5)이 넘쳐 SYN 재전송(1초)이 생기지 않도록 함
+    request_queue_size = 128
+
+    def __init__(self, latency=0.05, charset='utf-8', send_charset=True, port=0, listing_pages=0, per_page=10):
+        super().__init__(('127.0.0.1', port), FixtureHandler)
+        self.latency = latency
+        self.listing_pages = listing_pages
+        self.per_page = per_page
+        self.charset = charset
+        self.send_charset = send_charset
+        self.connections = 0
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+def start_fixture_server(**options):
+    """백그라운드 스레드에서 fixture 서버 시작 (server.shutdown()으로 종료)"""
+    server = FixtureServer(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
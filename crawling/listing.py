@@ -0,0 +1,116 @@
+"""
+정책 목록 페이지 탐색
+목록의 모든 페이지를 따라가며 정책 상세 URL을 모읍니다.
+
+- 페이지 이동 링크를 발견하는 대로 새 목록 페이지들을 동시에 요청합니다.
+  (10페이지씩만 보여 주는 사이트도 '다음' 링크를 따라 끝까지 탐색)
+- pgno, menudiv처럼 정책과 무관한 쿼리 파라미터를 제거하고 정렬한 URL로 중복을 제거합니다.
+- fetcher의 deadline(시간 예산)이 지나면 탐색을 멈추고 그때까지 찾은 URL을 반환합니다.
+
+사용법:
+    from listing import Listing, discover_policy_urls
+    urls, = discover_policy_urls([Listing('인천', list_url, 'a[href*="Detail.do"]', 'pgno')])
+"""
+
+import asyncio
+import re
+from urllib.parse import parse_qs, parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+
+from fetcher import DEADLINE_ERROR, AsyncFetcher
+
+# 같은 정책/목록을 가리키는데 값만 바뀌는 파라미터 (페이지 번호, 메뉴 위치, 검색 상태)
+NAVIGATION_PARAMS = frozenset({
+    'pgno', 'page', 'pageIndex', 'pageNo', 'menudiv', 'menuNo',
+    'article.offset', 'articleLimit', 'searchCondition', 'searchKeyword', 'searchWrd',
+})
+
+# javascript:fn_link_page(3) 형태의 페이지 이동
+_PAGE_CALL = re.compile(r'^\s*(?:javascript:)?\s*[\w.]+\(\s*[\'"]?(\d+)[\'"]?\s*\)')
+_PAGING_CLASS = re.compile(r'pag', re.IGNORECASE)
+
+def normalize_url(url, keep=()):
+    """중복 비교용 URL: 탐색용 파라미터(keep 제외)와 #fragment 제거, 파라미터 정렬"""
+    parts = urlsplit(url)
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if key not in NAVIGATION_PARAMS or key in keep)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', urlencode(query), ''))
+
+class Listing:
+    """정책 목록 설정 (목록 주소, 상세 링크 선택자, 페이지 번호 파라미터)"""
+
+    def __init__(self, name, list_url, link_selector, page_param, first_page=1):
+        self.name = name
+        self.list_url = list_url
+        self.link_selector = link_selector
+        self.page_param = page_param
+        self.first_page = first_page
+
+    def page_url(self, page):
+        parts = urlsplit(self.list_url)
+        query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                 if key != self.page_param]
+        query.append((self.page_param, str(page)))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    def page_key(self, url):
+        return normalize_url(url, keep=(self.page_param,))
+
+    def parse(self, page_url, html):
+        """목록 페이지 하나에서 (상세 URL 목록, 다른 목록 페이지 URL 목록) 추출"""
+        soup = BeautifulSoup(html, 'html.parser')
+        details = [urljoin(page_url, link['href']) for link in soup.select(self.link_selector) if link.get('href')]
+
+        list_path = urlsplit(self.list_url).path
+        pages = []
+        for link in soup.find_all('a'):
+            href = link.get('href', '').strip()
+            if href and not href.startswith(('#', 'javascript:')):
+                target = urlsplit(urljoin(page_url, href))
+                if target.path == list_path and self.page_param in parse_qs(target.query):
+                    pages.append(urlunsplit(target))
+            elif link.find_parent(class_=_PAGING_CLASS):
+                match = _PAGE_CALL.search(link.get('onclick') or href)
+                if match:
+                    pages.append(self.page_url(match.group(1)))
+        return details, pages
+
+async def discover(fetcher, listing):
+    """목록의 모든 페이지를 탐색해 중복 없는 정책 상세 URL 목록 반환 (정규화된 URL, 발견 순서)"""
+    first = listing.page_url(listing.first_page)
+    seen_pages = {listing.page_key(first)}
+    frontier = [first]
+    details = {}
+    fetched = 0
+    truncated = False
+    while frontier and not fetcher.expired():
+        results = await asyncio.gather(*(fetcher.fetch(url) for url in frontier))
+        frontier = []
+        for page in results:
+            if not page.ok:
+                truncated |= page.error == DEADLINE_ERROR
+                if page.error != DEADLINE_ERROR:
+                    print(f"❌ {listing.name} 목록 수집 에러 ({page.url}): {page.error or page.status}")
+                continue
+            fetched += 1
+            links, pages = listing.parse(page.final_url, page.text)
+            for link in links:
+                details.setdefault(normalize_url(link), None)
+            for url in pages:
+                key = listing.page_key(url)
+                if key not in seen_pages:
+                    seen_pages.add(key)
+                    frontier.append(url)
+
+    if frontier or truncated:
+        print(f"⚠️ {listing.name} 목록: 시간 예산 초과로 탐색 중단")
+    print(f"✅ {listing.name} 목록 {fetched}페이지에서 정책 URL {len(details)}개 발견")
+    return list(details)
+
+def discover_policy_urls(listings, **fetch_options):
+    """동기 코드용: 여러 목록을 한 이벤트 루프에서 동시에 탐색 (목록별 URL 리스트 반환)"""
+    async def run():
+        async with AsyncFetcher(**fetch_options) as fetcher:
+            return await asyncio.gather(*(discover(fetcher, listing) for listing in listings))
+    return asyncio.run(run())
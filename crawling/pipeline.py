@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+크롤링 파이프라인: 수집 → 파싱 → 저장 단계를 크기 제한 큐로 연결해 동시에 실행
+- 수집: fetcher.AsyncFetcher (I/O 대기, 비동기 작업 여러 개)
+- 파싱: ProcessPoolExecutor에서 policy_extractor.parse_policy_page 실행 (CPU, 코어 수만큼 프로세스)
+- 저장: 결과를 batch_size개씩 모아 PostgreSQL 또는 JSON Lines 파일에 기록
+큐가 가득 차면 앞 단계가 기다리므로 (backpressure) 사이트가 아무리 커도 메모리 사용량이 일정합니다.
+
+사용법:
+    python pipeline.py --output policies.jsonl
+    python pipeline.py --database-url postgresql://user:pw@host:5432/db
+    python pipeline.py --fixture 500 --output /tmp/policies.jsonl   # 로컬 fixture 서버로 측정
+    python pipeline.py --state-dir crawl_state --output policies.jsonl            # 응답 캐시 + URL 상태 기록
+    python pipeline.py --state-dir crawl_state --output policies.jsonl --resume   # 중단된 크롤링 이어서 실행
+    python pipeline.py --state-dir crawl_state --output policies.jsonl --from-cache  # 캐시만으로 다시 추출
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from crawl_metrics import CrawlMetrics
+from crawl_store import Frontier, ResponseCache
+from fetcher import DEADLINE_ERROR, AsyncFetcher
+from policy_extractor import parse_policy_page
+
+# 크롤러 지역 표기 → regions 테이블 이름
+REGION_NAMES = {'서울': '서울특별시', '인천': '인천광역시', '경기': '경기도'}
+DEFAULT_CATEGORY = '기타지원'
+
+class StageStats:
+    """단계별 처리량 (처리 개수, 실패 개수, 실제 작업 시간, 다음 큐의 최대 길이)
+    처리 속도는 파이프라인 시작부터 그 단계의 마지막 처리까지의 시간으로 계산"""
+
+    def __init__(self, name, started_at=None):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.skipped = 0
+        self.busy = 0.0
+        self.max_queue = 0
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.finished_at = None
+
+    def record(self, seconds, ok=True):
+        self.finished_at = time.perf_counter()
+        self.busy += seconds
+        if ok:
+            self.count += 1
+        else:
+            self.errors += 1
+
+    def observe_queue(self, queue):
+        self.max_queue = max(self.max_queue, queue.qsize())
+
+    @property
+    def elapsed(self):
+        if self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def rate(self):
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.name:<8}{self.count:>8}{self.errors:>8}{self.rate:>12.1f}"
+                f"{self.elapsed:>10.2f}s{self.busy:>10.2f}s{self.max_queue:>10}")
+
+class JsonLinesWriter:
+    """추출 결과를 JSON Lines 파일에 기록"""
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, batch):
+        self.file.write(''.join(json.dumps(policy, ensure_ascii=False) + '\n' for policy in batch))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class PostgresPolicyWriter:
+    """추출 결과를 policies 테이블에 batch 단위로 저장 (같은 URL이 있으면 갱신)"""
+
+    UPSERT_QUERY = f'''
+        WITH incoming (url, title, region_name, age_min, age_max, application_period, conditions, benefits) AS (
+            VALUES %s
+        ), updated AS (
+            UPDATE policies p
+            SET title = i.title, region_id = r.id, age_min = i.age_min, age_max = i.age_max,
+                application_period = i.application_period, conditions = i.conditions,
+                benefits = i.benefits, updated_at = CURRENT_TIMESTAMP
+            FROM incoming i
+            LEFT JOIN regions r ON r.name = i.region_name
+            WHERE p.url = i.url
+            RETURNING p.url
+        )
+        INSERT INTO policies (
+            title, url, region_id, category_id, age_min, age_max,
+            application_period, conditions, benefits, status
+        )
+        SELECT i.title, i.url, r.id, (SELECT id FROM categories WHERE name = '{DEFAULT_CATEGORY}'),
+               i.age_min, i.age_max, i.application_period, i.conditions, i.benefits, 'active'
+        FROM incoming i
+        LEFT JOIN regions r ON r.name = i.region_name
+        WHERE i.url NOT IN (SELECT url FROM updated)
+    '''
+    ROW_TEMPLATE = "(%s, %s, %s, %s::integer, %s::integer, %s, %s, %s)"
+
+    def __init__(self, database_url):
+        import psycopg2
+        import psycopg2.extras
+        self.execute_values = psycopg2.extras.execute_values
+        self.conn = psycopg2.connect(database_url)
+
+    def write(self, batch):
+        # 한 batch 안에서 같은 URL은 마지막 결과만 사용
+        rows = {}
+        for policy in batch:
+            ages = policy.get('age_range') or []
+            rows[policy['url']] = (
+                policy['url'], policy.get('title', ''), REGION_NAMES.get(policy.get('region'), policy.get('region')),
+                min(ages) if ages else None, max(ages) if ages else None,
+                policy.get('application_period', ''), policy.get('conditions', ''), policy.get('benefits', ''),
+            )
+        with self.conn.cursor() as cursor:
+            self.execute_values(cursor, self.UPSERT_QUERY, list(rows.values()),
+                                template=self.ROW_TEMPLATE, page_size=len(rows))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+def timed_parse(url, region, html):
+    """파서 프로세스에서 실행: (추출 결과, 파싱 시간)
+
+    시간은 프로세스 안에서 재므로 pickle 전송이나 빈 프로세스를 기다린 시간은 포함하지 않습니다.
+    """
+    started = time.perf_counter()
+    result = parse_policy_page(url, region, html)
+    return result, time.perf_counter() - started
+
+async def run_pipeline(jobs, writer, fetch_concurrency=16, parse_workers=None, queue_size=64,
+                       batch_size=100, progress_interval=5.0, fetch_options=None, frontier=None, metrics=None):
+    """(URL, 지역) 목록을 수집 → 파싱 → 저장하고 단계별 통계 반환
+    frontier(crawl_store.Frontier)를 주면 URL별 완료/실패를 기록해 중단 후 이어서 실행할 수 있음
+    metrics(crawl_metrics.CrawlMetrics)를 주면 URL별 수집 구간 시간과 파싱 시간/필드 추출 여부를 기록"""
+    fetch_options = dict(fetch_options or {})
+    if metrics is not None:
+        fetch_options['metrics'] = metrics
+    parse_workers = parse_workers or os.cpu_count() or 1
+    # 파서 프로세스가 쉬지 않도록 프로세스 수의 두 배만큼 작업을 맡겨 둠
+    parse_concurrency = parse_workers * 2
+    started = time.perf_counter()
+    stats = {name: StageStats(name, started) for name in ('fetch', 'parse', 'write')}
+    job_queue = asyncio.Queue(maxsize=queue_size)
+    parse_queue = asyncio.Queue(maxsize=queue_size)
+    write_queue = asyncio.Queue(maxsize=queue_size)
+    loop = asyncio.get_running_loop()
+
+    async def produce():
+        for job in jobs:
+            await job_queue.put(job)
+        for _ in range(fetch_concurrency):
+            await job_queue.put(None)
+
+    async def fetch_worker(fetcher):
+        while (job := await job_queue.get()) is not None:
+            url, region = job
+            page = await fetcher.fetch(url)
+            if page.error == DEADLINE_ERROR:
+                stats['fetch'].skipped += 1
+                continue
+            stats['fetch'].record(page.elapsed, page.ok)
+            if page.ok:
+                await parse_queue.put((url, region, page.text))
+                stats['fetch'].observe_queue(parse_queue)
+            else:
+                print(f"❌ 수집 실패 ({url}): {page.error or page.status}")
+                if frontier:
+                    frontier.mark_failed(url, page.error or f"HTTP {page.status}")
+
+    async def parse_worker(pool):
+        while (job := await parse_queue.get()) is not None:
+            try:
+                result, elapsed = await loop.run_in_executor(pool, timed_parse, *job)
+            except Exception as e:
+                print(f"❌ 파싱 실패 ({job[0]}): {e}")
+                if frontier:
+                    frontier.mark_failed(job[0], str(e))
+                result, elapsed = None, 0.0
+            else:
+                # 본문이 없는 페이지도 다시 수집할 필요는 없음
+                if result is None and frontier:
+                    frontier.mark_done([job[0]])
+            stats['parse'].record(elapsed, result is not None)
+            if metrics is not None:
+                metrics.record_parse(job[0], elapsed, result)
+            if result is not None:
+                await write_queue.put(result)
+                stats['parse'].observe_queue(write_queue)
+
+    async def write_batch(batch):
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(writer.write, batch)
+        except Exception as e:
+            print(f"❌ 저장 실패 ({len(batch)}개): {e}")
+            stats['write'].errors += len(batch)
+            if frontier:
+                for policy in batch:
+                    frontier.mark_failed(policy['url'], str(e))
+            return
+        if frontier:
+            frontier.mark_done([policy['url'] for policy in batch])
+        elapsed = time.perf_counter() - started
+        for _ in batch:
+            stats['write'].record(elapsed / len(batch))
+
+    async def write_stage():
+        batch = []
+        while (policy := await write_queue.get()) is not None:
+            batch.append(policy)
+            if len(batch) >= batch_size:
+                await write_batch(batch)
+                batch = []
+        if batch:
+            await write_batch(batch)
+
+    async def report_progress():
+        while True:
+            await asyncio.sleep(progress_interval)
+            print("⏳ " + ", ".join(f"{item.name} {item.count}" for item in stats.values())
+                  + f" (큐: {parse_queue.qsize()}/{write_queue.qsize()})")
+
+    progress = asyncio.create_task(report_progress()) if progress_interval else None
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        async with AsyncFetcher(**fetch_options) as fetcher:
+            writer_task = asyncio.create_task(write_stage())
+            parsers = [asyncio.create_task(parse_worker(pool)) for _ in range(parse_concurrency)]
+            await asyncio.gather(produce(), *(fetch_worker(fetcher) for _ in range(fetch_concurrency)))
+            for _ in parsers:
+                await parse_queue.put(None)
+            await asyncio.gather(*parsers)
+            await write_queue.put(None)
+            await writer_task
+            cache = fetcher.cache
+    if progress:
+        progress.cancel()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n📊 파이프라인 완료: {elapsed:.2f}s, 파서 프로세스 {parse_workers}개, 수집 동시성 {fetch_concurrency}")
+    print("-" * 76)
+    print(f"{'stage':<8}{'ok':>8}{'fail':>8}{'items/s':>12}{'elapsed':>11}{'busy':>11}{'max queue':>10}")
+    for item in stats.values():
+        print(item.summary())
+    if cache is not None:
+        print(f"💾 캐시: 적중 {cache.hits}개, 미적중 {cache.misses}개")
+    if stats['fetch'].skipped:
+        print(f"⚠️ 시간 예산 초과로 {stats['fetch'].skipped}개 페이지 미수집")
+    return stats
+
+def load_welfare_crawler(time_budget=None, **fetch_options):
+    """improved_crawling(PM.VER).py의 WelfareCrawler (파일 이름 때문에 import 문으로 불러올 수 없음)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'improved_crawling(PM.VER).py')
+    spec = importlib.util.spec_from_file_location('improved_crawling', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.WelfareCrawler(time_budget, **fetch_options)
+
+def main():
+    parser = argparse.ArgumentParser(description='수집 → 파싱 → 저장 크롤링 파이프라인')
+    parser.add_argument('--output', help='JSON Lines 결과 파일')
+    parser.add_argument('--database-url', default=None, help='PostgreSQL 연결 주소 (기본값: DATABASE_URL 환경 변수)')
+    parser.add_argument('--fetch-concurrency', type=int, default=16, help='동시 수집 작업 수')
+    parser.add_argument('--parse-workers', type=int, default=None, help='파서 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--queue-size', type=int, default=64, help='단계 사이 큐 크기')
+    parser.add_argument('--batch-size', type=int, default=100, help='한 번에 저장할 정책 수')
+    parser.add_argument('--per-host', type=int, default=None, help='호스트별 동시 요청 수')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='크롤링 시간 예산(초, 기본값: CRAWL_TIME_BUDGET 환경 변수 또는 600)')
+    parser.add_argument('--state-dir', default=os.getenv('CRAWL_STATE_DIR'),
+                        help='응답 캐시와 URL 상태를 저장할 디렉터리 (기본값: CRAWL_STATE_DIR 환경 변수)')
+    parser.add_argument('--resume', action='store_true', help='이전 실행에서 끝나지 않은 URL부터 이어서 실행')
+    parser.add_argument('--from-cache', action='store_true', help='네트워크 없이 캐시된 페이지만 다시 추출')
+    parser.add_argument('--metrics-file', default=os.getenv('CRAWL_METRICS_FILE'),
+                        help='URL별 측정값과 요약을 저장할 JSON 파일 (기본값: CRAWL_METRICS_FILE 환경 변수)')
+    parser.add_argument('--fixture', type=int, default=0, help='실제 사이트 대신 로컬 fixture 서버의 페이지 N개 수집')
+    parser.add_argument('--latency', type=float, default=0.05, help='fixture 서버 응답 지연(초)')
+    args = parser.parse_args()
+    if (args.resume or args.from_cache) and not args.state_dir:
+        parser.error('--resume/--from-cache에는 --state-dir가 필요합니다')
+
+    metrics = CrawlMetrics('pipeline')
+    fetch_options = {}
+    if args.per_host:
+        fetch_options['per_host'] = args.per_host
+
+    frontier = None
+    if args.state_dir:
+        fetch_options['cache'] = ResponseCache(args.state_dir)
+        frontier = Frontier(args.state_dir)
+
+    server = None
+    resumed = False
+    if args.from_cache:
+        # 캐시 재추출은 URL 상태를 바꾸지 않음
+        jobs = frontier.jobs()
+        frontier = None
+        fetch_options['offline'] = True
+        print(f"💾 캐시에서 다시 추출: {len(jobs)}개")
+    elif args.resume:
+        jobs = frontier.pending()
+        if not jobs:
+            # 새로 크롤링하면 저장된 상태와 출력 파일을 지우게 되므로 여기서 끝냄
+            print(f"✅ 이어서 실행할 URL이 없습니다 (상태: {frontier.counts()})")
+            return
+        resumed = True
+        print(f"🔄 이어서 실행: 남은 URL {len(jobs)}개 (상태: {frontier.counts()})")
+    elif args.fixture:
+        from fixture_server import start_fixture_server
+        server = start_fixture_server(latency=args.latency)
+        regions = list(REGION_NAMES)
+        jobs = [(f"{server.base_url}/detail/{number}", regions[number % len(regions)])
+                for number in range(args.fixture)]
+        fetch_options.setdefault('per_host', args.fetch_concurrency)
+        fetch_options['per_host_delay'] = 0
+        if args.time_budget:
+            fetch_options['deadline'] = time.monotonic() + args.time_budget
+    else:
+        print("🔄 정책 URL 수집 중...")
+        crawler = load_welfare_crawler(args.time_budget, metrics=metrics, **fetch_options)
+        jobs = crawler.policy_jobs()
+        # 목록 탐색과 상세 페이지 수집이 같은 시간 예산을 나눠 씀
+        fetch_options['deadline'] = crawler.deadline
+    if frontier and not resumed:
+        frontier.reset()
+        frontier.add(jobs)
+    print(f"✅ 크롤링 대상 {len(jobs)}개")
+
+    database_url = args.database_url or (None if args.output else os.getenv('DATABASE_URL'))
+    if database_url:
+        writer = PostgresPolicyWriter(database_url)
+    else:
+        writer = JsonLinesWriter(args.output or 'welfare_policies.jsonl', append=resumed)
+
+    try:
+        asyncio.run(run_pipeline(
+            jobs, writer, fetch_concurrency=args.fetch_concurrency, parse_workers=args.parse_workers,
+            queue_size=args.queue_size, batch_size=args.batch_size, fetch_options=fetch_options,
+            frontier=frontier, metrics=metrics,
+        ))
+        metrics.print_summary()
+        if args.metrics_file:
+            metrics.write_json(args.metrics_file)
+    finally:
+        writer.close()
+        if server:
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
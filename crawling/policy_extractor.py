@@ -0,0 +1,139 @@
+"""
+정책 상세 페이지 추출 규칙
+WelfareCrawler, 크롤링 파이프라인(pipeline.py)의 파서 프로세스, 오프라인 재추출이 같은 규칙을 사용합니다.
+프로세스 풀에서 실행할 수 있도록 모듈 수준 함수로 둡니다.
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+def parse_policy_page(url, region, html):
+    """수집한 HTML에서 정책 정보 추출 (내용 영역이 없으면 None)"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    result = {
+        'url': url,
+        'region': region,
+        'title': '',
+        'age_range': [],
+        'application_period': '',
+        'conditions': '',
+        'benefits': ''
+    }
+
+    # 제목 추출
+    title_selectors = [
+        '.title-area h2',
+        '.b-title-box span',
+        'h1',
+        '.page-title',
+        'title'
+    ]
+
+    for selector in title_selectors:
+        title_tag = soup.select_one(selector)
+        if title_tag:
+            result['title'] = title_tag.get_text(strip=True)
+            break
+
+    if not result['title']:
+        result['title'] = '제목 없음'
+
+    # 내용 영역 찾기
+    content_selectors = [
+        '.txt-tp1',
+        '#detail_con .line-box',
+        '.box-gray',
+        '.con-box',
+        '.content-area',
+        '.detail-content'
+    ]
+
+    content_text = ""
+    for selector in content_selectors:
+        content_box = soup.select_one(selector)
+        if content_box:
+            content_text = content_box.get_text(separator=" ", strip=True)
+            break
+
+    if not content_text:
+        return None
+
+    # 나이 범위 추출
+    result['age_range'] = extract_age_range(content_text)
+
+    # 신청기간 추출
+    result['application_period'] = extract_application_period(content_text)
+
+    # 조건/혜택 추출
+    result['conditions'], result['benefits'] = extract_conditions_benefits(soup)
+
+    return result
+
+def extract_age_range(text):
+    """나이 범위 추출"""
+    # 정규식 패턴들
+    patterns = [
+        r'(\d{1,2})\s*세\s*[~\-]\s*(\d{1,2})\s*세',  # 20세~29세
+        r'만\s*(\d{1,2})\s*세\s*이하',  # 만 29세 이하
+        r'(\d{1,2})\s*[~\-]\s*(\d{1,2})\s*세',  # 20~29세
+        r'만\s*(\d{1,2})\s*[~\-]\s*(\d{1,2})\s*세'  # 만 20~29세
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            if len(match.groups()) == 2:
+                start, end = int(match.group(1)), int(match.group(2))
+                return list(range(start, end + 1))
+            else:
+                max_age = int(match.group(1))
+                return list(range(0, max_age + 1))
+
+    # 키워드 기반 추출
+    if '청년' in text or '대학생' in text:
+        return list(range(20, 30))
+
+    return []
+
+def extract_application_period(text):
+    """신청기간 추출"""
+    patterns = [
+        r'신청기간[^\d]*(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})',
+        r'접수기간[^\d]*(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})',
+        r'(\d{4}[.\-]\d{2}[.\-]\d{2})\s*[~\-]\s*(\d{4}[.\-]\d{2}[.\-]\d{2})'
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            return f"{match.group(1)}~{match.group(2)}"
+
+    return '미정'
+
+def extract_conditions_benefits(soup):
+    """조건과 혜택 추출"""
+    conditions = ""
+    benefits = ""
+
+    # 조건/혜택 관련 섹션 찾기
+    sections = soup.find_all(['h3', 'h4', 'h5'])
+
+    for section in sections:
+        section_text = section.get_text(strip=True)
+        next_elements = section.find_next_siblings(['ul', 'p', 'div'])
+
+        content = ""
+        for elem in next_elements[:3]:  # 최대 3개 요소까지만
+            if elem.name == 'ul':
+                content += elem.get_text(separator=' ', strip=True) + " "
+            elif elem.name in ['p', 'div']:
+                content += elem.get_text(strip=True) + " "
+
+        if any(keyword in section_text for keyword in ['지원대상', '사업대상', '신청자격', '지원자격', '조건']):
+            conditions += content
+        elif any(keyword in section_text for keyword in ['사업내용', '지원내용', '혜택', '지원금액']):
+            benefits += content
+
+    return conditions.strip(), benefits.strip()
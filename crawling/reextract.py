@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+저장된 HTML로 정책 정보 다시 추출 (네트워크 없이, 모든 CPU 코어 사용)
+추출 규칙(policy_extractor.py)을 고친 뒤 다시 크롤링하지 않고 결과를 확인할 때 사용합니다.
+
+입력:
+    - HTML 파일 디렉터리 (하위 디렉터리 포함 *.html, *.htm)
+    - 압축 파일 (.zip, .tar, .tar.gz, .tgz)
+    - 크롤링 state 디렉터리 (crawl_store: pipeline.py --state-dir로 저장한 정책 상세 페이지)
+
+디렉터리/압축 파일의 페이지는 파일 경로를 url로 사용하고, 지역은 --region 또는 경로의 지역 이름(서울/seoul 등)으로 정합니다.
+
+사용법:
+    python reextract.py saved_pages/ --output policies.jsonl
+    python reextract.py pages.zip --output policies.jsonl --region 인천
+    python reextract.py crawl_state --output policies.jsonl --previous old.jsonl --workers 8
+"""
+
+import argparse
+import json
+import os
+import tarfile
+import time
+import zipfile
+from multiprocessing import Pool
+
+from crawl_store import ResponseCache
+from fetcher import detect_encoding
+from policy_extractor import parse_policy_page
+
+HTML_EXTENSIONS = ('.html', '.htm')
+# 경로에 들어 있으면 지역으로 사용
+REGION_HINTS = {
+    '서울': '서울', 'seoul': '서울',
+    '인천': '인천', 'incheon': '인천',
+    '경기': '경기', 'gyeonggi': '경기',
+}
+# 변경 예시 출력 개수
+DIFF_EXAMPLES = 5
+
+def guess_region(path, default=None):
+    """경로의 디렉터리/파일 이름에서 지역 추정"""
+    for part in reversed(path.replace('\\', '/').lower().split('/')):
+        for hint, region in REGION_HINTS.items():
+            if part == hint or part.startswith(hint + '_') or part.startswith(hint + '.'):
+                return region
+    return default
+
+def iter_documents(source, region=None):
+    """(url, 지역, 파일 경로, 본문 bytes, 인코딩) 목록
+    파일 경로가 있으면 파서 프로세스가 직접 읽고, 압축 파일 안의 페이지는 본문을 넘김"""
+    if os.path.isdir(source) and os.path.exists(os.path.join(source, 'state.db')):
+        cache = ResponseCache(source)
+        for url, cached_region, path, encoding in cache.policy_pages():
+            yield url, region or cached_region, path, None, encoding
+        cache.close()
+    elif os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(HTML_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    key = os.path.relpath(path, source)
+                    yield key, guess_region(key, region), path, None, None
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(HTML_EXTENSIONS):
+                    yield info.filename, guess_region(info.filename, region), None, archive.read(info), None
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(HTML_EXTENSIONS):
+                    content = archive.extractfile(member).read()
+                    yield member.name, guess_region(member.name, region), None, content, None
+    else:
+        raise ValueError(f"HTML 디렉터리, 압축 파일, state 디렉터리가 아닙니다: {source}")
+
+def extract_document(document):
+    """파서 프로세스에서 실행: (url, 추출 결과 또는 None, 에러, 파싱 시간)"""
+    url, region, path, content, encoding = document
+    try:
+        if content is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+        html = content.decode(encoding or detect_encoding(None, content), errors='replace')
+        started = time.perf_counter()
+        result = parse_policy_page(url, region, html)
+        return url, result, None, time.perf_counter() - started
+    except Exception as e:
+        return url, None, f"{type(e).__name__}: {e}", 0.0
+
+def load_jsonl(path):
+    """url → 추출 결과"""
+    results = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                policy = json.loads(line)
+                results[policy['url']] = policy
+    return results
+
+def diff_results(previous, current):
+    """이전 추출 대비 추가/삭제/변경 URL과 필드별 변경 수"""
+    added = [url for url in current if url not in previous]
+    removed = [url for url in previous if url not in current]
+    changed = {}
+    field_changes = {}
+    for url, policy in current.items():
+        old = previous.get(url)
+        if old is None:
+            continue
+        fields = [field for field in sorted(set(old) | set(policy)) if old.get(field) != policy.get(field)]
+        if fields:
+            changed[url] = fields
+            for field in fields:
+                field_changes[field] = field_changes.get(field, 0) + 1
+    return added, removed, changed, field_changes
+
+def shorten(value, width=60):
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+def print_diff(previous, current):
+    added, removed, changed, field_changes = diff_results(previous, current)
+    unchanged = len(current) - len(added) - len(changed)
+    print(f"\n📊 이전 추출 대비: 추가 {len(added)}, 삭제 {len(removed)}, 변경 {len(changed)}, 동일 {unchanged}")
+    if field_changes:
+        print("   필드별 변경: " + ", ".join(
+            f"{field} {count}" for field, count in sorted(field_changes.items(), key=lambda item: -item[1])))
+    for url, fields in list(changed.items())[:DIFF_EXAMPLES]:
+        print(f"   - {url}")
+        for field in fields:
+            print(f"       {field}: {shorten(previous[url].get(field))} → {shorten(current[url].get(field))}")
+    for url in removed[:DIFF_EXAMPLES]:
+        print(f"   - 삭제: {url}")
+
+def reextract(source, output, previous_path=None, workers=None, region=None, chunksize=16):
+    """source의 HTML을 모두 다시 추출해 output(JSON Lines)에 기록하고 이전 결과와 비교"""
+    # 결과 파일을 덮어쓰기 전에 이전 결과 읽기
+    previous_path = previous_path or (output if os.path.exists(output) else None)
+    previous = load_jsonl(previous_path) if previous_path else None
+
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    current = {}
+    pages = empty = 0
+    errors = []
+    parse_time = 0.0
+    with Pool(workers) as pool, open(output, 'w', encoding='utf-8') as f:
+        for url, result, error, elapsed in pool.imap(extract_document, iter_documents(source, region), chunksize):
+            pages += 1
+            parse_time += elapsed
+            if error:
+                errors.append((url, error))
+            elif result is None:
+                empty += 1
+            else:
+                current[url] = result
+                f.write(json.dumps(result, ensure_ascii=False) + '\n')
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {pages}개 페이지 → 정책 {len(current)}개 ({output})")
+    print(f"⏱️ {elapsed:.2f}s, {pages / elapsed if elapsed else 0:.0f} pages/s, "
+          f"프로세스 {workers}개 (파싱 시간 합계 {parse_time:.2f}s)")
+    if empty:
+        print(f"⚠️ 본문을 찾지 못한 페이지 {empty}개")
+    for url, error in errors[:DIFF_EXAMPLES]:
+        print(f"❌ {url}: {error}")
+    if len(errors) > DIFF_EXAMPLES:
+        print(f"❌ ... 외 {len(errors) - DIFF_EXAMPLES}개 에러")
+    if previous is not None:
+        print_diff(previous, current)
+    return current
+
+def main():
+    parser = argparse.ArgumentParser(description='저장된 HTML로 정책 정보 다시 추출')
+    parser.add_argument('source', help='HTML 디렉터리, 압축 파일(.zip/.tar.gz) 또는 크롤링 state 디렉터리')
+    parser.add_argument('--output', default='reextracted_policies.jsonl', help='JSON Lines 결과 파일')
+    parser.add_argument('--previous', default=None, help='비교할 이전 결과 (기본값: 덮어쓰기 전 output 파일)')
+    parser.add_argument('--workers', type=int, default=None, help='파서 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--region', default=None, help='경로로 지역을 알 수 없을 때 사용할 지역 (서울/인천/경기)')
+    args = parser.parse_args()
+
+    reextract(args.source, args.output, args.previous, args.workers, args.region)
+
+if __name__ == '__main__':
+    main()